@@ -10,7 +10,7 @@ from flexget.manager import Session
 
 log = logging.getLogger('perftests')
 
-TESTS = ['imdb_query']
+TESTS = ['imdb_query', 'imdb_parse']
 
 
 def cli_perf_test(manager, options):
@@ -21,6 +21,8 @@ def cli_perf_test(manager, options):
     try:
         if options.test_name == 'imdb_query':
             imdb_query(session)
+        elif options.test_name == 'imdb_parse':
+            imdb_parse()
     finally:
         session.close()
 
@@ -73,6 +75,29 @@ def imdb_query(session):
     log.debug('Took %.2f seconds to query %i movies' % (took, len(imdb_urls)))
 
 
+def imdb_parse(rounds=5):
+    """Compares parsing the saved imdb title pages of the tests whole, and only their sections with details."""
+    import gzip
+    import os
+    import time
+    from flexget.utils.imdb import ImdbParser
+
+    pages_dir = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'tests', 'imdb_pages')
+    pages = []
+    for name in sorted(os.listdir(pages_dir)):
+        with gzip.open(os.path.join(pages_dir, name)) as page:
+            pages.append(page.read().decode('utf-8'))
+    log.info('Parsing %i pages %i times' % (len(pages), rounds))
+
+    for lean in (False, True):
+        start_time = time.time()
+        for _ in range(rounds):
+            for html in pages:
+                ImdbParser().parse_html(html, lean=lean)
+        took = time.time() - start_time
+        log.info('%s parser took %.3f seconds per page' % ('Lean' if lean else 'Full', took / (rounds * len(pages))))
+
+
 @event('options.register')
 def register_parser_arguments():
     perf_parser = options.register_command('perf-test', cli_perf_test)
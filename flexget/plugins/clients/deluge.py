@@ -278,8 +278,13 @@ class InputDeluge(DelugePlugin):
         'upload_payload_rate': 'upload_payload_rate'
     }
 
+    # Keys which don't change once the torrent has its metadata, fetched only for torrents not seen on previous runs
+    static_keys = ('files', 'num_files', 'num_pieces', 'piece_length', 'private')
+
     def __init__(self):
         self.entries = []
+        # Maps (host, port, static keys) -> {torrent id: static values}
+        self.snapshots = {}
 
     schema = {
         'anyOf': [
@@ -309,7 +314,8 @@ class InputDeluge(DelugePlugin):
                             'type': 'string',
                             'enum': list(extra_settings_map)
                         }
-                    }
+                    },
+                    'incremental': {'type': 'boolean', 'default': False}
                 },
                 'additionalProperties': False
             }
@@ -366,11 +372,46 @@ class InputDeluge(DelugePlugin):
                 self.entries.append(entry)
             client.disconnect()
 
+        self.get_torrents_status(client, config, on_get_torrents_status)
+
+    def get_torrents_status(self, client, config, callback):
+        """
+        Calls `callback` with the status of the torrents matching the filter. With `incremental`, the static keys are
+        only fetched for torrents not seen on the previous runs.
+        """
         filter = config.get('filter', {})
+        keys = list(self.settings_map.keys()) + config.get('keys', [])
+        static_keys = [key for key in keys if key in self.static_keys]
+
+        if not config.get('incremental', False) or not static_keys:
+            # deluge client lib chokes on future's newlist, make sure we have a native python list here
+            client.core.get_torrents_status(filter, native(keys)).addCallback(callback)
+            return
+
+        snapshot = self.snapshots.setdefault((config['host'], config['port'], tuple(static_keys)), {})
+
+        def on_get_changing_status(torrents):
+            def on_get_static_status(details):
+                for torrent_id, static in details.items():
+                    # Magnets don't have a file list until they got their metadata
+                    if static.get('files', True):
+                        snapshot[torrent_id] = static
+                for torrent_id in set(snapshot).difference(torrents):
+                    del snapshot[torrent_id]
+                for torrent_id, torrent_dict in torrents.items():
+                    torrent_dict.update(snapshot.get(torrent_id) or details.get(torrent_id, {}))
+                callback(torrents)
+
+            new_ids = [torrent_id for torrent_id in torrents if torrent_id not in snapshot]
+            log.debug('%s torrents in deluge, static keys fetched for %s', len(torrents), len(new_ids))
+            if new_ids:
+                client.core.get_torrents_status({'id': native(new_ids)}, native(static_keys)).addCallback(
+                    on_get_static_status)
+            else:
+                on_get_static_status({})
 
-        # deluge client lib chokes on future's newlist, make sure we have a native python list here
-        client.core.get_torrents_status(filter, native(list(self.settings_map.keys()) + config.get('keys', []))).addCallback(
-            on_get_torrents_status)
+        changing_keys = [key for key in keys if key not in static_keys]
+        client.core.get_torrents_status(filter, native(changing_keys)).addCallback(on_get_changing_status)
 
 
 class OutputDeluge(DelugePlugin):
@@ -751,6 +792,8 @@ class OutputDeluge(DelugePlugin):
             """Gets called with a list of torrent_ids loaded in the deluge session.
             Adds new torrents and modifies the settings for ones already in the session."""
             dlist = []
+            # Loaded torrents getting the same options are changed with one call
+            loaded_opts = {}
             # add the torrents
             for entry in task.accepted:
 
@@ -840,11 +883,13 @@ class OutputDeluge(DelugePlugin):
                     # Entry has a deluge id, verify the torrent is still in the deluge session and apply options
                     # Since this is already loaded in deluge, we may also need to change the path
                     modify_opts['path'] = add_opts.pop('download_location', None)
-                    dlist.extend([set_torrent_options(torrent_id, entry, modify_opts),
-                                  client.core.set_torrent_options([torrent_id], add_opts)])
+                    dlist.append(set_torrent_options(torrent_id, entry, modify_opts))
+                    loaded_opts.setdefault(tuple(sorted(add_opts.items())), []).append(torrent_id)
                 else:
                     dlist.append(add_entry(entry, add_opts).addCallbacks(
                         set_torrent_options, on_fail, callbackArgs=(entry, modify_opts), errbackArgs=(task, entry)))
+            for add_opts, ids in loaded_opts.items():
+                dlist.append(client.core.set_torrent_options(ids, dict(add_opts)))
             return defer.DeferredList(dlist)
 
         dlist.append(client.core.get_session_state().addCallback(on_get_session_state))
@@ -9,6 +9,7 @@ from requests.exceptions import RequestException
 
 from flexget import plugin
 from flexget.event import event
+from flexget.utils.client_pool import get_client, discard_client
 
 log = logging.getLogger('qbittorrent')
 
@@ -51,7 +52,11 @@ class OutputQBitTorrent(object):
     def _request(self, method, url, msg_on_fail=None, **kwargs):
         try:
             response = self.session.request(method, url, **kwargs)
-            if response == 'Fails.':
+            if response.status_code == 403 and url != self.url + '/login':
+                # The login of the shared session expired, log in again next time
+                discard_client('qbittorrent', self.key)
+                msg = 'Not logged in.'
+            elif response == 'Fails.':
                 msg = 'Failure. URL: {}, data: {}'.format(url, kwargs) if not msg_on_fail else msg_on_fail
             else:
                 return response
@@ -65,34 +70,56 @@ class OutputQBitTorrent(object):
         if 'Bypass authentication for localhost' is checked and host is
         'localhost'.
         """
-        self.session = Session()
         self.url = '{}://{}:{}'.format('https' if config['use_ssl'] else 'http', config['host'], config['port'])
+        # The logged in session is shared by all tasks adding to this qBittorrent
+        self.key = (self.url, config.get('username'), config.get('password'))
+        self.session = get_client('qbittorrent', self.key, lambda: self._login(config),
+                                  is_broken=lambda error: isinstance(error, RequestException))
+        self.connected = True
+
+    def _login(self, config):
+        self.session = Session()
         if config.get('username') and config.get('password'):
             data = {'username': config['username'],
                     'password': config['password']}
             self._request('post', self.url + '/login', data=data, msg_on_fail='Authentication failed.',
                                   verify=config['verify_cert'])
         log.debug('Successfully connected to qBittorrent')
-        self.connected = True
+        return self.session
 
     def add_torrent_file(self, file_path, data, verify_cert):
+        self.add_torrent_files([file_path], data, verify_cert)
+
+    def add_torrent_files(self, file_paths, data, verify_cert):
+        """Uploads several torrent files with the same options in one request."""
         if not self.connected:
             raise plugin.PluginError('Not connected.')
-        multipart_data = {k: (None, v) for k, v in data.items()}
-        with open(file_path, 'rb') as f:
-            multipart_data['torrents'] = f
+        multipart_data = [(k, (None, v)) for k, v in data.items()]
+        files = []
+        try:
+            for file_path in file_paths:
+                f = open(file_path, 'rb')
+                files.append(f)
+                multipart_data.append(('torrents', (os.path.basename(file_path), f)))
             self._request('post', self.url + '/command/upload', msg_on_fail='Failed to add file to qBittorrent',
-                                  files=multipart_data, verify=verify_cert)
-        log.debug('Added torrent file %s to qBittorrent', file_path)
+                          files=multipart_data, verify=verify_cert)
+        finally:
+            for f in files:
+                f.close()
+        log.debug('Added torrent files %s to qBittorrent', ', '.join(file_paths))
 
     def add_torrent_url(self, url, data, verify_cert):
+        self.add_torrent_urls([url], data, verify_cert)
+
+    def add_torrent_urls(self, urls, data, verify_cert):
+        """Adds several urls with the same options in one request."""
         if not self.connected:
             raise plugin.PluginError('Not connected.')
-        data['urls'] = url
+        data = dict(data, urls='\n'.join(urls))
         multipart_data = {k: (None, v) for k, v in data.items()}
         self._request('post', self.url + '/command/download', msg_on_fail='Failed to add file to qBittorrent',
-                              files=multipart_data, verify=verify_cert)
-        log.debug('Added url %s to qBittorrent', url)
+                      files=multipart_data, verify=verify_cert)
+        log.debug('Added urls %s to qBittorrent', ', '.join(urls))
 
     def prepare_config(self, config):
         if isinstance(config, bool):
@@ -107,6 +134,9 @@ class OutputQBitTorrent(object):
         return config
 
     def add_entries(self, task, config):
+        # Entries with the same options are added together, files and urls separately
+        files = {}
+        urls = {}
         for entry in task.accepted:
             form_data = {}
             save_path = entry.get('path', config.get('path'))
@@ -141,9 +171,14 @@ class OutputQBitTorrent(object):
                     log.debug('temp: %s', ', '.join(os.listdir(tmp_path)))
                     entry.fail("Downloaded temp file '%s' doesn't exist!?" % entry['file'])
                     continue
-                self.add_torrent_file(entry['file'], form_data, config['verify_cert'])
+                files.setdefault(tuple(sorted(form_data.items())), []).append(entry['file'])
             else:
-                self.add_torrent_url(entry['url'], form_data, config['verify_cert'])
+                urls.setdefault(tuple(sorted(form_data.items())), []).append(entry['url'])
+
+        for form_data, file_paths in files.items():
+            self.add_torrent_files(file_paths, dict(form_data), config['verify_cert'])
+        for form_data, entry_urls in urls.items():
+            self.add_torrent_urls(entry_urls, dict(form_data), config['verify_cert'])
 
     @plugin.priority(120)
     def on_task_download(self, task, config):
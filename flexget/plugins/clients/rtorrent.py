@@ -17,6 +17,7 @@ from flexget.event import event
 from flexget.entry import Entry
 from flexget.config_schema import one_or_more
 from flexget.utils.bittorrent import Torrent, is_torrent_file
+from flexget.utils.client_pool import TimedClient
 from flexget.utils.tools import native_str_to_text
 
 from requests.auth import HTTPDigestAuth, HTTPBasicAuth
@@ -224,6 +225,12 @@ class SCGIServerProxy(object):
         raise AttributeError("Attribute %r not found" % (attr,))
 
 
+# by default rtorrent won't allow calls over 512kb in size
+XMLRPC_SIZE_LIMIT = 524288
+# Room left for the rest of the request, 70kb
+XMLRPC_BUFFER = 71680
+
+
 class RTorrent(object):
     """ rTorrent API client """
 
@@ -302,10 +309,7 @@ class RTorrent(object):
 
         return fields
 
-    def load(self, raw_torrent, fields=None, start=False, mkdir=True):
-
-        if fields is None:
-            fields = {}
+    def _load_params(self, raw_torrent, fields):
         # First param is empty 'target'
         params = ['', xmlrpc_client.Binary(raw_torrent)]
 
@@ -313,6 +317,13 @@ class RTorrent(object):
         for key, val in fields.items():
             # Values must be escaped if within params
             params.append('d.%s.set=%s' % (key, re.escape(native_str(val))))
+        return params
+
+    def load(self, raw_torrent, fields=None, start=False, mkdir=True):
+
+        if fields is None:
+            fields = {}
+        params = self._load_params(raw_torrent, fields)
 
         if mkdir and 'directory' in fields:
             result = self._server.execute.throw('', 'mkdir', '-p', fields['directory'])
@@ -320,8 +331,8 @@ class RTorrent(object):
                 raise xmlrpc_client.Error('Failed creating directory %s' % fields['directory'])
 
         # by default rtorrent won't allow calls over 512kb in size.
-        xmlrpc_size = len(xmlrpc_client.dumps(tuple(params), 'raw_start')) + 71680  # Add 70kb for buffer
-        if xmlrpc_size > 524288:
+        xmlrpc_size = len(xmlrpc_client.dumps(tuple(params), 'raw_start')) + XMLRPC_BUFFER
+        if xmlrpc_size > XMLRPC_SIZE_LIMIT:
             prev_size = self._server.network.xmlrpc.size_limit()
             self._server.network.xmlrpc.size_limit.set('', xmlrpc_size)
 
@@ -331,11 +342,91 @@ class RTorrent(object):
         else:
             result = self._server.load.raw(*params)
 
-        if xmlrpc_size > 524288:
+        if xmlrpc_size > XMLRPC_SIZE_LIMIT:
             self._server.network.xmlrpc.size_limit.set('', prev_size)
 
         return result
 
+    @staticmethod
+    def _multicall_results(multi_call):
+        """Calls `multi_call`, returning the value of each call, or the :class:`xmlrpc_client.Fault` it failed with."""
+        results = []
+        for result in multi_call().results:
+            if isinstance(result, dict):
+                results.append(xmlrpc_client.Fault(result['faultCode'], result['faultString']))
+            else:
+                results.append(result[0])
+        return results
+
+    def load_many(self, torrents, start=False, mkdir=True):
+        """
+        Loads several torrents, packing them into as few `system.multicall` requests as the size limit of rTorrent
+        allows. Torrents too large to share a request are loaded with :meth:`load`.
+
+        :param torrents: List of (raw_torrent, fields) tuples
+        :return: List with the result of loading each torrent, or the :class:`xmlrpc_client.Error` it failed with
+        """
+        results = [None] * len(torrents)
+        failed_dirs = {}
+        if mkdir:
+            directories = sorted(set(fields['directory'] for _, fields in torrents if 'directory' in fields))
+            if directories:
+                multi_call = xmlrpc_client.MultiCall(self._server)
+                for directory in directories:
+                    getattr(multi_call, 'execute.throw')('', 'mkdir', '-p', directory)
+                for directory, result in zip(directories, self._multicall_results(multi_call)):
+                    if result != 0:
+                        failed_dirs[directory] = xmlrpc_client.Error('Failed creating directory %s' % directory)
+
+        method = 'load.raw_start' if start else 'load.raw'
+        batch = []
+        batch_size = XMLRPC_BUFFER
+
+        def send(batch):
+            multi_call = xmlrpc_client.MultiCall(self._server)
+            for _, params in batch:
+                getattr(multi_call, method)(*params)
+            try:
+                batch_results = self._multicall_results(multi_call)
+            except xmlrpc_client.Error as e:
+                batch_results = [e] * len(batch)
+            for (index, _), result in zip(batch, batch_results):
+                results[index] = result
+
+        for index, (raw_torrent, fields) in enumerate(torrents):
+            if fields.get('directory') in failed_dirs:
+                results[index] = failed_dirs[fields['directory']]
+                continue
+            params = self._load_params(raw_torrent, fields)
+            size = len(xmlrpc_client.dumps(tuple(params), method))
+            if size + XMLRPC_BUFFER > XMLRPC_SIZE_LIMIT:
+                try:
+                    results[index] = self.load(raw_torrent, fields=fields, start=start, mkdir=False)
+                except xmlrpc_client.Error as e:
+                    results[index] = e
+                continue
+            if batch and batch_size + size > XMLRPC_SIZE_LIMIT:
+                send(batch)
+                batch = []
+                batch_size = XMLRPC_BUFFER
+            batch.append((index, params))
+            batch_size += size
+        if batch:
+            send(batch)
+        return results
+
+    def existing(self, info_hashes):
+        """:return: Set of the (upper case) info hashes in `info_hashes` loaded in rTorrent, using a single request"""
+        info_hashes = [native_str(info_hash).upper() for info_hash in info_hashes]
+        if not info_hashes:
+            return set()
+        multi_call = xmlrpc_client.MultiCall(self._server)
+        for info_hash in info_hashes:
+            getattr(multi_call, 'd.hash')(info_hash)
+        results = self._multicall_results(multi_call)
+        return set(info_hash for info_hash, result in zip(info_hashes, results)
+                   if not isinstance(result, xmlrpc_client.Fault))
+
     def get_directory(self):
         return self._server.get_directory()
 
@@ -477,15 +568,22 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
         'additionalProperties': False,
     }
 
-    def _verify_load(self, client, info_hash):
-        ex = xmlrpc_client.Error()
+    def _verify_load(self, client, info_hashes):
+        """:return: Set of the `info_hashes` which did not show up in rTorrent"""
+        pending = set(info_hashes)
+        ex = None
         for _ in range(0, 5):
             try:
-                return client.torrent(info_hash, fields=['hash'])
+                pending -= client.existing(pending)
+                ex = None
             except xmlrpc_client.Error as e:
                 ex = e
-                sleep(0.5)
-        raise ex
+            if not pending:
+                break
+            sleep(0.5)
+        if ex:
+            raise ex
+        return pending
 
     @plugin.priority(120)
     def on_task_download(self, task, config):
@@ -498,29 +596,18 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
     @plugin.priority(135)
     def on_task_output(self, task, config):
 
-        client = RTorrent(os.path.expanduser(config['uri']),
-                          username=config.get('username'),
-                          password=config.get('password'),
-                          digest_auth=config['digest_auth'],
-                          session=task.requests)
+        client = TimedClient(RTorrent(os.path.expanduser(config['uri']),
+                                      username=config.get('username'),
+                                      password=config.get('password'),
+                                      digest_auth=config['digest_auth'],
+                                      session=task.requests), 'rtorrent')
 
         try:
-            for entry in task.accepted:
-                if config['action'] == 'add':
-                    if task.options.test:
-                        log.info('Would add %s to rTorrent', entry['url'])
-                        continue
-                    try:
-                        options = self._build_options(config, entry)
-                    except RenderError as e:
-                        entry.fail("failed to render properties %s" % str(e))
-                        continue
-
-                    # fast_resume is not really an rtorrent option so it's not in _build_options
-                    fast_resume = entry.get('fast_resume', config['fast_resume'])
-                    self.add_entry(client, entry, options, start=config['start'], mkdir=config['mkdir'],
-                                   fast_resume=fast_resume)
+            if config['action'] == 'add':
+                self.add_entries(client, task, config)
+                return
 
+            for entry in task.accepted:
                 info_hash = entry.get('torrent_info_hash')
 
                 if not info_hash:
@@ -589,7 +676,72 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
             entry.fail('Failed to update: %s' % str(e))
             return
 
-    def add_entry(self, client, entry, options, start=True, mkdir=False, fast_resume=False):
+    def add_entries(self, client, task, config):
+        """
+        Adds the accepted entries with a handful of requests: one checking which torrents are already loaded, the loads
+        packed into multicalls and one checking they all showed up.
+        """
+        to_add = []
+        for entry in task.accepted:
+            if task.options.test:
+                log.info('Would add %s to rTorrent', entry['url'])
+                continue
+            try:
+                options = self._build_options(config, entry)
+            except RenderError as e:
+                entry.fail("failed to render properties %s" % str(e))
+                continue
+
+            # fast_resume is not really an rtorrent option so it's not in _build_options
+            fast_resume = entry.get('fast_resume', config['fast_resume'])
+            torrent_raw = self.torrent_data(client, entry, options, fast_resume=fast_resume)
+            if torrent_raw is not None:
+                to_add.append((entry, torrent_raw, options))
+        if not to_add:
+            return
+
+        # First check which ones already exist
+        try:
+            existing = client.existing(entry['torrent_info_hash'] for entry, _, _ in to_add)
+        except xmlrpc_client.Error:
+            existing = set()
+        loading = []
+        for entry, torrent_raw, options in to_add:
+            if entry['torrent_info_hash'].upper() in existing:
+                log.warning("Torrent %s already exists, won't add" % entry['title'])
+            else:
+                loading.append((entry, torrent_raw, options))
+        if not loading:
+            return
+
+        results = client.load_many([(torrent_raw, options) for _, torrent_raw, options in loading],
+                                   start=config['start'], mkdir=config['mkdir'])
+        loaded = []
+        for (entry, _, _), resp in zip(loading, results):
+            if isinstance(resp, xmlrpc_client.Error):
+                log.error('Failed to add %s to rTorrent: %s', entry['title'], resp)
+                entry.fail('Failed to add to rTorrent %s' % str(resp))
+                continue
+            if resp != 0:
+                entry.fail('Failed to add to rTorrent invalid return value %s' % resp)
+                continue
+            loaded.append(entry)
+
+        # Verify the torrents loaded
+        try:
+            missing = self._verify_load(client, [entry['torrent_info_hash'].upper() for entry in loaded])
+        except xmlrpc_client.Error as e:
+            for entry in loaded:
+                entry.fail('Failed to verify torrent loaded: %s' % str(e))
+            return
+        for entry in loaded:
+            if entry['torrent_info_hash'].upper() in missing:
+                entry.fail('Failed to verify torrent loaded: not found in rTorrent')
+            else:
+                log.info('%s added to rtorrent' % entry['title'])
+
+    def torrent_data(self, client, entry, options, fast_resume=False):
+        """:return: Raw torrent to load for `entry`, or None if the entry was failed"""
 
         if 'torrent_info_hash' not in entry:
             entry.fail('missing torrent_info_hash')
@@ -607,8 +759,12 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
             if not os.path.exists(entry['file']):
                 raise plugin.PluginError('Temporary download file is missing from disk')
 
-            # Verify valid torrent file
-            if not is_torrent_file(entry['file']):
+            # Verify valid torrent file, the download plugin already sniffed the type of files it downloaded
+            if 'file_type' in entry:
+                is_torrent = entry['file_type'] == 'torrent'
+            else:
+                is_torrent = is_torrent_file(entry['file'])
+            if not is_torrent:
                 entry.fail("Downloaded temp file '%s' is not a torrent file" % entry['file'])
                 return
 
@@ -653,30 +809,7 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
                 entry.fail('Strange, unable to decode torrent, raise a BUG: %s' % str(e))
                 return
 
-        # First check if it already exists
-        try:
-            if client.torrent(entry['torrent_info_hash']):
-                log.warning("Torrent %s already exists, won't add" % entry['title'])
-                return
-        except xmlrpc_client.Error:
-            # No existing found
-            pass
-
-        try:
-            resp = client.load(torrent_raw, fields=options, start=start, mkdir=mkdir)
-            if resp != 0:
-                entry.fail('Failed to add to rTorrent invalid return value %s' % resp)
-        except xmlrpc_client.Error as e:
-            log.exception(e)
-            entry.fail('Failed to add to rTorrent %s' % str(e))
-            return
-
-        # Verify the torrent loaded
-        try:
-            self._verify_load(client, entry['torrent_info_hash'])
-            log.info('%s added to rtorrent' % entry['title'])
-        except xmlrpc_client.Error as e:
-            entry.fail('Failed to verify torrent loaded: %s' % str(e))
+        return torrent_raw
 
     def on_task_learn(self, task, config):
         """ Make sure all temp files are cleaned up when entries are learned """
@@ -704,11 +837,11 @@ class RTorrentInputPlugin(RTorrentPluginBase):
     }
 
     def on_task_input(self, task, config):
-        client = RTorrent(os.path.expanduser(config['uri']),
-                          username=config.get('username'),
-                          password=config.get('password'),
-                          digest_auth=config['digest_auth'],
-                          session=task.requests)
+        client = TimedClient(RTorrent(os.path.expanduser(config['uri']),
+                                      username=config.get('username'),
+                                      password=config.get('password'),
+                                      digest_auth=config['digest_auth'],
+                                      session=task.requests), 'rtorrent')
 
         fields = config.get('fields')
 
@@ -8,12 +8,13 @@ import posixpath
 import time
 from functools import partial
 from collections import namedtuple
-from itertools import groupby
 
 from flexget import plugin
 from flexget.event import event
 from flexget.entry import Entry
 from flexget.config_schema import one_or_more
+from flexget.utils.client_pool import ConnectionPool
+from flexget.utils.parallel import WorkQueue
 from flexget.utils.template import render_from_entry, RenderError
 
 log = logging.getLogger('sftp')
@@ -26,6 +27,8 @@ CONNECT_TRIES = 3
 RETRY_INTERVAL = 15
 RETRY_STEP = 5
 SOCKET_TIMEOUT = 15
+# bytes read from a remote file at once
+DOWNLOAD_BLOCK_SIZE = 32768
 
 # make separate path instances for local vs remote path styles
 localpath = os.path
@@ -286,12 +289,16 @@ class SftpDownload(object):
                         metainfo_series or similar.
     recursive:          Indicates wether to download directory contents recursively.
     delete_origin:      Indicates wether to delete the remote files(s) once they've been downloaded.
+    concurrency:        Number of files downloaded at the same time, each over its own connection. Defaults to 1.
+
+    Files are downloaded into a `.part` file first, an interrupted download is resumed from there on the next run.
 
     Example:
 
       sftp_download:
           to: '/Volumes/External/Drobo/downloads'
           delete_origin: False
+          concurrency: 4
     """
 
     schema = {
@@ -299,7 +306,8 @@ class SftpDownload(object):
         'properties': {
             'to': {'type': 'string', 'format': 'path'},
             'recursive': {'type': 'boolean', 'default': True},
-            'delete_origin': {'type': 'boolean', 'default': False}
+            'delete_origin': {'type': 'boolean', 'default': False},
+            'concurrency': {'type': 'integer', 'minimum': 1, 'default': 1}
         },
         'required': ['to'],
         'additionalProperties': False
@@ -328,32 +336,59 @@ class SftpDownload(object):
 
         return config
 
-    def download_file(self, path, dest, sftp, delete_origin):
+    def download_file(self, job, delete_origin):
         """
-        Download a file from path to dest
+        Download a file from path to destination, resuming a partial download left by an earlier attempt
         """
-        dir_name = remotepath.dirname(path)
-        dest_relpath = localpath.join(*remotepath.split(path))  # convert remote path style to local style
-        destination = localpath.join(dest, dest_relpath)
+        entry, pool, path, destination = job
         dest_dir = localpath.dirname(destination)
+        partial_destination = destination + '.part'
 
         if localpath.exists(destination):
             log.verbose('Destination file already exists. Skipping %s' % path)
             return
 
         if not localpath.exists(dest_dir):
-            os.makedirs(dest_dir)
+            try:
+                os.makedirs(dest_dir)
+            except OSError:
+                # Created by another worker meanwhile
+                if not localpath.isdir(dest_dir):
+                    raise
 
         log.verbose('Downloading file %s to %s' % (path, destination))
 
-        try:
-            sftp.get(path, destination)
-        except Exception as e:
-            log.error('Failed to download %s (%s)' % (path, e))
-            if localpath.exists(destination):
-                log.debug('Removing partially downloaded file %s' % destination)
-                os.remove(destination)
-            raise e
+        tries = CONNECT_TRIES
+        while True:
+            sftp = pool.get()
+            try:
+                size = sftp.stat(path).st_size
+                offset = localpath.getsize(partial_destination) if localpath.exists(partial_destination) else 0
+                if offset > size:
+                    # Not the same file anymore
+                    offset = 0
+                if offset:
+                    log.debug('Resuming %s at %s bytes' % (path, offset))
+                with sftp.open(path, 'rb') as remote_file, open(partial_destination, 'ab' if offset else 'wb') as f:
+                    remote_file.seek(offset)
+                    # Request the following blocks before they are read instead of one round trip per block
+                    remote_file.prefetch(size)
+                    while True:
+                        data = remote_file.read(DOWNLOAD_BLOCK_SIZE)
+                        if not data:
+                            break
+                        f.write(data)
+            except Exception as e:
+                pool.discard(sftp)
+                if not tries:
+                    log.error('Failed to download %s (%s)' % (path, e))
+                    raise
+                log.debug('Retrying download of %s after error: %s' % (path, e))
+                tries -= 1
+                time.sleep(RETRY_INTERVAL)
+                continue
+            os.rename(partial_destination, destination)
+            break
 
         if delete_origin:
             log.debug('Deleting remote file %s' % path)
@@ -361,15 +396,7 @@ class SftpDownload(object):
                 sftp.remove(path)
             except Exception as e:
                 log.error('Failed to delete file %s (%s)' % (path, e))
-                return
-
-            self.remove_dir(sftp, dir_name)
-
-    def handle_dir(self, path):
-        """
-        Dummy directory handler. Does nothing.
-        """
-        pass
+        pool.put(sftp)
 
     def handle_unknown(self, path):
         """
@@ -388,14 +415,16 @@ class SftpDownload(object):
             except Exception as e:
                 log.error('Failed to delete directory %s (%s)' % (path, e))
 
-    def download_entry(self, entry, config, sftp):
+    def walk_entry(self, entry, config, sftp, pool, downloads):
         """
-        Downloads the file(s) described in entry
+        Queues the file(s) described in entry for download
+
+        :return: Remote directories of the entry, deepest first, to remove once their files were downloaded
         """
 
-        path = urlparse(entry['url']).path or '.'
-        delete_origin = config['delete_origin']
+        path = sftp.normalize(urlparse(entry['url']).path or '.')
         recursive = config['recursive']
+        directories = []
 
         to = config['to']
         if to:
@@ -404,41 +433,35 @@ class SftpDownload(object):
             except RenderError as e:
                 log.error('Could not render path: %s' % to)
                 entry.fail(e)
-                return
+                return directories
+
+        def destination(file_path):
+            # convert remote path style to local style
+            return localpath.join(to, *remotepath.relpath(file_path, base_path).split('/'))
+
+        def handle_file(file_path):
+            downloads.put((entry, pool, file_path, destination(file_path)))
 
         if not sftp.lexists(path):
             log.error('Remote path does not exist: %s' % path)
-            return
+            return directories
 
+        base_path = remotepath.dirname(path)
         if sftp.isfile(path):
-            source_file = remotepath.basename(path)
-            source_dir = remotepath.dirname(path)
-            try:
-                sftp.cwd(source_dir)
-                self.download_file(source_file, to, sftp, delete_origin)
-            except Exception as e:
-                error = 'Failed to download file %s (%s)' % (path, e)
-                log.error(error)
-                entry.fail(error)
+            handle_file(path)
         elif sftp.isdir(path):
-            base_path = remotepath.normpath(remotepath.join(path, '..'))
-            dir_name = remotepath.basename(path)
-            handle_file = partial(self.download_file, dest=to, sftp=sftp, delete_origin=delete_origin)
-
             try:
-                sftp.cwd(base_path)
-                sftp.walktree(dir_name, handle_file, self.handle_dir, self.handle_unknown, recursive)
+                sftp.walktree(path, handle_file, directories.append, self.handle_unknown, recursive)
             except Exception as e:
                 error = 'Failed to download directory %s (%s)' % (path, e)
                 log.error(error)
                 entry.fail(error)
-
-                return
-
-            if delete_origin:
-                self.remove_dir(sftp, path)
+                return []
+            directories.reverse()
+            directories.append(path)
         else:
             log.warning('Skipping unknown file %s' % path)
+        return directories
 
     def on_task_download(self, task, config):
         """
@@ -446,26 +469,61 @@ class SftpDownload(object):
         """
         dependency_check()
 
-        # Download entries by host so we can reuse the connection
-        for sftp_config, entries in groupby(task.accepted, self.get_sftp_config):
-            if not sftp_config:
-                continue
-
-            error_message = None
-            sftp = None
-            try:
-                sftp = sftp_connect(sftp_config)
-            except Exception as e:
-                error_message = 'Failed to connect to %s (%s)' % (sftp_config.host, e)
-                log.error(error_message)
-
-            for entry in entries:
-                if sftp:
-                    self.download_entry(entry, config, sftp)
-                else:
+        # Entries of the same host share a pool of connections. Files are downloaded by `concurrency` workers while
+        # the remote directories of the entries are still being walked.
+        pools = {}
+        downloads = WorkQueue(partial(self.download_file, delete_origin=config['delete_origin']),
+                              workers=config['concurrency'], name='sftp')
+        walked = []
+        try:
+            for entry in task.accepted:
+                sftp_config = self.get_sftp_config(entry)
+                if not sftp_config:
+                    continue
+                if sftp_config not in pools:
+                    pools[sftp_config] = ConnectionPool(partial(sftp_connect, sftp_config), self.check_alive,
+                                                        self.sftp_close)
+                pool = pools[sftp_config]
+                try:
+                    sftp = pool.get()
+                except Exception as e:
+                    error_message = 'Failed to connect to %s (%s)' % (sftp_config.host, e)
+                    log.error(error_message)
                     entry.fail(error_message)
-            if sftp:
-                sftp.close()
+                    continue
+                try:
+                    walked.append((entry, pool, self.walk_entry(entry, config, sftp, pool, downloads)))
+                finally:
+                    pool.put(sftp)
+
+            failed = {}
+            for (entry, _, path, _), error in downloads.join():
+                failed.setdefault(entry, 'Failed to download file %s (%s)' % (path, error))
+            for entry, pool, directories in walked:
+                if entry in failed:
+                    entry.fail(failed[entry])
+                elif config['delete_origin'] and directories:
+                    sftp = pool.get()
+                    for directory in directories:
+                        self.remove_dir(sftp, directory)
+                    pool.put(sftp)
+        finally:
+            # When walking failed the workers are still waiting for more files, stop them before closing their pools
+            downloads.stop()
+            for pool in pools.values():
+                pool.close()
+
+    @staticmethod
+    def check_alive(sftp):
+        try:
+            sftp.normalize('.')
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def sftp_close(sftp):
+        sftp.close()
 
 
 class SftpUpload(object):
@@ -16,6 +16,7 @@ from netrc import netrc, NetrcParseError
 from flexget import plugin, validator
 from flexget.entry import Entry
 from flexget.event import event
+from flexget.utils.client_pool import get_client
 from flexget.utils.template import RenderError
 from flexget.utils.pathscrub import pathscrub
 from flexget.utils.tools import parse_timedelta
@@ -69,6 +70,16 @@ class TransmissionBase(object):
         return config
 
     def create_rpc_client(self, config):
+        """Returns a client connected to transmission, shared with the other tasks using the same one"""
+        key = (config['host'], config['port'], config.get('username'), config.get('password'))
+        return get_client('transmission', key, lambda: self._connect(config), is_broken=self._connection_error)
+
+    @staticmethod
+    def _connection_error(error):
+        """True for errors talking to transmission, as opposed to transmission refusing a request"""
+        return isinstance(error, TransmissionError) and error.original is not None
+
+    def _connect(self, config):
         user, password = config.get('username'), config.get('password')
 
         try:
@@ -146,6 +157,17 @@ class TransmissionBase(object):
 
 
 class PluginTransmissionInput(TransmissionBase):
+    # Fields the entries are made of, cheap to fetch for all torrents. When none of them changed since the previous
+    # run, a torrent is taken from the snapshot instead of fetching its files and trackers again.
+    probe_fields = ['id', 'hashString', 'name', 'totalSize', 'sizeWhenDone', 'percentDone', 'status', 'activityDate',
+                    'isFinished', 'uploadRatio', 'downloadDir', 'seedRatioMode', 'seedRatioLimit', 'seedIdleMode',
+                    'seedIdleLimit']
+    detail_fields = ['torrentFile', 'comment', 'isPrivate', 'trackers', 'files', 'priorities', 'wanted']
+
+    def __init__(self):
+        TransmissionBase.__init__(self)
+        # Maps (host, port) -> {hashString: (probed values, torrent)} of the previous run
+        self.snapshots = {}
 
     def validator(self):
         """Return config validator"""
@@ -154,13 +176,41 @@ class PluginTransmissionInput(TransmissionBase):
         advanced = root.accept('dict')
         self._validator(advanced)
         advanced.accept('boolean', key='onlycomplete')
+        advanced.accept('boolean', key='incremental')
         return root
 
     def prepare_config(self, config):
         config = TransmissionBase.prepare_config(self, config)
         config.setdefault('onlycomplete', True)
+        config.setdefault('incremental', False)
         return config
 
+    def get_torrents(self, config):
+        """
+        Returns all torrents with the fields needed to make entries of them. With `incremental`, only the cheap probe
+        fields are fetched for all torrents, details are fetched just for the torrents which changed since last run.
+        """
+        fields = self.probe_fields + self.detail_fields
+        if not config['incremental']:
+            return self.client.get_torrents(arguments=fields)
+        snapshot = self.snapshots.get((config['host'], config['port']), {})
+        torrents = {}
+        changed = []
+        for probe in self.client.get_torrents(arguments=self.probe_fields):
+            values = tuple(getattr(probe, field) for field in self.probe_fields)
+            previous = snapshot.get(probe.hashString)
+            if previous and previous[0] == values:
+                torrents[probe.hashString] = previous
+            else:
+                changed.append((probe.id, values))
+        if changed:
+            probed = dict(changed)
+            for torrent in self.client.get_torrents([torrent_id for torrent_id, _ in changed], arguments=fields):
+                torrents[torrent.hashString] = (probed[torrent.id], torrent)
+        log.debug('%s torrents in transmission, details fetched for %s', len(torrents), len(changed))
+        self.snapshots[(config['host'], config['port'])] = torrents
+        return [torrent for _, torrent in torrents.values()]
+
     def on_task_input(self, task, config):
         config = self.prepare_config(config)
         if not config['enabled']:
@@ -177,7 +227,7 @@ class PluginTransmissionInput(TransmissionBase):
 
         session = self.client.get_session()
 
-        for torrent in self.client.get_torrents():
+        for torrent in self.get_torrents(config):
             downloaded, bigfella = self.torrent_info(torrent, config)
             seed_ratio_ok, idle_limit_ok = self.check_seed_limits(torrent, session)
             if not config['onlycomplete'] or (downloaded and
@@ -383,7 +433,22 @@ class PluginTransmission(TransmissionBase):
         return options
 
     def add_to_transmission(self, cli, task, config):
-        """Adds accepted entries to transmission """
+        """
+        Adds accepted entries to transmission
+
+        Torrents are added one by one, but the changes made to them afterwards are batched: torrents getting the same
+        settings are changed with a single request, and all of them are started or stopped together.
+        """
+        session = []
+
+        def get_session():
+            # Fetched at most once per task
+            if not session:
+                session.append(cli.get_session())
+            return session[0]
+
+        # (entry, torrent id, options) of the added torrents
+        added = []
         for entry in task.accepted:
             if task.options.test:
                 log.info('Would add %s to transmission' % entry['url'])
@@ -417,8 +482,6 @@ class PluginTransmission(TransmissionBase):
 
                 log.info('"%s" torrent added to transmission', entry['title'])
 
-                total_size = cli.get_torrent(r.id, ['id', 'totalSize']).totalSize
-
                 def _filter_list(list):
                     for item in list:
                         if not isinstance(item, basestring):
@@ -454,6 +517,8 @@ class PluginTransmission(TransmissionBase):
                 # We need to index the files if any of the following are defined
                 if find_main_file or skip_files:
                     fl = cli.get_files(r.id)
+                    # The size is only needed to find the main file
+                    total_size = cli.get_torrent(r.id, ['id', 'totalSize']).totalSize if find_main_file else 0
 
                     if ('magnetization_timeout' in options['post'] and
                         options['post']['magnetization_timeout'] > 0 and
@@ -465,7 +530,7 @@ class PluginTransmission(TransmissionBase):
                         if len(fl[r.id]) == 0:
                             log.warning('"%s" did not magnetize before the timeout elapsed, '
                                         'file list unavailable for processing.', entry['title'])
-                        else:
+                        elif find_main_file:
                             total_size = cli.get_torrent(r.id, ['id', 'totalSize']).totalSize
 
                     # Find files based on config
@@ -519,7 +584,7 @@ class PluginTransmission(TransmissionBase):
                     # If we have a main file and want to rename it and associated files
                     if 'content_filename' in options['post'] and main_id is not None:
                         if 'download_dir' not in options['add']:
-                            download_dir = cli.get_session().download_dir
+                            download_dir = get_session().download_dir
                         else:
                             download_dir = options['add']['download_dir']
 
@@ -566,27 +631,67 @@ class PluginTransmission(TransmissionBase):
                             log.debug('Downloading %s of %s files in torrent.',
                                       len(options['change']['files_wanted']), len(full_list))
 
-                # Set any changed file properties
-                if list(options['change'].keys()):
-                    cli.change_torrent(r.id, 30, **options['change'])
-
-                # if addpaused was defined and set to False start the torrent;
-                # prevents downloading data before we set what files we want
-                if ('paused' in options['post'] and not options['post']['paused'] or
-                        'paused' not in options['post'] and cli.get_session().start_added_torrents):
-                    cli.start_torrent(r.id)
-                elif options['post'].get('paused'):
-                    log.debug('sleeping 5s to stop the torrent...')
-                    time.sleep(5)
-                    cli.stop_torrent(r.id)
-                    log.info('Torrent "%s" stopped because of addpaused=yes', entry['title'])
+                added.append((entry, r.id, options))
 
             except TransmissionError as e:
-                log.debug('TransmissionError', exc_info=True)
-                log.debug('Failed options dict: %s', options)
-                msg = 'TransmissionError: %s' % e.message or 'N/A'
-                log.error(msg)
-                entry.fail(msg)
+                self._fail_entries([(entry, options)], e)
+
+        # Set any changed file properties, torrents with the same changes at once. Wanted files are given by their
+        # index in each torrent, so those changes can't be shared.
+        changes = {}
+        for entry, torrent_id, options in added:
+            change = options['change']
+            if not change:
+                continue
+            if 'files_wanted' in change or 'files_unwanted' in change:
+                key = torrent_id
+            else:
+                key = tuple(sorted(change.items()))
+            changes.setdefault(key, (change, []))[1].append((entry, torrent_id, options))
+        failed = set()
+        for change, torrents in changes.values():
+            try:
+                cli.change_torrent([torrent_id for _, torrent_id, _ in torrents], 30, **change)
+            except TransmissionError as e:
+                self._fail_entries([(entry, options) for entry, _, options in torrents], e)
+                failed.update(torrent_id for _, torrent_id, _ in torrents)
+
+        # if addpaused was defined and set to False start the torrent;
+        # prevents downloading data before we set what files we want
+        start = []
+        stop = []
+        for entry, torrent_id, options in added:
+            if torrent_id in failed:
+                continue
+            if ('paused' in options['post'] and not options['post']['paused'] or
+                    'paused' not in options['post'] and get_session().start_added_torrents):
+                start.append((entry, torrent_id, options))
+            elif options['post'].get('paused'):
+                stop.append((entry, torrent_id, options))
+        if start:
+            try:
+                cli.start_torrent([torrent_id for _, torrent_id, _ in start])
+            except TransmissionError as e:
+                self._fail_entries([(entry, options) for entry, _, options in start], e)
+        if stop:
+            log.debug('sleeping 5s to stop the torrents...')
+            time.sleep(5)
+            try:
+                cli.stop_torrent([torrent_id for _, torrent_id, _ in stop])
+            except TransmissionError as e:
+                self._fail_entries([(entry, options) for entry, _, options in stop], e)
+            else:
+                for entry, _, _ in stop:
+                    log.info('Torrent "%s" stopped because of addpaused=yes', entry['title'])
+
+    def _fail_entries(self, entries, error):
+        """Fails all the (entry, options) in `entries` because of `error`."""
+        log.debug('TransmissionError', exc_info=True)
+        msg = 'TransmissionError: %s' % error.message or 'N/A'
+        log.error(msg)
+        for entry, options in entries:
+            log.debug('Failed options dict: %s', options)
+            entry.fail(msg)
 
     def on_task_learn(self, task, config):
         """ Make sure all temp files are cleaned up when entries are learned """
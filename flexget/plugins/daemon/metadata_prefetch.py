@@ -0,0 +1,213 @@
+"""
+Background refresh of the cached series metadata when running as a daemon.
+
+The tvdb, tvmaze and trakt lookups refresh expired cache rows while a task is running, the first time an entry of that
+series needs the metadata. When enabled with the `metadata_prefetch` config key, the daemon instead refreshes the
+cached metadata of the series configured in any task ahead of its expiry, every `interval`, so the lookups made by the
+tasks find it fresh. Only series which have
+already been looked up with a service are refreshed from that service, the ones expiring soonest first, with at most
+`requests` refreshes per round.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import func
+
+from flexget.config_schema import register_config_key
+from flexget.event import event
+from flexget.manager import Session
+from flexget.plugins.filter.series import Series
+from flexget.plugins.internal.api_trakt import TraktShow, TraktShowSearchResult, get_trakt
+from flexget.plugins.internal.api_tvdb import TVDBSeries, TVDBSearchResult, mark_expired
+from flexget.plugins.internal.api_tvmaze import TVMazeSeries, TVMazeLookup, get_show
+from flexget.utils.tools import chunked, parse_timedelta
+
+log = logging.getLogger('metadata_prefetch')
+
+schema = {
+    'oneOf': [
+        {'type': 'boolean'},
+        {
+            'type': 'object',
+            'properties': {
+                'interval': {'type': 'string', 'format': 'interval'},
+                'requests': {'type': 'integer', 'minimum': 1},
+                'ahead': {'type': 'string', 'format': 'interval'}
+            },
+            'additionalProperties': False
+        }
+    ]
+}
+
+prefetcher = None
+
+
+def prepare_config(config):
+    if config is False:
+        return
+    if not isinstance(config, dict):
+        config = {}
+    config.setdefault('interval', '1 hour')
+    config.setdefault('requests', 30)
+    config.setdefault('ahead', '1 day')
+    return config
+
+
+def configured_series(session):
+    """:return: Lowercase names of the series configured in any task"""
+    return [name.lower() for name, in session.query(Series.name).filter(Series.in_tasks.any())]
+
+
+def _cached(session, model, name_column, search_column, names):
+    """
+    :return: Cached series of `model` which match one of `names` by their `name_column`, or through a previous search
+        stored in `search_column`
+    """
+    search_model = search_column.class_
+    found = set()
+    for chunk in chunked(names):
+        found.update(session.query(model).filter(func.lower(name_column).in_(chunk)))
+        found.update(session.query(model).join(search_model.series).filter(search_column.in_(chunk)))
+    return list(found)
+
+
+def tvdb_expiring(session, names, horizon):
+    # tvdb series don't expire after some time, they get marked as expired when tvdb lists them as updated
+    mark_expired(session)
+    now = datetime.now()
+    cached = _cached(session, TVDBSeries, TVDBSeries.name, TVDBSearchResult.search, names)
+    return [(now, series.id) for series in cached if series.expired]
+
+
+def tvdb_refresh(session, tvdb_id):
+    series = session.query(TVDBSeries).get(tvdb_id)
+    session.merge(TVDBSeries(series.id, series.language))
+    return series.name
+
+
+def tvmaze_expiring(session, names, horizon):
+    cached = _cached(session, TVMazeSeries, TVMazeSeries.name, TVMazeLookup.search_name, names)
+    return [(series.expires or datetime.min, series.tvmaze_id) for series in cached
+            if not series.expires or series.expires <= horizon]
+
+
+def tvmaze_refresh(session, tvmaze_id):
+    series = session.query(TVMazeSeries).get(tvmaze_id)
+    series.update(get_show(tvmaze_id=tvmaze_id), session)
+    return series.name
+
+
+def trakt_expiring(session, names, horizon):
+    cached = _cached(session, TraktShow, TraktShow.title, TraktShowSearchResult.search, names)
+    return [(series.expires or datetime.min, series.id) for series in cached
+            if not series.expires or series.expires <= horizon]
+
+
+def trakt_refresh(session, trakt_id):
+    series = session.query(TraktShow).get(trakt_id)
+    series.update(get_trakt('show', trakt_id=trakt_id), session)
+    return series.title
+
+
+# Name, function returning (expires, id) of the cached series expiring before a time, function refreshing one of them
+SOURCES = [
+    ('tvdb', tvdb_expiring, tvdb_refresh),
+    ('tvmaze', tvmaze_expiring, tvmaze_refresh),
+    ('trakt', trakt_expiring, trakt_refresh),
+]
+
+
+def prefetch(config):
+    """
+    Refreshes the cached metadata of the configured series expiring within `ahead`, at most `requests` of them.
+
+    :return: Amount of refreshed series
+    """
+    horizon = datetime.now() + parse_timedelta(config['ahead'])
+    expiring = []
+    with Session() as session:
+        names = configured_series(session)
+        if not names:
+            return 0
+        for source, find_expiring, refresh in SOURCES:
+            try:
+                expiring.extend((expires, source, refresh, ident)
+                                for expires, ident in find_expiring(session, names, horizon))
+            except Exception as e:
+                log.error('Could not check %s metadata for expiry: %s', source, e)
+    expiring.sort(key=lambda item: (item[0], item[1]))
+    log.debug('%s cached series of %s configured ones expire before %s', len(expiring), len(names), horizon)
+
+    refreshed = 0
+    for expires, source, refresh, ident in expiring[:config['requests']]:
+        try:
+            with Session() as session:
+                name = refresh(session, ident)
+        except LookupError as e:
+            log.warning('Could not refresh %s metadata of series %s: %s', source, ident, e.args[0] if e.args else e)
+            continue
+        except Exception:
+            log.exception('Unexpected error refreshing %s metadata of series %s', source, ident)
+            continue
+        log.debug('Refreshed %s metadata of %s', source, name)
+        refreshed += 1
+    if expiring:
+        log.verbose('Refreshed metadata of %s series, %s more expiring soon', refreshed,
+                    max(len(expiring) - config['requests'], 0))
+    return refreshed
+
+
+class MetadataPrefetcher(threading.Thread):
+    """Thread running :func:`prefetch` every `interval` until stopped."""
+
+    def __init__(self, config):
+        super(MetadataPrefetcher, self).__init__(name='metadata_prefetch')
+        self.daemon = True
+        self.config = config
+        self.stopped = threading.Event()
+
+    def run(self):
+        interval = parse_timedelta(self.config['interval']).total_seconds()
+        while not self.stopped.wait(interval):
+            try:
+                prefetch(self.config)
+            except Exception:
+                log.exception('Metadata prefetch failed')
+
+    def stop(self):
+        self.stopped.set()
+
+
+@event('manager.daemon.started')
+@event('manager.config_updated')
+def start_prefetcher(manager):
+    global prefetcher
+    if not manager.is_daemon:
+        return
+    config = prepare_config(manager.config.get('metadata_prefetch', False))
+    if prefetcher:
+        if config == prefetcher.config:
+            return
+        stop_prefetcher(manager)
+    if config:
+        log.debug('Refreshing series metadata every %s', config['interval'])
+        prefetcher = MetadataPrefetcher(config)
+        prefetcher.start()
+
+
+@event('manager.shutdown_requested')
+@event('manager.shutdown')
+def stop_prefetcher(manager):
+    global prefetcher
+    if prefetcher:
+        prefetcher.stop()
+        prefetcher = None
+
+
+@event('config.register')
+def register_config():
+    register_config_key('metadata_prefetch', schema)
@@ -9,10 +9,10 @@ from sqlalchemy import desc, func
 from flexget import plugin
 from flexget.event import event
 from flexget.manager import Session
-from flexget.utils.tools import multiply_timedelta
+from flexget.utils.tools import multiply_timedelta, chunked
 
 try:
-    from flexget.plugins.filter.series import Series, Episode
+    from flexget.plugins.filter.series import Series, Episode, normalize_series_name
 except ImportError:
     raise plugin.DependencyError(issued_by='est_released_series', missing='series plugin', silent=True)
 
@@ -21,40 +21,106 @@ log = logging.getLogger('est_series_internal')
 
 class EstimatesSeriesInternal(object):
 
+    @staticmethod
+    def _last_episodes(series, session):
+        """Returns the last two episodes of the latest season of `series`, or None if they can't be used to guess."""
+        episodes = (session.query(Episode).join(Episode.series).
+                    filter(Episode.season != None).
+                    filter(Series.id == series.id).
+                    filter(Episode.season == func.max(Episode.season).select()).
+                    order_by(desc(Episode.number)).limit(2).all())
+        return EstimatesSeriesInternal._usable([(e.season, e.number, e.first_seen) for e in episodes])
+
+    @staticmethod
+    def _usable(episodes):
+        """
+        :param episodes: (season, number, first_seen) of the last two episodes, latest first
+        :return: Season of the last episode and first_seen of both, or None if they can't be used to guess
+        """
+        if len(episodes) < 2:
+            return
+        # If last two eps were not contiguous, don't guess
+        if episodes[0][1] != episodes[1][1] + 1:
+            return
+        # If first_seen in None, return
+        if episodes[0][2] is None or episodes[1][2] is None:
+            return
+        return episodes[0][0], episodes[0][2], episodes[1][2]
+
+    @staticmethod
+    def _last_episodes_many(series_ids, session):
+        """
+        Same as :meth:`_last_episodes` for many series, with one query per chunk of series.
+
+        :return: Dict of series id -> result of :meth:`_last_episodes`
+        """
+        # The season compared with is the same for all series, see _last_episodes
+        max_season = session.query(func.max(Episode.season)).scalar()
+        episodes = {}
+        for chunk in chunked(series_ids):
+            query = (session.query(Episode.series_id, Episode.season, Episode.number, Episode.first_seen).
+                     filter(Episode.series_id.in_(chunk)).
+                     filter(Episode.season == max_season).
+                     order_by(Episode.series_id, desc(Episode.number)))
+            for series_id, season, number, first_seen in query:
+                last = episodes.setdefault(series_id, [])
+                if len(last) < 2:
+                    last.append((season, number, first_seen))
+        return dict((series_id, EstimatesSeriesInternal._usable(episodes.get(series_id, [])))
+                    for series_id in series_ids)
+
+    @staticmethod
+    def _estimate(entry, last_episodes):
+        if not last_episodes:
+            return
+        last_season, last_seen, previous_seen = last_episodes
+        last_diff = last_seen - previous_seen
+        # If last eps were grabbed close together, we might be catching up, don't guess
+        # Or, if last eps were too far apart, don't guess
+        # TODO: What range?
+        if last_diff < timedelta(days=2) or last_diff > timedelta(days=10):
+            return
+        # Estimate next season somewhat more than a normal episode break
+        if entry['series_season'] > last_season:
+            # TODO: How big should this be?
+            return last_seen + multiply_timedelta(last_diff, 2)
+        # Estimate next episode comes out about same length as last ep span, with a little leeway
+        return last_seen + multiply_timedelta(last_diff, 0.9)
+
+    @staticmethod
+    def _can_estimate(entry):
+        return all(field in entry for field in ['series_name', 'series_season', 'series_episode'])
+
     @plugin.priority(0)  # Should always be last priority
     def estimate(self, entry):
-        if not all(field in entry for field in ['series_name', 'series_season', 'series_episode']):
+        if not self._can_estimate(entry):
             return
         with Session() as session:
             series = session.query(Series).filter(Series.name == entry['series_name']).first()
             if not series:
                 return
-            episodes = (session.query(Episode).join(Episode.series).
-                        filter(Episode.season != None).
-                        filter(Series.id == series.id).
-                        filter(Episode.season == func.max(Episode.season).select()).
-                        order_by(desc(Episode.number)).limit(2).all())
+            return self._estimate(entry, self._last_episodes(series, session))
 
-            if len(episodes) < 2:
-                return
-            # If last two eps were not contiguous, don't guess
-            if episodes[0].number != episodes[1].number + 1:
-                return
-            # If first_seen in None, return
-            if episodes[0].first_seen is None or episodes[1].first_seen is None:
-                return
-            last_diff = episodes[0].first_seen - episodes[1].first_seen
-            # If last eps were grabbed close together, we might be catching up, don't guess
-            # Or, if last eps were too far apart, don't guess
-            # TODO: What range?
-            if last_diff < timedelta(days=2) or last_diff > timedelta(days=10):
-                return
-            # Estimate next season somewhat more than a normal episode break
-            if entry['series_season'] > episodes[0].season:
-                # TODO: How big should this be?
-                return episodes[0].first_seen + multiply_timedelta(last_diff, 2)
-            # Estimate next episode comes out about same length as last ep span, with a little leeway
-            return episodes[0].first_seen + multiply_timedelta(last_diff, 0.9)
+    def estimate_entries(self, entries):
+        """Estimates many entries, loading the series and their last episodes with one query per chunk of series."""
+        names = set(entry['series_name'] for entry in entries if self._can_estimate(entry))
+        if not names:
+            return [None] * len(entries)
+        with Session() as session:
+            series_ids = {}
+            for chunk in chunked(list(names)):
+                for series in session.query(Series).filter(Series.name.in_(chunk)):
+                    series_ids[series.name_normalized] = series.id
+            by_id = self._last_episodes_many(list(series_ids.values()), session)
+            last_episodes = dict((name, by_id[series_id]) for name, series_id in series_ids.items())
+        log.debug('Loaded %s of %s series for %s entries', len(last_episodes), len(names), len(entries))
+        results = []
+        for entry in entries:
+            if not self._can_estimate(entry):
+                results.append(None)
+                continue
+            results.append(self._estimate(entry, last_episodes.get(normalize_series_name(entry['series_name']))))
+        return results
 
 
 @event('plugin.register')
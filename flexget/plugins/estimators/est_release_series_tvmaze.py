@@ -5,16 +5,16 @@ import logging
 
 from flexget import plugin
 from flexget.event import event
+from flexget.manager import Session
 from flexget.utils.tools import split_title_year
 
 log = logging.getLogger('est_series_tvmaze')
 
 
 class EstimatesSeriesTVMaze(object):
-    @plugin.priority(2)
-    def estimate(self, entry):
-        if not all(field in entry for field in ['series_name', 'series_season']):
-            return
+    @staticmethod
+    def _lookup_params(entry):
+        """Returns whether a season lookup should be done, and the lookup arguments for the entry."""
         series_name = entry['series_name']
         season = entry['series_season']
         episode_number = entry.get('series_episode')
@@ -37,7 +37,10 @@ class EstimatesSeriesTVMaze(object):
         kwargs['series_season'] = season
         kwargs['series_episode'] = episode_number
         kwargs['series_name'] = series_name
+        return bool(season_pack), kwargs
 
+    @staticmethod
+    def _lookup(season_pack, kwargs, session=None):
         api_tvmaze = plugin.get_plugin_by_name('api_tvmaze').instance
         if season_pack:
             lookup = api_tvmaze.season_lookup
@@ -51,7 +54,7 @@ class EstimatesSeriesTVMaze(object):
                 log.debug('%s: %s', k, v)
 
         try:
-            entity = lookup(**kwargs)
+            entity = lookup(session=session, **kwargs)
         except LookupError as e:
             log.debug(str(e))
             return
@@ -60,6 +63,30 @@ class EstimatesSeriesTVMaze(object):
             return entity.airdate
         return
 
+    @plugin.priority(2)
+    def estimate(self, entry):
+        if not all(field in entry for field in ['series_name', 'series_season']):
+            return
+        return self._lookup(*self._lookup_params(entry))
+
+    def estimate_entries(self, entries):
+        """Estimates many entries, doing only one lookup for entries with identical lookup arguments."""
+        lookups = {}
+        keys = []
+        for entry in entries:
+            if not all(field in entry for field in ['series_name', 'series_season']):
+                keys.append(None)
+                continue
+            season_pack, kwargs = self._lookup_params(entry)
+            key = (season_pack, tuple(sorted(kwargs.items())))
+            lookups[key] = (season_pack, kwargs)
+            keys.append(key)
+        log.debug('Looking up %s distinct episodes/seasons for %s entries', len(lookups), len(entries))
+        with Session() as session:
+            estimates = dict((key, self._lookup(season_pack, kwargs, session=session))
+                             for key, (season_pack, kwargs) in lookups.items())
+        return [estimates.get(key) for key in keys]
+
 
 @event('plugin.register')
 def register_plugin():
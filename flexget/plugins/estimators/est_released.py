@@ -12,6 +12,12 @@ class EstimateRelease(object):
     for various things (series, movies).
     """
 
+    @staticmethod
+    def _estimators():
+        estimators = [e.instance for e in plugin.get_plugins(interface='estimate_release')]
+        return sorted(estimators, key=lambda e: getattr(e.estimate, 'priority', plugin.DEFAULT_PRIORITY),
+                      reverse=True)
+
     def estimate(self, entry):
         """
         Estimate release schedule for Entry
@@ -21,15 +27,38 @@ class EstimateRelease(object):
         """
 
         log.debug(entry['title'])
-        estimators = [e.instance.estimate for e in plugin.get_plugins(interface='estimate_release')]
-        for estimator in sorted(
-                estimators, key=lambda e: getattr(e, 'priority', plugin.DEFAULT_PRIORITY), reverse=True
-        ):
-            estimate = estimator(entry)
+        for estimator in self._estimators():
+            estimate = estimator.estimate(entry)
             # return first successful estimation
             if estimate is not None:
                 return estimate
 
+    def estimate_entries(self, entries):
+        """
+        Estimate release schedule for many entries at once.
+
+        Estimators which implement `estimate_entries` are given all entries which are still unresolved in one call,
+        so they can group them and share database queries and lookups. Others are called once per entry.
+
+        :param entries: List of entries
+        :return: List of estimated release dates (or None if it can't be figured out), in the same order as `entries`
+        """
+        results = [None] * len(entries)
+        pending = list(range(len(entries)))
+        for estimator in self._estimators():
+            if not pending:
+                break
+            pending_entries = [entries[i] for i in pending]
+            if hasattr(estimator, 'estimate_entries'):
+                estimates = estimator.estimate_entries(pending_entries)
+            else:
+                estimates = [estimator.estimate(entry) for entry in pending_entries]
+            for i, estimate in zip(pending, estimates):
+                results[i] = estimate
+            # Only entries without an estimate are passed on to lower priority estimators
+            pending = [i for i in pending if results[i] is None]
+        return results
+
 
 @event('plugin.register')
 def register_plugin():
@@ -15,8 +15,9 @@ log = logging.getLogger('est_movies_bluray')
 
 class EstimatesMoviesBluray(object):
 
-    @plugin.priority(2)
-    def estimate(self, entry):
+    @staticmethod
+    def _lookup_key(entry):
+        """Returns (movie_name, movie_year) to look up for the entry, or None if Blu-ray.com should not be queried."""
         if 'movie_name' not in entry:
             return
 
@@ -26,22 +27,41 @@ class EstimatesMoviesBluray(object):
         if movie_year is not None and movie_year > datetime.datetime.now().year:
             log.debug('Skipping Blu-ray.com lookup since movie year is %s', movie_year)
             return
+        return movie_name, movie_year
 
+    @staticmethod
+    def _lookup(movie_name, movie_year, session):
         log.debug('Searching Blu-ray.com for release date of {} ({})'.format(movie_name, movie_year))
 
         release_date = None
         try:
-            with Session() as session:
-                lookup = get_plugin_by_name('api_bluray').instance.lookup
-                movie = lookup(title=movie_name, year=movie_year, session=session)
-                if movie:
-                    release_date = movie.release_date
+            lookup = get_plugin_by_name('api_bluray').instance.lookup
+            movie = lookup(title=movie_name, year=movie_year, session=session)
+            if movie:
+                release_date = movie.release_date
         except LookupError as e:
             log.debug(e)
         if release_date:
             log.debug('received release date: {0}'.format(release_date))
         return release_date
 
+    @plugin.priority(2)
+    def estimate(self, entry):
+        key = self._lookup_key(entry)
+        if not key:
+            return
+        with Session() as session:
+            return self._lookup(key[0], key[1], session)
+
+    def estimate_entries(self, entries):
+        """Estimates many entries, looking up each distinct movie only once."""
+        keys = [self._lookup_key(entry) for entry in entries]
+        movies = set(key for key in keys if key)
+        log.debug('Looking up %s distinct movies for %s entries', len(movies), len(entries))
+        with Session() as session:
+            release_dates = dict((key, self._lookup(key[0], key[1], session)) for key in movies)
+        return [release_dates.get(key) for key in keys]
+
 
 @event('plugin.register')
 def register_plugin():
@@ -46,10 +46,14 @@ class CrossMatch(object):
         all_fields = config['all_fields']
 
         match_entries = aggregate_inputs(task, config['from'])
+        if not match_entries or not task.entries:
+            return
+        index = CrossMatchIndex(match_entries, fields, config.get('exact'))
 
         # perform action on intersecting entries
         for entry in task.entries:
-            for generated_entry in match_entries:
+            # Only the generated entries which may match are compared, in their original order
+            for generated_entry in index.candidates(entry, all_fields):
                 log.trace('checking if %s matches %s', entry['title'], generated_entry['title'])
                 common = self.entry_intersects(entry, generated_entry, fields, config.get('exact'))
                 if common and (not all_fields or len(common) == len(fields)):
@@ -96,6 +100,106 @@ class CrossMatch(object):
         return common_fields
 
 
+class CrossMatchIndex(object):
+    """
+    Index of the generated entries by the values of the matched fields, so that each task entry is only compared
+    with the generated entries which may intersect with it instead of all of them.
+
+    With `exact` the values are hashed. Otherwise text values are indexed by their trigrams: a value contained in
+    another one has all of its trigrams in it. Values which can't be indexed this way are always candidates.
+    """
+
+    GRAM = 3
+
+    def __init__(self, entries, fields, exact=True):
+        self.entries = entries
+        self.fields = fields
+        self.exact = exact
+        # field -> value or trigram -> set of entry positions
+        self._index = dict((field, {}) for field in fields)
+        # field -> positions of entries which are candidates for any value
+        self._unindexed = dict((field, set()) for field in fields)
+        # field -> positions of entries with the field
+        self._present = dict((field, set()) for field in fields)
+        # field -> position -> text value, for the non exact mode
+        self._texts = dict((field, {}) for field in fields)
+        for position, entry in enumerate(entries):
+            for field in fields:
+                if field not in entry:
+                    continue
+                self._present[field].add(position)
+                self._add(field, position, entry[field])
+        # field -> trigram -> positions of the texts for which it is their rarest trigram. A text contained in another
+        # value is found through that trigram only, instead of through all of its trigrams.
+        self._anchors = dict((field, {}) for field in fields)
+        for field, texts in self._texts.items():
+            index = self._index[field]
+            for position, text in texts.items():
+                gram = min(self._grams(text), key=lambda gram: len(index[gram]))
+                self._anchors[field].setdefault(gram, []).append(position)
+
+    def _grams(self, text):
+        return set(text[i:i + self.GRAM] for i in range(len(text) - self.GRAM + 1))
+
+    def _add(self, field, position, value):
+        index = self._index[field]
+        if self.exact:
+            try:
+                index.setdefault(value, set()).add(position)
+            except TypeError:
+                # unhashable
+                self._unindexed[field].add(position)
+        elif isinstance(value, str) and len(value) >= self.GRAM:
+            self._texts[field][position] = value
+            for gram in self._grams(value):
+                index.setdefault(gram, set()).add(position)
+        else:
+            self._unindexed[field].add(position)
+
+    def _field_candidates(self, field, value):
+        index = self._index[field]
+        if self.exact:
+            try:
+                return index.get(value, set()) | self._unindexed[field]
+            except TypeError:
+                # An unhashable value could still be equal to any other value
+                return self._present[field]
+        if not isinstance(value, str):
+            return self._present[field]
+        if len(value) < self.GRAM:
+            # contained in any text containing its characters, not worth indexing
+            return self._present[field]
+        grams = [index.get(gram, set()) for gram in self._grams(value)]
+        # Texts containing `value` contain all of its trigrams
+        candidates = set.intersection(*grams)
+        # Texts contained in `value` have all of their trigrams in it
+        texts = self._texts[field]
+        anchors = self._anchors[field]
+        for gram in self._grams(value):
+            candidates.update(position for position in anchors.get(gram, []) if texts[position] in value)
+        return candidates | self._unindexed[field]
+
+    def candidates(self, entry, all_fields=False):
+        """
+        :param all_fields: Only return entries which may match on all fields
+        :return: Generated entries which may intersect with `entry`, in their original order
+        """
+        found = None
+        for field in self.fields:
+            if field not in entry:
+                if all_fields:
+                    return []
+                continue
+            candidates = self._field_candidates(field, entry[field])
+            if found is None:
+                found = set(candidates)
+            elif all_fields:
+                found &= candidates
+            else:
+                found |= candidates
+        return [self.entries[position] for position in sorted(found or [])]
+
+
 @event('plugin.register')
 def register_plugin():
     plugin.register(CrossMatch, 'crossmatch', api_ver=2)
@@ -1,8 +1,10 @@
 from __future__ import unicode_literals, division, absolute_import
 import logging
+from itertools import chain
 
 from flexget import plugin
 from flexget.event import event
+from flexget.utils.tools import group_entries
 
 log = logging.getLogger('duplicates')
 
@@ -31,17 +33,24 @@ class Duplicates(object):
     def on_task_filter(self, task, config):
         field = config['field']
         action = config['action']
-        for entry in task.entries:
-            for prospect in task.entries:
-                if entry == prospect:
+        for entries in group_entries(task.entries, field=field).values():
+            if len(entries) < 2:
+                continue
+            # Rejected entries are not considered duplicates of the following ones anymore
+            remaining = []
+            for position, entry in enumerate(entries):
+                others = remaining if action == 'reject' else (entries[i] for i in range(position))
+                following = (entries[i] for i in range(position + 1, len(entries)))
+                prospect = next((other for other in chain(others, following) if other != entry), None)
+                if prospect is None:
+                    remaining.append(entry)
                     continue
-                if entry.get(field) is not None and entry[field] == prospect.get(field):
-                    msg = 'Field {} value {} equals on {} and {}'.format(
-                        field, entry[field], entry['title'], prospect['title'])
-                    if action == 'accept':
-                        entry.accept(msg)
-                    else:
-                        entry.reject(msg)
+                msg = 'Field {} value {} equals on {} and {}'.format(
+                    field, entry[field], entry['title'], prospect['title'])
+                if action == 'accept':
+                    entry.accept(msg)
+                else:
+                    entry.reject(msg)
 
 
 @event('plugin.register')
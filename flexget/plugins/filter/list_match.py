@@ -6,6 +6,7 @@ import logging
 from flexget import plugin
 from flexget.event import event
 from flexget.plugin import PluginError
+from flexget.utils.list_interface import get_many, discard_many
 
 log = logging.getLogger('list_match')
 
@@ -36,15 +37,15 @@ class ListMatch(object):
                     thelist = plugin.get_plugin_by_name(plugin_name).instance.get_list(plugin_config)
                 except AttributeError:
                     raise PluginError('Plugin %s does not support list interface' % plugin_name)
-                already_accepted = []
-                for entry in task.entries:
-                    result = thelist.get(entry)
+                already_accepted = set()
+                entries = list(task.entries)
+                for entry, result in zip(entries, get_many(thelist, entries)):
                     if not result:
                         continue
                     if config['action'] == 'accept':
                         if config['single_match']:
-                            if result not in already_accepted:
-                                already_accepted.append(result)
+                            if id(result) not in already_accepted:
+                                already_accepted.add(id(result))
                                 # Add all new result data to entry
                                 for key in result:
                                     if key not in entry:
@@ -69,7 +70,7 @@ class ListMatch(object):
                              plugin_name)
                     continue
                 log.verbose('removing accepted entries from %s - %s', plugin_name, plugin_config)
-                thelist -= task.accepted
+                discard_many(thelist, task.accepted)
 
 
 @event('plugin.register')
@@ -6,14 +6,14 @@ from past.builtins import basestring
 import logging
 from datetime import datetime, timedelta
 
-from sqlalchemy import Column, Integer, String, Unicode, DateTime, ForeignKey, and_, Index
+from sqlalchemy import Column, Integer, String, Unicode, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relation
 
 from flexget import db_schema, plugin
 from flexget.event import event
 from flexget.manager import Session
 from flexget.utils.sqlalchemy_utils import table_columns, table_add_column
-from flexget.utils.tools import parse_timedelta
+from flexget.utils.tools import parse_timedelta, chunked
 
 log = logging.getLogger('remember_rej')
 Base = db_schema.versioned_base('remember_rejected', 3)
@@ -106,20 +106,28 @@ class FilterRememberRejected(object):
     @plugin.priority(255)
     def on_task_filter(self, task, config):
         """Reject any remembered entries from previous runs"""
+        # We don't record or reject any entries without url
+        entries = [entry for entry in task.entries if entry.get('url')]
+        if not entries:
+            return
         with Session() as session:
             (task_id,) = session.query(RememberTask.id).filter(RememberTask.name == task.name).first()
-            reject_entries = session.query(RememberEntry).filter(RememberEntry.task_id == task_id)
-            if reject_entries.count():
-                # Reject all the remembered entries
-                for entry in task.entries:
-                    if not entry.get('url'):
-                        # We don't record or reject any entries without url
-                        continue
-                    reject_entry = reject_entries.filter(and_(RememberEntry.title == entry['title'],
-                                                              RememberEntry.url == entry['original_url'])).first()
-                    if reject_entry:
-                        entry.reject('Rejected on behalf of %s plugin: %s' %
-                                     (reject_entry.rejected_by, reject_entry.reason))
+            # Look up the remembered rejections of all entries at once, by chunks of titles
+            remembered = {}
+            titles = list(set(entry['title'] for entry in entries))
+            for chunk in chunked(titles):
+                rows = session.query(RememberEntry.title, RememberEntry.url, RememberEntry.rejected_by,
+                                     RememberEntry.reason). \
+                    filter(RememberEntry.task_id == task_id).filter(RememberEntry.title.in_(chunk))
+                for title, url, rejected_by, reason in rows:
+                    remembered.setdefault((title, url), (rejected_by, reason))
+        if not remembered:
+            return
+        # Reject all the remembered entries
+        for entry in entries:
+            reject_entry = remembered.get((entry['title'], entry['original_url']))
+            if reject_entry:
+                entry.reject('Rejected on behalf of %s plugin: %s' % reject_entry)
 
     def on_entry_reject(self, entry, remember=None, remember_time=None, **kwargs):
         # We only remember rejections that specify the remember keyword argument
@@ -139,18 +147,22 @@ class FilterRememberRejected(object):
 
     @plugin.priority(-255)
     def on_task_learn(self, task, config):
+        entries = [entry for entry in task.all_entries if entry.get('remember_rejected')]
+        if not entries:
+            return
+        now = datetime.now()
         with Session() as session:
-            for entry in task.all_entries:
-                if not entry.get('remember_rejected'):
-                    continue
+            (remember_task_id,) = session.query(RememberTask.id).filter(RememberTask.name == task.name).first()
+            rejections = []
+            for entry in entries:
                 expires = None
                 if isinstance(entry['remember_rejected'], timedelta):
-                    expires = datetime.now() + entry['remember_rejected']
-
-                (remember_task_id,) = session.query(RememberTask.id).filter(RememberTask.name == task.name).first()
-                session.add(RememberEntry(title=entry['title'], url=entry['original_url'], task_id=remember_task_id,
-                                          rejected_by=entry.get('rejected_by'), reason=entry.get('reason'),
-                                          expires=expires))
+                    expires = now + entry['remember_rejected']
+                rejections.append(RememberEntry(title=entry['title'], url=entry['original_url'],
+                                                task_id=remember_task_id, rejected_by=entry.get('rejected_by'),
+                                                reason=entry.get('reason'), expires=expires))
+            # Insert all rejections of the run in one batch
+            session.bulk_save_objects(rejections)
 
 
 @event('manager.db_cleanup')
@@ -10,7 +10,7 @@ from flexget.entry import Entry
 from flexget.utils.database import quality_property
 from flexget.db_schema import Session
 from flexget.utils import qualities
-from flexget.utils.tools import parse_timedelta, group_entries
+from flexget.utils.tools import parse_timedelta, group_entries, chunked
 
 log = logging.getLogger('timeframe')
 
@@ -73,11 +73,16 @@ class FilterTimeFrame(object):
 
         action_on_waiting = entry_actions[config['on_waiting']] if config['on_waiting'] != 'do_nothing' else None
         action_on_reached = entry_actions[config['on_reached']] if config['on_reached'] != 'do_nothing' else None
+        target_requirement = qualities.Requirements(config['target'])
+        target_quality = qualities.Quality(config['target'])
+        wait = parse_timedelta(config['wait'])
 
         with Session() as session:
             # Prefetch Data
-            existing_ids = session.query(EntryTimeFrame).filter(EntryTimeFrame.id.in_(grouped_entries.keys())).all()
-            existing_ids = {e.id: e for e in existing_ids}
+            existing_ids = {}
+            for chunk in chunked(list(grouped_entries)):
+                existing_ids.update(
+                    (e.id, e) for e in session.query(EntryTimeFrame).filter(EntryTimeFrame.id.in_(chunk)))
 
             for identifier, entries in grouped_entries.items():
                 if not entries:
@@ -106,8 +111,6 @@ class FilterTimeFrame(object):
                 id_timeframe.proper_count = best_entry.get('proper_count', 0)
 
                 # Check we hit target or better
-                target_requirement = qualities.Requirements(config['target'])
-                target_quality = qualities.Quality(config['target'])
                 if target_requirement.allows(best_entry['quality']) or best_entry['quality'] >= target_quality:
                     log.debug('timeframe reach target quality %s or higher for %s' % (target_quality, identifier))
                     if action_on_reached:
@@ -115,7 +118,7 @@ class FilterTimeFrame(object):
                     continue
 
                 # Check if passed wait time
-                expires = id_timeframe.first_seen + parse_timedelta(config['wait'])
+                expires = id_timeframe.first_seen + wait
                 if expires <= datetime.now():
                     log.debug('timeframe expired, releasing quality restriction for %s' % identifier)
                     if action_on_reached:
@@ -150,8 +153,10 @@ class FilterTimeFrame(object):
 
         with Session() as session:
             # Prefetch Data
-            existing_ids = session.query(EntryTimeFrame).filter(EntryTimeFrame.id.in_(grouped_entries.keys())).all()
-            existing_ids = {e.id: e for e in existing_ids}
+            existing_ids = {}
+            for chunk in chunked(list(grouped_entries)):
+                existing_ids.update(
+                    (e.id, e) for e in session.query(EntryTimeFrame).filter(EntryTimeFrame.id.in_(chunk)))
 
             for identifier, entries in grouped_entries.items():
                 if not entries:
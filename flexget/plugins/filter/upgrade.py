@@ -10,7 +10,7 @@ from flexget.utils.database import quality_property
 from flexget.db_schema import Session
 from flexget.event import event
 from flexget.utils import qualities
-from flexget.utils.tools import parse_timedelta, group_entries
+from flexget.utils.tools import parse_timedelta, group_entries, chunked
 
 log = logging.getLogger('upgrade')
 
@@ -110,10 +110,14 @@ class FilterUpgrade(object):
         if not grouped_entries:
             return
 
+        action_on_lower = entry_actions[config['on_lower']] if config['on_lower'] != 'do_nothing' else None
+        timeframe = parse_timedelta(config['timeframe']) if config['timeframe'] else None
+
         with Session() as session:
             # Prefetch Data
-            existing_ids = session.query(EntryUpgrade).filter(EntryUpgrade.id.in_(grouped_entries.keys())).all()
-            existing_ids = {e.id: e for e in existing_ids}
+            existing_ids = {}
+            for chunk in chunked(list(grouped_entries)):
+                existing_ids.update((e.id, e) for e in session.query(EntryUpgrade).filter(EntryUpgrade.id.in_(chunk)))
 
             for identifier, entries in grouped_entries.items():
                 if not entries:
@@ -127,15 +131,14 @@ class FilterUpgrade(object):
                 log.debug('Looking for upgrades for identifier %s (within %s entries)', identifier, len(entries))
 
                 # Check if passed allowed timeframe
-                if config['timeframe']:
-                    expires = existing.first_seen + parse_timedelta(config['timeframe'])
+                if timeframe is not None:
+                    expires = existing.first_seen + timeframe
                     if expires <= datetime.now():
                         # Timeframe reached, allow
                         log.debug('Skipping upgrade with identifier %s as timeframe reached', identifier)
                         continue
 
                 # Filter out lower quality and propers
-                action_on_lower = entry_actions[config['on_lower']] if config['on_lower'] != 'do_nothing' else None
                 upgradeable = self.filter_entries(entries, existing, config['target'], action_on_lower)
 
                 # Skip if we have no entries after filtering
@@ -169,8 +172,9 @@ class FilterUpgrade(object):
 
         with Session() as session:
             # Prefetch Data
-            existing_ids = session.query(EntryUpgrade).filter(EntryUpgrade.id.in_(grouped_entries.keys())).all()
-            existing_ids = {e.id: e for e in existing_ids}
+            existing_ids = {}
+            for chunk in chunked(list(grouped_entries)):
+                existing_ids.update((e.id, e) for e in session.query(EntryUpgrade).filter(EntryUpgrade.id.in_(chunk)))
 
             for identifier, entries in grouped_entries.items():
                 if not entries:
@@ -0,0 +1,54 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+
+from flexget.config_schema import register_config_key
+from flexget.event import event
+from flexget.utils import requests
+
+log = logging.getLogger('connection_pool')
+
+schema = {
+    'type': 'object',
+    'properties': {
+        'hosts': {'type': 'integer', 'minimum': 1, 'description': 'Amount of hosts to keep connections open for.'},
+        'connections_per_host': {'type': 'integer', 'minimum': 1,
+                                 'description': 'Maximum amount of idle connections kept for each host.'}
+    },
+    'additionalProperties': False
+}
+
+
+@event('config.register')
+def register_config():
+    register_config_key('connection_pool', schema)
+
+
+@event('manager.config_updated')
+def configure(manager):
+    """
+    Sizes the http connection pools shared by all tasks and plugins.
+
+    Example::
+
+      connection_pool:
+        hosts: 50
+        connections_per_host: 4
+    """
+    config = manager.config.get('connection_pool') or {}
+    requests.configure_pools(pool_connections=config.get('hosts'), pool_maxsize=config.get('connections_per_host'))
+
+
+@event('manager.execute.completed')
+def log_stats(manager, options):
+    stats = requests.pool_stats.stats()
+    if not stats:
+        return
+    # Shown with --profile, as connection reuse matters when looking at where time is spent
+    level = log.verbose if manager.options.profile else log.debug
+    total_requests = sum(counts['requests'] for counts in stats.values())
+    total_reused = sum(counts['reused'] for counts in stats.values())
+    level('Shared connection pools: %s requests, %s over reused connections', total_requests, total_reused)
+    for host, counts in sorted(stats.items()):
+        log.debug('%s: %s requests, %s connections opened', host, counts['requests'], counts['connections'])
@@ -0,0 +1,86 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import os
+
+from flexget.config_schema import register_config_key, parse_size, parse_interval
+from flexget.event import event
+from flexget.utils import http_cache
+from flexget.utils.tools import timedelta_total_seconds
+
+log = logging.getLogger('http_cache')
+
+schema = {
+    'oneOf': [
+        {'type': 'boolean'},
+        {
+            'type': 'object',
+            'properties': {
+                'directory': {'type': 'string', 'format': 'path'},
+                'max_size': {'type': 'string', 'format': 'size'},
+                'domains': {
+                    'type': 'object',
+                    'additionalProperties': {'type': 'string', 'format': 'interval'},
+                    'description': 'How long responses from each domain are used without checking them again, '
+                                   'regardless of the caching headers sent by the site.'
+                }
+            },
+            'additionalProperties': False
+        }
+    ]
+}
+
+DEFAULT_MAX_SIZE = '100 MiB'
+
+
+@event('config.register')
+def register_config():
+    register_config_key('http_cache', schema)
+
+
+@event('manager.config_updated')
+def configure(manager):
+    """
+    Caches http responses of all plugins on disk, reusing them as allowed by their caching headers.
+
+    Example::
+
+      http_cache:
+        max_size: 200 MiB
+        domains:
+          api.tvmaze.com: 6 hours
+    """
+    config = manager.config.get('http_cache')
+    if not config:
+        if http_cache.default_cache:
+            log.debug('http cache disabled')
+        http_cache.set_default_cache(None)
+        return
+    if not isinstance(config, dict):
+        config = {}
+    directory = os.path.expanduser(config.get('directory') or os.path.join(manager.config_base, 'http_cache'))
+    max_size = parse_size(config.get('max_size', DEFAULT_MAX_SIZE))
+    domains = dict((domain, timedelta_total_seconds(parse_interval(interval)))
+                   for domain, interval in config.get('domains', {}).items())
+    current = http_cache.default_cache
+    if (current and current.store.directory == directory and current.store.max_size == max_size and
+            current.domains == domains):
+        return
+    log.debug('Caching http responses in %s', directory)
+    http_cache.set_default_cache(http_cache.HTTPCache(directory, max_size=max_size, domains=domains))
+
+
+@event('manager.execute.completed')
+def log_stats(manager, options):
+    cache = http_cache.default_cache
+    if not cache:
+        return
+    stats = cache.stats()
+    if not stats['hits'] and not stats['misses']:
+        return
+    level = log.verbose if manager.options.profile else log.debug
+    level('http cache: %(hits)s hits (%(revalidated)s revalidated), %(misses)s misses, hit rate %(hit_rate).0f%%, '
+          '%(items)s responses using %(size)s bytes, %(evictions)s evicted',
+          dict(stats, hit_rate=stats['hit_rate'] * 100))
+    cache.reset_stats()
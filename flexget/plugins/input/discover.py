@@ -12,6 +12,7 @@ from flexget import db_schema
 from flexget.event import event
 from flexget.manager import Session
 from flexget.plugin import get_plugin_by_name, PluginError, PluginWarning
+from flexget.utils.parallel import KeyedSemaphore, parallel_map
 from flexget.utils.tools import parse_timedelta, multiply_timedelta, aggregate_inputs
 
 log = logging.getLogger('discover')
@@ -59,8 +60,18 @@ class Discover(object):
           - piratebay
         interval: [1 hours|days|weeks]
         release_estimations: [strict|loose|ignore]
+
+    Searches can be run concurrently. `concurrency` is the total amount of searches running at once,
+    `plugin_concurrency` limits the amount of simultaneous searches for each search plugin (default 2)::
+
+      discover:
+        concurrency: 8
+        plugin_concurrency:
+          piratebay: 1
     """
 
+    default_plugin_concurrency = 2
+
     schema = {
         'type': 'object',
         'properties': {
@@ -83,7 +94,9 @@ class Discover(object):
                     }
                 ]
             },
-            'limit': {'type': 'integer', 'minimum': 1}
+            'limit': {'type': 'integer', 'minimum': 1},
+            'concurrency': {'type': 'integer', 'minimum': 1, 'default': 1},
+            'plugin_concurrency': {'type': 'object', 'additionalProperties': {'type': 'integer', 'minimum': 1}}
         },
         'required': ['what', 'from'],
         'additionalProperties': False
@@ -97,40 +110,59 @@ class Discover(object):
         :return: List of entries found from search engines listed under `from` configuration
         """
 
-        result = []
-        for index, entry in enumerate(entries):
-            entry_results = []
-            for item in config['from']:
-                if isinstance(item, dict):
-                    plugin_name, plugin_config = list(item.items())[0]
-                else:
-                    plugin_name, plugin_config = item, None
-                search = get_plugin_by_name(plugin_name).instance
-                if not callable(getattr(search, 'search')):
-                    log.critical('Search plugin %s does not implement search method', plugin_name)
-                    continue
+        searches = []
+        for item in config['from']:
+            if isinstance(item, dict):
+                plugin_name, plugin_config = list(item.items())[0]
+            else:
+                plugin_name, plugin_config = item, None
+            search = get_plugin_by_name(plugin_name).instance
+            if not callable(getattr(search, 'search')):
+                log.critical('Search plugin %s does not implement search method', plugin_name)
+                continue
+            searches.append((plugin_name, search, plugin_config))
+
+        plugin_limits = KeyedSemaphore(self.default_plugin_concurrency, config.get('plugin_concurrency'))
+
+        def do_search(job):
+            index, entry, (plugin_name, search, plugin_config) = job
+            with plugin_limits(plugin_name):
                 log.verbose('Searching for `%s` with plugin `%s` (%i of %i)', entry['title'], plugin_name, index + 1,
                             len(entries))
                 try:
                     search_results = search.search(task=task, entry=entry, config=plugin_config)
-                    if not search_results:
-                        log.debug('No results from %s', plugin_name)
-                        continue
-                    log.debug('Discovered %s entries from %s', len(search_results), plugin_name)
-                    if config.get('limit'):
-                        search_results = sorted(search_results, reverse=True,
-                                                key=lambda x: x.get('search_sort', ''))[:config['limit']]
-                    for e in search_results:
-                        e['discovered_from'] = entry['title']
-                        e['discovered_with'] = plugin_name
-                        e.on_complete(self.entry_complete, query=entry, search_results=search_results)
-
-                    entry_results.extend(search_results)
-
                 except PluginWarning as e:
                     log.verbose('No results from %s: %s', plugin_name, e)
+                    return None
                 except PluginError as e:
                     log.error('Error searching with %s: %s', plugin_name, e)
+                    return None
+            if not search_results:
+                log.debug('No results from %s', plugin_name)
+                return None
+            log.debug('Discovered %s entries from %s', len(search_results), plugin_name)
+            return search_results
+
+        jobs = [(index, entry, search) for index, entry in enumerate(entries) for search in searches]
+        # Searches may complete in any order, results are still processed in the order of `entries` and `from`
+        job_results = iter(parallel_map(do_search, jobs, workers=config.get('concurrency', 1), name='discover'))
+
+        result = []
+        for entry in entries:
+            entry_results = []
+            for plugin_name, _, _ in searches:
+                search_results = next(job_results)
+                if not search_results:
+                    continue
+                if config.get('limit'):
+                    search_results = sorted(search_results, reverse=True,
+                                            key=lambda x: x.get('search_sort', ''))[:config['limit']]
+                for e in search_results:
+                    e['discovered_from'] = entry['title']
+                    e['discovered_with'] = plugin_name
+                    e.on_complete(self.entry_complete, query=entry, search_results=search_results)
+
+                entry_results.extend(search_results)
             if not entry_results:
                 log.verbose('No search results for `%s`', entry['title'])
                 entry.complete()
@@ -157,8 +189,7 @@ class Discover(object):
         """
         estimator = get_plugin_by_name('estimate_release').instance
         result = []
-        for entry in entries:
-            est_date = estimator.estimate(entry)
+        for entry, est_date in zip(entries, estimator.estimate_entries(entries)):
             if est_date is None:
                 log.debug('No release date could be determined for %s', entry['title'])
                 if estimation_mode['mode'] == 'strict':
@@ -20,7 +20,8 @@ from flexget.config_schema import one_or_more
 from flexget.entry import Entry
 from flexget.event import event
 from flexget.utils.cached_input import cached
-from flexget.utils.tools import decode_html
+from flexget.utils.feed_stream import ParseError, iter_feed_items, iter_file_chunks
+from flexget.utils.tools import decode_html, parse_timedelta
 from flexget.utils.pathscrub import pathscrub
 
 log = logging.getLogger('rss')
@@ -32,6 +33,66 @@ def fp_field_name(name):
     return name.replace(':', '_').lower()
 
 
+def item_pubdate(item):
+    """Returns the publish date of a feedparser item as a naive UTC datetime, or None."""
+    if item.get('published_parsed'):
+        return datetime(*item['published_parsed'][:6])
+
+
+class FeedMark(object):
+    """
+    Remembers the newest items seen in a feed, so that items from previous runs can be recognized.
+
+    The mark consists of the newest publish date seen, and the ids (guid, or title and link when the feed has no
+    guids) of the most recent items.
+    """
+
+    #: Amount of most recent item ids remembered
+    max_ids = 100
+
+    def __init__(self, stored=None):
+        stored = stored or {}
+        self.pubdate = stored.get('pubdate')
+        self.ids = set(stored.get('ids', []))
+        self._new_ids = []
+        self._new_pubdate = self.pubdate
+        self._previous_pubdate = None
+        #: True as long as all items read so far were sorted newest first
+        self.descending = True
+
+    @staticmethod
+    def item_id(item):
+        return item.get('guid') or '%s|%s' % (item.get('title', ''), item.get('link', ''))
+
+    def seen(self, item):
+        """Records `item`, returns True if it was already seen on a previous run."""
+        pubdate = item_pubdate(item)
+        if pubdate:
+            if self._previous_pubdate and pubdate > self._previous_pubdate:
+                self.descending = False
+            self._previous_pubdate = pubdate
+        item_id = self.item_id(item)
+        if item_id in self.ids:
+            return True
+        if pubdate and self.pubdate and pubdate < self.pubdate:
+            return True
+        if len(self._new_ids) < self.max_ids:
+            self._new_ids.append(item_id)
+        if pubdate and (not self._new_pubdate or pubdate > self._new_pubdate):
+            self._new_pubdate = pubdate
+        return False
+
+    def older_than_mark(self, item):
+        """True if `item` was published before the newest item of the previous run."""
+        pubdate = item_pubdate(item)
+        return bool(pubdate and self.pubdate and pubdate < self.pubdate)
+
+    def store(self):
+        """Returns the updated mark in a form which can be saved in simple persistence."""
+        ids = self._new_ids + [i for i in self.ids if i not in self._new_ids]
+        return {'pubdate': self._new_pubdate, 'ids': ids[:self.max_ids]}
+
+
 class InputRSS(object):
     """
     Parses RSS feed.
@@ -95,6 +156,29 @@ class InputRSS(object):
       rss:
         url: <url>
         group_links: yes
+
+    Very large feeds can be parsed incrementally with the stream option. Entries are then created while the feed
+    is being downloaded and parsed, and memory use does not depend on the size of the feed. Items are expected
+    to be in the order the feed lists them (newest first) in this mode.
+    Reading can be stopped early after a number of items, or at the first item older than a given age.
+
+    Example::
+
+      rss:
+        url: <url>
+        stream: yes
+        max_items: 500
+        max_age: 7 days
+
+    Most feeds do not support conditional requests, so all their items are turned into entries on every run.
+    With the incremental option, the newest guids and publish date seen are remembered for the feed, and only items
+    newer than that produce entries. When the feed is sorted newest first, reading stops at the first old item.
+
+    Example::
+
+      rss:
+        url: <url>
+        incremental: yes
     """
 
     schema = {
@@ -113,6 +197,10 @@ class InputRSS(object):
             'filename': {'type': 'boolean'},
             'group_links': {'type': 'boolean', 'default': False},
             'all_entries': {'type': 'boolean', 'default': True},
+            'stream': {'type': 'boolean'},
+            'incremental': {'type': 'boolean'},
+            'max_items': {'type': 'integer', 'minimum': 1},
+            'max_age': {'type': 'string', 'format': 'interval'},
             'other_fields': {'type': 'array', 'items': {
                 # Items can be a string, or a dict with a string value
                 'type': ['string', 'object'], 'additionalProperties': {'type': 'string'}
@@ -151,6 +239,11 @@ class InputRSS(object):
         config.setdefault('group_links', False)
         # set default for all_entries
         config.setdefault('all_entries', True)
+        config.setdefault('stream', False)
+        config.setdefault('incremental', False)
+        if config['stream'] and config.get('ascii'):
+            log.warning('The ascii option cannot be used while streaming, parsing whole feed instead.')
+            config['stream'] = False
         return config
 
     def process_invalid_content(self, task, data, url):
@@ -239,7 +332,8 @@ class InputRSS(object):
             try:
                 # Use the raw response so feedparser can read the headers and status values
                 response = task.requests.get(config['url'], timeout=60, headers=headers, raise_status=False, auth=auth)
-                content = response.content
+                # When streaming, the body is only read while items are being parsed
+                content = None if config['stream'] else response.content
             except RequestException as e:
                 raise plugin.PluginError('Unable to download the RSS for task %s (%s): %s' %
                                          (task.name, config['url'], e))
@@ -276,12 +370,23 @@ class InputRSS(object):
                     log.debug('last modified %s saved for task %s', modified, task.name)
         else:
             # This is a file, open it
+            if config['stream']:
+                with open(config['url'], 'rb') as f:
+                    items = self.stream_items(task, config, iter_file_chunks(f))
+                    return self.create_entries(task, config, items, url_hash, all_entries)
             with open(config['url'], 'rb') as f:
                 content = f.read()
             if config.get('ascii'):
                 # Just assuming utf-8 file in this case
                 content = content.decode('utf-8', 'ignore').encode('ascii', 'ignore')
 
+        if config['stream']:
+            try:
+                items = self.stream_items(task, config, response.iter_content(64 * 1024))
+                return self.create_entries(task, config, items, url_hash, all_entries)
+            finally:
+                response.close()
+
         if not content:
             log.error('No data recieved for rss feed.')
             return []
@@ -326,15 +431,65 @@ class InputRSS(object):
 
         log.debug('encoding %s', rss.encoding)
 
-        last_entry_id = ''
         if not all_entries:
             # Test to make sure entries are in descending order
             if rss.entries and rss.entries[0].get('published_parsed') and rss.entries[-1].get('published_parsed'):
                 if rss.entries[0]['published_parsed'] < rss.entries[-1]['published_parsed']:
                     # Sort them if they are not
                     rss.entries.sort(key=lambda x: x['published_parsed'], reverse=True)
+
+        return self.create_entries(task, config, rss.entries, url_hash, all_entries)
+
+    def stream_items(self, task, config, chunks):
+        """Yields feed items parsed incrementally from `chunks` of the feed content."""
+        produced = False
+        try:
+            for item in iter_feed_items(chunks):
+                produced = True
+                yield item
+        except ParseError as e:
+            if produced:
+                msg = 'Error %s while parsing feed, but entries were produced, ignoring the error.' % e
+                if config.get('silent', False):
+                    log.debug(msg)
+                else:
+                    log.verbose(msg)
+            elif e.position == (1, 0):
+                log.error('No data recieved for rss feed.')
+            else:
+                if task.options.debug:
+                    log.error('error parsing rss: %s' % e)
+                raise plugin.PluginError('Received invalid RSS content from task %s (%s)' % (task.name,
+                                                                                             config['url']))
+
+    def limit_items(self, config, items):
+        """Stops iterating `items` when `max_items` or `max_age` from config are reached."""
+        max_age = parse_timedelta(config['max_age']) if config.get('max_age') else None
+        for count, item in enumerate(items):
+            if config.get('max_items') and count >= config['max_items']:
+                log.verbose('Reached limit of %s items, not processing rest of the feed.', config['max_items'])
+                break
+            if max_age and item.get('published_parsed'):
+                if datetime(*item['published_parsed'][:6]) < datetime.now() - max_age:
+                    log.verbose('Reached items older than %s, not processing rest of the feed.', config['max_age'])
+                    break
+            yield item
+
+    def create_entries(self, task, config, items, url_hash, all_entries):
+        """Creates entries from feedparser style `items`, and saves the location in the feed for the next run."""
+        last_entry_id = ''
+        if not all_entries:
             last_entry_id = task.simple_persistence.get('%s_last_entry' % url_hash)
 
+        mark = None
+        if config['incremental']:
+            # Stored by url rather than url_hash, as hash() is not stable between python processes
+            mark_key = 'mark_%s' % config['url']
+            mark = FeedMark(task.simple_persistence.get(mark_key))
+            if task.config_modified or task.options.nocache or task.options.retry:
+                log.verbose('Ignoring items seen in previous runs of %s.', config['url'])
+                mark = FeedMark()
+
         # new entries to be created
         entries = []
 
@@ -350,7 +505,10 @@ class InputRSS(object):
         # field name for url can be configured by setting link.
         # default value is auto but for example guid is used in some feeds
         ignored = 0
-        for entry in rss.entries:
+        first_entry = None
+        for entry in self.limit_items(config, items):
+            if first_entry is None:
+                first_entry = entry
 
             # Check if title field is overridden in config
             title_field = config.get('title', 'title')
@@ -370,6 +528,14 @@ class InputRSS(object):
                 task.no_entries_ok = True
                 break
 
+            if mark is not None and mark.seen(entry):
+                task.no_entries_ok = True
+                if mark.descending and mark.older_than_mark(entry):
+                    log.verbose('Reached items seen on previous runs, not processing rest of the feed.')
+                    break
+                log.trace('Item `%s` was seen on a previous run', entry.title)
+                continue
+
             # remove annoying zero width spaces
             entry.title = entry.title.replace(u'\u200B', u'')
 
@@ -472,11 +638,11 @@ class InputRSS(object):
             add_entry(e)
 
         # Save last spot in rss
-        if rss.entries:
+        if first_entry is not None:
             log.debug('Saving location in rss feed.')
 
             try:
-                entry_id = rss.entries[0].title + rss.entries[0].get('guid', '')
+                entry_id = first_entry.title + first_entry.get('guid', '')
             except AttributeError:
                 entry_id = ''
 
@@ -485,6 +651,9 @@ class InputRSS(object):
             else:
                 log.debug('rss feed location saving skipped: no title information in first entry')
 
+        if mark is not None:
+            task.simple_persistence[mark_key] = mark.store()
+
         if ignored:
             if not config.get('silent'):
                 log.warning('Skipped %s RSS-entries without required information (title, link or enclosures)', ignored)
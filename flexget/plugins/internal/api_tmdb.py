@@ -147,6 +147,19 @@ class TMDBMovie(Base):
         self._genres = [TMDBGenre(**g) for g in movie['genres']]
         self.updated = datetime.now()
 
+    @property
+    def expired(self):
+        """True if the cached movie details should be refreshed from tmdb."""
+        refresh_time = timedelta(days=2)
+        if self.released:
+            if self.released > datetime.now().date() - timedelta(days=7):
+                # Movie is less than a week old, expire after 1 day
+                refresh_time = timedelta(days=1)
+            else:
+                age_in_years = (datetime.now().date() - self.released).days / 365
+                refresh_time += timedelta(days=age_in_years * 5)
+        return self.updated < datetime.now() - refresh_time
+
     def get_images(self):
         log.debug('images for movie %s not found in DB, fetching from TMDB', self.name)
         try:
@@ -319,15 +332,7 @@ class ApiTmdb(object):
                     movie = found.movie
         if movie:
             # Movie found in cache, check if cache has expired.
-            refresh_time = timedelta(days=2)
-            if movie.released:
-                if movie.released > datetime.now().date() - timedelta(days=7):
-                    # Movie is less than a week old, expire after 1 day
-                    refresh_time = timedelta(days=1)
-                else:
-                    age_in_years = (datetime.now().date() - movie.released).days / 365
-                    refresh_time += timedelta(days=age_in_years * 5)
-            if movie.updated < datetime.now() - refresh_time and not only_cached:
+            if movie.expired and not only_cached:
                 log.debug('Cache has expired for %s, attempting to refresh from TMDb.', movie.name)
                 try:
                     updated_movie = TMDBMovie(id=movie.id, language=language)
@@ -677,14 +677,13 @@ class TraktShow(Base):
         return season
 
     @property
-    def expired(self):
+    def expires(self):
         """
-        :return: True if show details are considered to be expired, ie. need of update
+        :return: When the show details expire, ie. need of update. None if they were never cached.
         """
         # TODO stolen from imdb plugin, maybe there's a better way?
         if self.cached_at is None:
-            log.debug('cached_at is None: %s', self)
-            return True
+            return None
         refresh_interval = 2
         # if show has been cancelled or ended, then it is unlikely to be updated often
         if self.year and (self.status == 'ended' or self.status == 'canceled'):
@@ -692,7 +691,17 @@ class TraktShow(Base):
             age = max((datetime.now().year - self.year), 0)
             refresh_interval += age * 5
             log.debug('show `%s` age %i expires in %i days', self.title, age, refresh_interval)
-        return self.cached_at < datetime.now() - timedelta(days=refresh_interval)
+        return self.cached_at + timedelta(days=refresh_interval)
+
+    @property
+    def expired(self):
+        """
+        :return: True if show details are considered to be expired, ie. need of update
+        """
+        if self.cached_at is None:
+            log.debug('cached_at is None: %s', self)
+            return True
+        return self.expires < datetime.now()
 
     @property
     def translations(self):
@@ -166,14 +166,18 @@ class TVMazeSeries(Base):
     def __str__(self):
         return self.name
 
+    @property
+    def expires(self):
+        """:return: When the cached show details expire, None if they were never updated"""
+        if self.last_update:
+            return self.last_update + timedelta(days=UPDATE_INTERVAL + 1)
+
     @property
     def expired(self):
         if not self.last_update:
             log.debug('no last update attribute, series set for update')
             return True
-        time_dif = datetime.now() - self.last_update
-        expiration = time_dif.days > UPDATE_INTERVAL
-        return expiration
+        return datetime.now() >= self.expires
 
     def populate_seasons(self, series=None):
         if series and '_embedded' in series and series['_embedded'].get('seasons'):
@@ -6,7 +6,7 @@ import pickle
 from collections import MutableSet
 from datetime import datetime
 
-from sqlalchemy import Column, Unicode, select, Integer, DateTime, or_, func
+from sqlalchemy import Column, Unicode, select, Integer, DateTime, or_, func, Index, bindparam
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.exc import NoResultFound
 from sqlalchemy.sql.elements import and_
@@ -19,10 +19,14 @@ from flexget.event import event
 from flexget.manager import Session
 from flexget.utils import json
 from flexget.utils.database import entry_synonym, with_session
-from flexget.utils.sqlalchemy_utils import table_schema, table_add_column
+from flexget.utils.list_interface import DBEntrySetMixin
+from flexget.utils.sqlalchemy_utils import table_schema, table_add_column, create_index
 
 log = logging.getLogger('entry_list')
-Base = versioned_base('entry_list', 1)
+Base = versioned_base('entry_list', 2)
+
+# Number of list entries loaded per query when iterating over a list
+PAGE_SIZE = 1000
 
 
 @db_schema.upgrade('entry_list')
@@ -43,6 +47,22 @@ def upgrade(ver, session):
                 log.error('Unable error upgrading entry_list pickle object due to %s' % str(e))
 
         ver = 1
+    if ver == 1:
+        table = table_schema('entry_list_entries', session)
+        table_add_column(table, 'url', Unicode, session)
+        table_add_column(table, 'fields', Unicode, session)
+        table = table_schema('entry_list_entries', session)
+        log.info('Storing the url and field names of entry list entries, this may take a while.')
+        values = []
+        for row in session.execute(select([table.c.id, table.c.json])):
+            fields = json.loads(row['json'] or '{}')
+            values.append({'row_id': row['id'], 'url': fields.get('url'), 'fields': json.dumps(sorted(fields))})
+        if values:
+            session.execute(table.update().where(table.c.id == bindparam('row_id')).values(
+                url=bindparam('url'), fields=bindparam('fields')), values)
+        create_index('entry_list_entries', session, 'list_id', 'title')
+        create_index('entry_list_entries', session, 'list_id', 'original_url')
+        ver = 2
     return ver
 
 
@@ -68,8 +88,11 @@ class EntryListEntry(Base):
     added = Column(DateTime, default=datetime.now)
     title = Column(Unicode)
     original_url = Column(Unicode)
+    url = Column(Unicode)
+    # Names of the entry fields, so that entries can be built without decoding the json
+    _fields = Column('fields', Unicode)
     _json = Column('json', Unicode)
-    entry = entry_synonym('_json')
+    _entry = entry_synonym('_json')
 
     def __init__(self, entry, entry_list_id):
         self.title = entry['title']
@@ -77,6 +100,17 @@ class EntryListEntry(Base):
         self.entry = entry
         self.list_id = entry_list_id
 
+    @property
+    def entry(self):
+        return self._entry
+
+    @entry.setter
+    def entry(self, entry):
+        self._entry = entry
+        self.url = entry.get('url')
+        # Fields which can't be stored are left out of the json, take the names from it
+        self._fields = json.dumps(sorted(json.loads(self._json)))
+
     def __repr__(self):
         return '<EntryListEntry,title=%s,original_url=%s>' % (self.title, self.original_url)
 
@@ -91,7 +125,40 @@ class EntryListEntry(Base):
         }
 
 
-class DBEntrySet(MutableSet):
+Index('ix_entry_list_entries_list_id_title', EntryListEntry.list_id, EntryListEntry.title)
+Index('ix_entry_list_entries_list_id_original_url', EntryListEntry.list_id, EntryListEntry.original_url)
+
+
+def lazy_entry(title, original_url, url, fields, raw):
+    """
+    Builds an entry from the columns of an `EntryListEntry` row. Only title and urls are set, the other fields are
+    decoded from the row's json the first time one of them is accessed.
+    """
+    entry = Entry()
+    entry['title'] = title
+    entry['original_url'] = original_url
+    if url is not None:
+        entry['url'] = url
+    if fields is None:
+        # Stored before the field names were, decode it all now
+        entry.update(json.loads(raw, decode_datetime=True))
+        return entry
+
+    def decode(entry):
+        for key, value in json.loads(raw, decode_datetime=True).items():
+            # Fields set since the entry was built win over the stored ones
+            if entry.is_lazy(key):
+                entry[key] = value
+
+    lazy_fields = [key for key in json.loads(fields) if key not in entry]
+    if lazy_fields:
+        entry.register_lazy_func(decode, lazy_fields)
+    return entry
+
+
+class DBEntrySet(DBEntrySetMixin, MutableSet):
+    db_entry_class = EntryListEntry
+
     def _db_list(self, session):
         return session.query(EntryListList).filter(EntryListList.name == self.config).first()
 
@@ -113,10 +180,25 @@ class DBEntrySet(MutableSet):
         return db_entry
 
     def __iter__(self):
-        with Session() as session:
-            for e in self._db_list(session).entries.order_by(EntryListEntry.added.desc()).all():
-                log.debug('returning %s', e.entry)
-                yield e.entry
+        # Stream the list a page at a time, newest first, without loading the whole rows into the session
+        columns = [EntryListEntry.id, EntryListEntry.added, EntryListEntry.title, EntryListEntry.original_url,
+                   EntryListEntry.url, EntryListEntry._fields.label('fields'), EntryListEntry._json.label('json')]
+        last = None
+        while True:
+            with Session() as session:
+                query = session.query(*columns).filter(EntryListEntry.list_id == self._db_list(session).id)
+                if last and last.added is None:
+                    # Rows without an added date come last
+                    query = query.filter(EntryListEntry.added == None, EntryListEntry.id < last.id)  # noqa
+                elif last:
+                    query = query.filter(or_(EntryListEntry.added < last.added, EntryListEntry.added == None,  # noqa
+                                             and_(EntryListEntry.added == last.added, EntryListEntry.id < last.id)))
+                rows = query.order_by(EntryListEntry.added.desc(), EntryListEntry.id.desc()).limit(PAGE_SIZE).all()
+            for row in rows:
+                yield lazy_entry(row.title, row.original_url, row.url, row.fields, row.json)
+            if len(rows) < PAGE_SIZE:
+                return
+            last = rows[-1]
 
     def __contains__(self, entry):
         with Session() as session:
@@ -149,14 +231,12 @@ class DBEntrySet(MutableSet):
             session.add(stored_entry)
 
     def __ior__(self, other):
-        # Optimization to only open one session when adding multiple items
-        # Make sure lazy lookups are done before opening our session to prevent db locks
-        for value in other:
-            value.values()
-        for value in other:
-            self.add(value)
+        self.add_many(list(other))
         return self
 
+    def _new_db_entry(self, entry, db_list):
+        return EntryListEntry(entry=entry, entry_list_id=db_list.id)
+
     @property
     def immutable(self):
         return False
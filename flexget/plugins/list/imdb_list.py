@@ -77,6 +77,8 @@ else:
 
 
 class ImdbEntrySet(MutableSet):
+    # Items are matched by these fields when checking many entries at once
+    index_keys = ['imdb_id']
     schema = {
         'type': 'object',
         'properties': {
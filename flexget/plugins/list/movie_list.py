@@ -6,7 +6,7 @@ from collections import MutableSet
 from datetime import datetime
 
 from sqlalchemy import Column, Unicode, Integer, ForeignKey, func, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload
 from sqlalchemy.sql.elements import and_
 
 from flexget import plugin
@@ -204,6 +204,37 @@ class MovieList(MutableSet):
             log.debug('found movie %s', res)
         return res
 
+    def _find_many(self, entries, session):
+        """
+        Finds the `MovieListMovie` corresponding to each of `entries`, with the same rules as `_find_entry` but
+        loading the list only once.
+        """
+        supported_ids = MovieListBase().supported_ids
+        by_id = {}
+        by_name = {}
+        for movie in self._db_list(session).movies.options(joinedload(MovieListMovie.ids)).order_by(MovieListMovie.id):
+            for movie_list_id in movie.ids:
+                by_id.setdefault((movie_list_id.id_name, movie_list_id.id_value), movie)
+            if movie.title:
+                by_name.setdefault((movie.title.lower(), movie.year), movie)
+        matches = []
+        for entry in entries:
+            match = None
+            for id_name in supported_ids:
+                if entry.get(id_name):
+                    match = by_id.get((id_name, str(entry[id_name])))
+                    if match:
+                        break
+            if not match:
+                if not entry.get('movie_name'):
+                    self._parse_title(entry)
+                if entry.get('movie_name'):
+                    match = by_name.get((entry['movie_name'].lower(), entry.get('movie_year') or None))
+                else:
+                    log.warning('Could not get a movie name, skipping')
+            matches.append(match)
+        return matches
+
     @staticmethod
     def _parse_title(entry):
         parser = get_plugin_by_name('parsing').instance.parse_movie(data=entry['title'])
@@ -228,6 +259,25 @@ class MovieList(MutableSet):
         match = self._find_entry(entry=entry, session=session)
         return match.to_entry() if match else None
 
+    def get_many(self, entries):
+        with Session() as session:
+            matches = self._find_many(entries, session)
+            # Entries matching the same movie get the same result
+            results = {}
+            for match in matches:
+                if match and match.id not in results:
+                    results[match.id] = match.to_entry()
+            return [results[match.id] if match else None for match in matches]
+
+    def discard_many(self, entries):
+        with Session() as session:
+            deleted = set()
+            for db_movie in self._find_many(entries, session):
+                if db_movie and db_movie.id not in deleted:
+                    log.debug('deleting movie %s', db_movie)
+                    session.delete(db_movie)
+                    deleted.add(db_movie.id)
+
 
 class PluginMovieList(object):
     """Remove all accepted elements from your trakt.tv watchlist/library/seen or custom list."""
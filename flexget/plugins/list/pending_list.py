@@ -16,6 +16,7 @@ from flexget.entry import Entry
 from flexget.event import event
 from flexget.manager import Session
 from flexget.utils.database import entry_synonym, with_session
+from flexget.utils.list_interface import DBEntrySetMixin
 
 plugin_name = 'pending_list'
 log = logging.getLogger(plugin_name)
@@ -77,7 +78,9 @@ class PendingListEntry(Base):
         }
 
 
-class PendingListSet(MutableSet):
+class PendingListSet(DBEntrySetMixin, MutableSet):
+    db_entry_class = PendingListEntry
+
     def _db_list(self, session):
         return session.query(PendingListList).filter(PendingListList.name == self.config).first()
 
@@ -133,14 +136,12 @@ class PendingListSet(MutableSet):
             session.add(stored_entry)
 
     def __ior__(self, other):
-        # Optimization to only open one session when adding multiple items
-        # Make sure lazy lookups are done before opening our session to prevent db locks
-        for value in other:
-            value.values()
-        for value in other:
-            self.add(value)
+        self.add_many(list(other))
         return self
 
+    def _new_db_entry(self, entry, db_list):
+        return PendingListEntry(entry=entry, pending_list_id=db_list.id)
+
     @property
     def immutable(self):
         return False
@@ -159,6 +160,9 @@ class PendingListSet(MutableSet):
             match = self._entry_query(session=session, entry=entry, approved=True)
             return Entry(match.entry) if match else None
 
+    def _get_query(self, session):
+        return self._db_list(session).entries.filter(PendingListEntry.approved == True)
+
 
 class PendingList(object):
     schema = {'type': 'string'}
@@ -139,6 +139,23 @@ class RegexpList(MutableSet):
         match = self._find_entry(entry=entry, match_regexp=True, session=session)
         return match.to_entry() if match else None
 
+    def get_many(self, entries):
+        with Session() as session:
+            # Load and compile the regexps once for all entries
+            regexps = [(re.compile(regexp.regexp, re.IGNORECASE), regexp) for regexp in self._db_list(session).regexps]
+            results = {}
+            matches = []
+            for entry in entries:
+                # Like `_find_entry`, the last matching regexp wins
+                match = None
+                for compiled, regexp in regexps:
+                    if compiled.search(entry['title']):
+                        match = regexp
+                if match and match.id not in results:
+                    results[match.id] = match.to_entry()
+                matches.append(results[match.id] if match else None)
+            return matches
+
 
 class PluginRegexpList(object):
     """Subtitle list"""
@@ -10,6 +10,7 @@ from flexget import plugin
 from flexget.entry import Entry
 from flexget.event import event
 from flexget.utils import requests
+from flexget.utils.list_interface import EntryIndex
 
 log = logging.getLogger('sonarr_list')
 
@@ -239,6 +240,20 @@ class SonarrSet(MutableSet):
     def get(self, entry):
         return self._find_entry(entry)
 
+    def get_many(self, entries):
+        """Matches like :meth:`_find_entry`, through an index of the shows instead of going through them per entry"""
+        shows = self.shows()
+        index = EntryIndex(shows, self.supported_ids)
+        positions = dict((id(show), position) for position, show in enumerate(shows))
+        by_title = {}
+        for show in shows:
+            by_title.setdefault(show.get('title').lower(), show)
+        results = []
+        for entry in entries:
+            matches = [show for show in (index.find(entry), by_title.get(entry.get('title').lower())) if show]
+            results.append(min(matches, key=lambda show: positions[id(show)]) if matches else None)
+        return results
+
 
 class SonarrList(object):
     schema = SonarrSet.schema
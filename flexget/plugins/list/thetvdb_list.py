@@ -16,6 +16,8 @@ log = logging.getLogger('thetvdb_list')
 
 
 class TheTVDBSet(MutableSet):
+    # Items are matched by these fields when checking many entries at once
+    index_keys = ['tvdb_id']
     schema = {
         'type': 'object',
         'properties': {
@@ -11,11 +11,15 @@ from flexget.event import event
 from flexget.plugins.internal.api_trakt import get_api_url, get_entry_ids, get_session, make_list_slug
 from flexget.utils import json
 from flexget.utils.cached_input import cached
+from flexget.utils.list_interface import EntryIndex
 from flexget.utils.requests import RequestException, TimedLimiter
 from flexget.utils.tools import split_title_year
 
 log = logging.getLogger('trakt_list')
 IMMUTABLE_LISTS = []
+# Fields identifying the show or movie of an item
+SHOW_IDS = ['series_name', 'trakt_show_id', 'tmdb_id', 'tvdb_id', 'imdb_id', 'tvrage_id']
+MOVIE_IDS = ['trakt_movie_id', 'imdb_id', 'tmdb_id']
 
 
 def generate_show_title(item):
@@ -132,17 +136,30 @@ class TraktSet(MutableSet):
         # Optimization to submit multiple entries at same time
         self.submit(entries, remove=True)
 
+    def _matches(self, entry, item):
+        return (self.config['type'] in ['episodes', 'auto'] and self.episode_match(entry, item) or
+                self.config['type'] in ['seasons', 'auto'] and self.season_match(entry, item) or
+                self.config['type'] in ['shows', 'auto'] and self.show_match(entry, item) or
+                self.config['type'] in ['movies', 'auto'] and self.movie_match(entry, item))
+
     def _find_entry(self, entry):
         for item in self.items:
-            if self.config['type'] in ['episodes', 'auto'] and self.episode_match(entry, item):
-                return item
-            if self.config['type'] in ['seasons', 'auto'] and self.season_match(entry, item):
-                return item
-            if self.config['type'] in ['shows', 'auto'] and self.show_match(entry, item):
-                return item
-            if self.config['type'] in ['movies', 'auto'] and self.movie_match(entry, item):
+            if self._matches(entry, item):
                 return item
 
+    def _index_keys(self):
+        """Fields of the items which must be equal to an entry's for them to match, depending on the list type."""
+        keys = []
+        if self.config['type'] in ['episodes', 'auto']:
+            keys.extend((ident, 'series_season', 'series_episode') for ident in SHOW_IDS)
+        if self.config['type'] in ['seasons', 'auto']:
+            keys.extend((ident, 'series_season') for ident in SHOW_IDS)
+        if self.config['type'] in ['shows', 'auto']:
+            keys.extend(SHOW_IDS)
+        if self.config['type'] in ['movies', 'auto']:
+            keys.extend(ident for ident in MOVIE_IDS + ['movie_name'] if ident not in keys)
+        return keys
+
     def __contains__(self, entry):
         return self._find_entry(entry) is not None
 
@@ -155,6 +172,11 @@ class TraktSet(MutableSet):
     def get(self, entry):
         return self._find_entry(entry)
 
+    def get_many(self, entries):
+        # Look the entries up in an index of the items, instead of going through all items for each entry
+        index = EntryIndex(self.items, self._index_keys())
+        return [index.find(entry, self._matches) for entry in entries]
+
     # -- Public interface ends here -- #
 
     @property
@@ -237,8 +259,7 @@ class TraktSet(MutableSet):
         return endpoint
 
     def show_match(self, entry1, entry2):
-        if any(entry1.get(ident) is not None and entry1[ident] == entry2.get(ident) for ident in
-               ['series_name', 'trakt_show_id', 'tmdb_id', 'tvdb_id', 'imdb_id', 'tvrage_id']):
+        if any(entry1.get(ident) is not None and entry1[ident] == entry2.get(ident) for ident in SHOW_IDS):
             return True
         return False
 
@@ -251,8 +272,7 @@ class TraktSet(MutableSet):
                 entry1['series_episode'] == entry2.get('series_episode'))
 
     def movie_match(self, entry1, entry2):
-        if any(entry1.get(id) is not None and entry1[id] == entry2[id] for id in
-               ['trakt_movie_id', 'imdb_id', 'tmdb_id']):
+        if any(entry1.get(id) is not None and entry1[id] == entry2.get(id) for id in MOVIE_IDS):
             return True
         if entry1.get('movie_name') and ((entry1.get('movie_name'), entry1.get('movie_year')) ==
                                          (entry2.get('movie_name'), entry2.get('movie_year'))):
@@ -3,6 +3,7 @@ from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 import logging
 from datetime import datetime, timedelta
+from functools import partial
 
 from sqlalchemy import Table, Column, Integer, Float, String, Unicode, Boolean, DateTime
 from sqlalchemy.schema import ForeignKey, Index
@@ -12,11 +13,16 @@ from flexget import db_schema, plugin
 from flexget.db_schema import UpgradeImpossible
 from flexget.event import event
 from flexget.entry import Entry
+from flexget.manager import Session
 from flexget.utils.log import log_once
 from flexget.utils.imdb import ImdbSearch, ImdbParser, extract_id, make_url
 from flexget.utils.database import with_session
+from flexget.utils.parallel import parallel_map
+from flexget.utils.tools import chunked
 
 SCHEMA_VER = 8
+# Amount of concurrent imdb searches and page fetches when looking up all entries of a task
+LOOKUP_WORKERS = 4
 
 Base = db_schema.versioned_base('imdb_lookup', SCHEMA_VER)
 
@@ -191,6 +197,22 @@ class SearchResult(Base):
 log = logging.getLogger('imdb_lookup')
 
 
+def get_or_create(session, model, column, values, create):
+    """
+    :return: Dict mapping each of `values` to the `model` row having it in `column`, with new rows made by `create`
+        for the values which don't have one yet
+    """
+    rows = {}
+    values = list(set(values))
+    for chunk in chunked(values):
+        for row in session.query(model).filter(column.in_(chunk)):
+            rows.setdefault(getattr(row, column.key), row)
+    for value in values:
+        if value not in rows:
+            rows[value] = create(value)
+    return rows
+
+
 @db_schema.upgrade('imdb_lookup')
 def upgrade(ver, session):
     # v5 We may have cached bad data due to imdb changes, just wipe everything. GitHub #697
@@ -239,14 +261,20 @@ class ImdbLookup(object):
     def on_task_metainfo(self, task, config):
         if not config:
             return
+        # The first lazy lookup prefetches all the entries of the task which still need one
+        lazy_loader = partial(self.lazy_loader, pending=list(task.entries))
         for entry in task.entries:
-            self.register_lazy_fields(entry)
+            entry.register_lazy_func(lazy_loader, self.field_map)
 
     def register_lazy_fields(self, entry):
         entry.register_lazy_func(self.lazy_loader, self.field_map)
 
-    def lazy_loader(self, entry):
+    def lazy_loader(self, entry, pending=None):
         """Does the lookup for this entry and populates the entry fields."""
+        if pending:
+            entries = [e for e in pending if e.is_lazy('imdb_url') and not (e.rejected or e.failed)]
+            del pending[:]
+            self.prefetch(entries)
         try:
             self.lookup(entry)
         except plugin.PluginError as e:
@@ -421,46 +449,157 @@ class ImdbLookup(object):
         """
         parser = ImdbParser()
         parser.parse(imdb_url)
-        # store to database
-        movie = Movie()
-        movie.photo = parser.photo
-        movie.title = parser.name
-        movie.original_title = parser.original_name
-        movie.score = parser.score
-        movie.votes = parser.votes
-        movie.year = parser.year
-        movie.mpaa_rating = parser.mpaa_rating
-        movie.plot_outline = parser.plot_outline
-        movie.url = imdb_url
-        for name in parser.genres:
-            genre = session.query(Genre).filter(Genre.name == name).first()
-            if not genre:
-                genre = Genre(name)
-            movie.genres.append(genre)  # pylint:disable=E1101
-        for index, name in enumerate(parser.languages):
-            language = session.query(Language).filter(Language.name == name).first()
-            if not language:
-                language = Language(name)
-            movie.languages.append(MovieLanguage(language, prominence=index))
-        for imdb_id, name in parser.actors.items():
-            actor = session.query(Actor).filter(Actor.imdb_id == imdb_id).first()
-            if not actor:
-                actor = Actor(imdb_id, name)
-            movie.actors.append(actor)  # pylint:disable=E1101
-        for imdb_id, name in parser.directors.items():
-            director = session.query(Director).filter(Director.imdb_id == imdb_id).first()
-            if not director:
-                director = Director(imdb_id, name)
-            movie.directors.append(director)  # pylint:disable=E1101
-        for imdb_id, name in parser.writers.items():
-            writer = session.query(Writer).filter(Writer.imdb_id == imdb_id).first()
-            if not writer:
-                writer = Writer(imdb_id, name)
-            movie.writers.append(writer)  # pylint:disable=E1101
+        return self._store_movies([(imdb_url, parser)], session)[0]
+
+    def _store_movies(self, parsed, session):
+        """
+        Save movies into the database, looking up the genres, languages and people they share with other movies with
+        one query per table.
+
+        :param parsed: List of (imdb url, :class:`ImdbParser`)
+        :param session: Session to be used
+        :return: List of the newly added Movies
+        """
+        parsers = [parser for _, parser in parsed]
+        genres = get_or_create(session, Genre, Genre.name, (name for p in parsers for name in p.genres), Genre)
+        languages = get_or_create(session, Language, Language.name, (name for p in parsers for name in p.languages),
+                                  Language)
+        people = {}
+        for model, attr in [(Actor, 'actors'), (Director, 'directors'), (Writer, 'writers')]:
+            names = {}
+            for parser in parsers:
+                names.update(getattr(parser, attr))
+            people[attr] = get_or_create(session, model, model.imdb_id, names,
+                                         lambda imdb_id, model=model, names=names: model(imdb_id, names[imdb_id]))
+        movies = []
+        for imdb_url, parser in parsed:
+            movie = Movie()
+            movie.photo = parser.photo
+            movie.title = parser.name
+            movie.original_title = parser.original_name
+            movie.score = parser.score
+            movie.votes = parser.votes
+            movie.year = parser.year
+            movie.mpaa_rating = parser.mpaa_rating
+            movie.plot_outline = parser.plot_outline
+            movie.url = imdb_url
+            movie.genres = [genres[name] for name in parser.genres]
+            movie.languages = [MovieLanguage(languages[name], prominence=index)
+                               for index, name in enumerate(parser.languages)]
+            for attr in ['actors', 'directors', 'writers']:
+                setattr(movie, attr, [people[attr][imdb_id] for imdb_id in getattr(parser, attr)])
             # so that we can track how long since we've updated the info later
-        movie.updated = datetime.now()
-        session.add(movie)
-        return movie
+            movie.updated = datetime.now()
+            session.add(movie)
+            movies.append(movie)
+        return movies
+
+    @staticmethod
+    def _search(name_year):
+        """:return: Url of the best match for (name, year), None if there is none, or the exception raised"""
+        try:
+            result = ImdbSearch().best_match(*name_year)
+        except Exception as e:
+            log.debug('Searching imdb for %s failed: %s', name_year, e)
+            return e
+        return result['url'] if result else None
+
+    @staticmethod
+    def _fetch(imdb_url):
+        """:return: :class:`ImdbParser` for the page, or None if it failed"""
+        parser = ImdbParser()
+        try:
+            parser.parse(imdb_url)
+        except Exception as e:
+            log.debug('Parsing %s failed: %s', imdb_url, e)
+            return None
+        return parser
+
+    def prefetch(self, entries):
+        """
+        Fills the caches for all of `entries` at once, so that their lookups don't need to go online. Entries searching
+        for the same movie name and year, or having the same imdb url, share one search or page fetch. Those run on a
+        pool of threads, and their results are stored in one session.
+
+        Errors are left for the lookup of each entry to handle and report.
+        """
+        from flexget.manager import manager
+
+        parse_movie = plugin.get_plugin_by_name('parsing').instance.parse_movie
+        # Url of each entry, None for those which still need to be searched
+        urls = [self._entry_url(entry) for entry in entries]
+        titles = set(entry['title'] for entry, url in zip(entries, urls)
+                     if not url and entry.get('title', eval_lazy=False))
+        cached = {}
+        with Session() as session:
+            for chunk in chunked(list(titles)):
+                for result in session.query(SearchResult).filter(SearchResult.title.in_(chunk)):
+                    cached.setdefault(result.title, (result.url, result.fails))
+        # Titles to search for, by parsed (name, year)
+        searches = {}
+        for index, entry in enumerate(entries):
+            if urls[index] or entry['title'] not in titles:
+                continue
+            url, fails = cached.get(entry['title'], (None, False))
+            if url or fails and not manager.options.execute.retry:
+                urls[index] = url
+                continue
+            parser = parse_movie(entry.get('movie_name', entry['title'], eval_lazy=False))
+            if parser.name:
+                key = (parser.name.lower(), parser.year)
+                searches.setdefault(key, ((parser.name, parser.year), set()))[1].add(entry['title'])
+
+        found = {}
+        if searches:
+            log.verbose('Searching imdb for %s movies', len(searches))
+            keys = list(searches)
+            results = parallel_map(self._search, [searches[key][0] for key in keys], workers=LOOKUP_WORKERS,
+                                   name='imdb_lookup')
+            for key, url in zip(keys, results):
+                if not isinstance(url, Exception):
+                    found.update((title, url) for title in searches[key][1])
+            urls = [url or found.get(entry['title']) for entry, url in zip(entries, urls)]
+
+        wanted = []
+        for url in urls:
+            if url and url not in wanted:
+                wanted.append(url)
+        with Session() as session:
+            # Store the searches, so that they are not done again
+            for title, url in found.items():
+                result = SearchResult(title, url)
+                if url:
+                    log.verbose('Found %s' % url)
+                else:
+                    log_once('IMDB lookup failed for %s' % title, log, logging.WARN, session=session)
+                    result.fails = True
+                session.add(result)
+            expired = set()
+            fresh = set()
+            for chunk in chunked(wanted):
+                for movie in session.query(Movie).filter(Movie.url.in_(chunk)):
+                    (expired if movie.expired else fresh).add(movie.url)
+        fetch = [url for url in wanted if url not in fresh]
+        if not fetch:
+            return
+
+        log.verbose('Parsing imdb for %s movies', len(fetch))
+        parsed = [(url, parser) for url, parser in
+                  zip(fetch, parallel_map(self._fetch, fetch, workers=LOOKUP_WORKERS, name='imdb_lookup')) if parser]
+        with Session() as session:
+            for url, _ in parsed:
+                if url in expired:
+                    # Remove the old movie, it is replaced by the new one
+                    for movie in session.query(Movie).filter(Movie.url == url).all():
+                        session.query(MovieLanguage).filter(MovieLanguage.movie_id == movie.id).delete()
+                    session.query(Movie).filter(Movie.url == url).delete()
+            self._store_movies(parsed, session)
+
+    @staticmethod
+    def _entry_url(entry):
+        """:return: Imdb url from the imdb_id or imdb_url fields of `entry`, if it has one"""
+        imdb_id = entry.get('imdb_id', eval_lazy=False) or extract_id(entry.get('imdb_url', eval_lazy=False))
+        return make_url(imdb_id) if imdb_id else None
 
     @property
     def movie_identifier(self):
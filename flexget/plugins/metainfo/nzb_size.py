@@ -31,6 +31,10 @@ class NzbSize(object):
             raise plugin.DependencyError(issued_by='nzb_size', missing='lib pynzb')
 
         for entry in task.accepted:
+            if entry.get('file_type') not in (None, 'nzb'):
+                # The download plugin found the content is something else
+                log.trace('%s is not a nzb but %s', entry['title'], entry['file_type'])
+                continue
             if entry.get('mime-type') in ['text/nzb', 'application/x-nzb'] or \
                     entry.get('filename') and entry['filename'].endswith('.nzb'):
 
@@ -9,7 +9,8 @@ import logging
 from flexget import plugin
 from flexget.event import event
 
-from flexget.plugins.internal.api_tvdb import lookup_series, lookup_episode
+from flexget.plugins.internal.api_tvdb import lookup_series, lookup_episode, mark_expired
+from flexget.utils.bulk_lookup import BulkLookup
 from flexget.utils.database import with_session
 
 log = logging.getLogger('thetvdb_lookup')
@@ -121,8 +122,28 @@ class PluginThetvdbLookup(object):
             log.debug('Error looking up tvdb series information for %s: %s', entry['title'], e.args[0])
         return entry
 
-    def lazy_series_lookup(self, entry, language):
-        return self.series_lookup(entry, language, self.series_map)
+    @staticmethod
+    def bulk_key(entry, language):
+        name = entry.get('series_name', eval_lazy=False)
+        tvdb_id = entry.get('tvdb_id', eval_lazy=False)
+        if not (name or tvdb_id):
+            return None
+        return name, tvdb_id, entry.get('language', language)
+
+    @staticmethod
+    def bulk_series_lookup(key, session, only_cached):
+        name, tvdb_id, language = key
+        if only_cached:
+            # Make sure series updated on tvdb are not taken from the cache
+            mark_expired(session)
+        return lookup_series(name, tvdb_id=tvdb_id, language=language, only_cached=only_cached, session=session)
+
+    def lazy_series_lookup(self, entry, language, bulk=None):
+        if bulk is None:
+            return self.series_lookup(entry, language, self.series_map)
+        if not bulk.populate(entry):
+            log.debug('Error looking up tvdb series information for %s', entry['title'])
+        return entry
 
     def lazy_series_actor_lookup(self, entry, language):
         return self.series_lookup(entry, language, self.series_actor_map)
@@ -167,11 +188,15 @@ class PluginThetvdbLookup(object):
             return
 
         language = config['language'] if not isinstance(config, bool) else 'en'
+        # All entries of the same series share a single series lookup
+        bulk = BulkLookup('thetvdb_lookup', partial(self.bulk_key, language=language), self.bulk_series_lookup,
+                          self.series_map)
 
         for entry in task.entries:
             # If there is information for a series lookup, register our series lazy fields
             if entry.get('series_name') or entry.get('tvdb_id', eval_lazy=False):
-                lazy_series_lookup = partial(self.lazy_series_lookup, language=language)
+                bulk.add(entry)
+                lazy_series_lookup = partial(self.lazy_series_lookup, language=language, bulk=bulk)
                 lazy_series_actor_lookup = partial(self.lazy_series_actor_lookup, language=language)
                 lazy_series_poster_lookup = partial(self.lazy_series_poster_lookup, language=language)
 
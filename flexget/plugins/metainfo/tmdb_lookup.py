@@ -8,6 +8,7 @@ from flexget import plugin
 from flexget.event import event
 from flexget.manager import Session
 from flexget.utils import imdb
+from flexget.utils.bulk_lookup import BulkLookup
 from flexget.utils.log import log_once
 
 log = logging.getLogger('tmdb_lookup')
@@ -51,40 +52,61 @@ class PluginTmdbLookup(object):
          }}
     ]}
 
-    def lazy_loader(self, entry, language):
-        """Does the lookup for this entry and populates the entry fields."""
-        lookup = plugin.get_plugin_by_name('api_tmdb').instance.lookup
-
+    @staticmethod
+    def bulk_key(entry, language):
         imdb_id = (entry.get('imdb_id', eval_lazy=False) or
                    imdb.extract_id(entry.get('imdb_url', eval_lazy=False)))
+        # Keyed on the movie rather than the title, so releases of the same movie share a lookup
+        movie_name = entry.get('movie_name', eval_lazy=False)
+        movie_year = entry.get('movie_year', eval_lazy=False)
+        if not movie_name:
+            parsed = plugin.get_plugin_by_name('parsing').instance.parse_movie(entry['title'])
+            movie_name, movie_year = parsed.name, parsed.year
+        return entry.get('tmdb_id', eval_lazy=False), imdb_id, movie_name, movie_year, language
+
+    @staticmethod
+    def bulk_movie_lookup(key, session, only_cached):
+        lookup = plugin.get_plugin_by_name('api_tmdb').instance.lookup
+        tmdb_id, imdb_id, movie_name, movie_year, language = key
+        return lookup(title=movie_name, year=movie_year, tmdb_id=tmdb_id, imdb_id=imdb_id, language=language,
+                      only_cached=only_cached, session=session)
+
+    def lazy_loader(self, entry, language, bulk=None):
+        """Does the lookup for this entry and populates the entry fields."""
+        if bulk is not None:
+            if not bulk.populate(entry):
+                log_once('TMDB lookup failed for %s' % entry['title'], log, logging.WARN)
+            return
         try:
             with Session() as session:
-                movie = lookup(smart_match=entry['title'],
-                               tmdb_id=entry.get('tmdb_id', eval_lazy=False),
-                               imdb_id=imdb_id,
-                               language=language,
-                               session=session)
+                movie = self.bulk_movie_lookup(self.bulk_key(entry, language), session, only_cached=False)
                 entry.update_using_map(self.field_map, movie)
         except LookupError:
             log_once('TMDB lookup failed for %s' % entry['title'], log, logging.WARN)
 
-    def lookup(self, entry, language):
+    def lookup(self, entry, language, bulk=None):
         """
         Populates all lazy fields to an Entry. May be called by other plugins
         requiring tmdb info on an Entry
 
         :param entry: Entry instance
+        :param bulk: Optional :class:`BulkLookup` shared by entries which should be looked up together
         """
-        lazy_func = partial(self.lazy_loader, language=language)
+        if bulk is not None:
+            bulk.add(entry)
+        lazy_func = partial(self.lazy_loader, language=language, bulk=bulk)
         entry.register_lazy_func(lazy_func, self.field_map)
 
     def on_task_metainfo(self, task, config):
         if not config:
             return
         language = config['language'] if not isinstance(config, bool) else 'en'
+        # Entries for the same movie share a single lookup
+        bulk = BulkLookup('tmdb_lookup', partial(self.bulk_key, language=language), self.bulk_movie_lookup,
+                          self.field_map)
 
         for entry in task.entries:
-            self.lookup(entry, language)
+            self.lookup(entry, language, bulk)
 
     @property
     def movie_identifier(self):
@@ -8,6 +8,7 @@ import functools
 from flexget import plugin
 from flexget.event import event
 from flexget.manager import Session
+from flexget.utils.bulk_lookup import BulkLookup
 
 try:
     from flexget.plugins.internal.api_trakt import ApiTrakt, list_actors, get_translations_dict
@@ -181,21 +182,24 @@ class PluginTraktLookup(object):
         }
     ]}
 
-    def lazy_series_lookup(self, entry):
-        """Does the lookup for this entry and populates the entry fields."""
-        with Session() as session:
-            lookupargs = {'title': entry.get('series_name', eval_lazy=False),
-                          'year': entry.get('year', eval_lazy=False),
-                          'trakt_id': entry.get('trakt_show_id', eval_lazy=False),
-                          'tvdb_id': entry.get('tvdb_id', eval_lazy=False),
-                          'tmdb_id': entry.get('tmdb_id', eval_lazy=False),
-                          'session': session}
-            try:
-                series = lookup_series(**lookupargs)
-            except LookupError as e:
-                log.debug(e.args[0])
-            else:
-                entry.update_using_map(self.series_map, series)
+    # Entry fields used for the main series and movie lookups, mapped to the lookup argument they are passed as
+    series_lookup_fields = (('title', 'series_name'), ('year', 'year'), ('trakt_id', 'trakt_show_id'),
+                            ('tvdb_id', 'tvdb_id'), ('tmdb_id', 'tmdb_id'))
+    movie_lookup_fields = (('title', 'title'), ('year', 'year'), ('trakt_id', 'trakt_movie_id'),
+                           ('trakt_slug', 'trakt_movie_slug'), ('tmdb_id', 'tmdb_id'), ('imdb_id', 'imdb_id'))
+
+    @staticmethod
+    def bulk_key(lookup_fields, entry):
+        return tuple((arg, entry.get(field, eval_lazy=False)) for arg, field in lookup_fields)
+
+    @staticmethod
+    def bulk_lookup(lookup, key, session, only_cached):
+        return lookup(session=session, only_cached=only_cached, **dict(key))
+
+    def lazy_series_lookup(self, entry, bulk):
+        """Populates the entry fields from the series lookup shared by all entries of the task."""
+        if not bulk.populate(entry):
+            log.debug('Could not look up trakt series information for %s', entry['title'])
         return entry
 
     def lazy_series_actor_lookup(self, entry):
@@ -254,22 +258,10 @@ class PluginTraktLookup(object):
                 entry.update_using_map(self.season_map, season)
         return entry
 
-    def lazy_movie_lookup(self, entry):
-        """Does the lookup for this entry and populates the entry fields."""
-        with Session() as session:
-            lookupargs = {'title': entry.get('title', eval_lazy=False),
-                          'year': entry.get('year', eval_lazy=False),
-                          'trakt_id': entry.get('trakt_movie_id', eval_lazy=False),
-                          'trakt_slug': entry.get('trakt_movie_slug', eval_lazy=False),
-                          'tmdb_id': entry.get('tmdb_id', eval_lazy=False),
-                          'imdb_id': entry.get('imdb_id', eval_lazy=False),
-                          'session': session}
-            try:
-                movie = lookup_movie(**lookupargs)
-            except LookupError as e:
-                log.debug(e.args[0])
-            else:
-                entry.update_using_map(self.movie_map, movie)
+    def lazy_movie_lookup(self, entry, bulk):
+        """Populates the entry fields from the movie lookup shared by all entries of the task."""
+        if not bulk.populate(entry):
+            log.debug('Could not look up trakt movie information for %s', entry['title'])
         return entry
 
     def lazy_movie_actor_lookup(self, entry):
@@ -398,10 +390,19 @@ class PluginTraktLookup(object):
         if isinstance(config, bool):
             config = dict()
 
+        # All entries of the same series or movie share a single lookup
+        series_bulk = BulkLookup('trakt_lookup', functools.partial(self.bulk_key, self.series_lookup_fields),
+                                 functools.partial(self.bulk_lookup, lookup_series), self.series_map)
+        movie_bulk = BulkLookup('trakt_lookup', functools.partial(self.bulk_key, self.movie_lookup_fields),
+                                functools.partial(self.bulk_lookup, lookup_movie), self.movie_map)
+        lazy_series_lookup = functools.partial(self.lazy_series_lookup, bulk=series_bulk)
+        lazy_movie_lookup = functools.partial(self.lazy_movie_lookup, bulk=movie_bulk)
+
         for entry in task.entries:
             if entry.get('series_name') or entry.get('tvdb_id', eval_lazy=False):
                 style = 'show'
-                entry.register_lazy_func(self.lazy_series_lookup, self.series_map)
+                series_bulk.add(entry)
+                entry.register_lazy_func(lazy_series_lookup, self.series_map)
                 # TODO cleaner way to do this?
                 entry.register_lazy_func(self.lazy_series_actor_lookup, self.series_actor_map)
                 entry.register_lazy_func(self.lazy_series_translate_lookup, self.show_translate_map)
@@ -412,7 +413,8 @@ class PluginTraktLookup(object):
                     entry.register_lazy_func(self.lazy_season_lookup, self.season_map)
                     style = 'season'
             else:
-                entry.register_lazy_func(self.lazy_movie_lookup, self.movie_map)
+                movie_bulk.add(entry)
+                entry.register_lazy_func(lazy_movie_lookup, self.movie_map)
                 # TODO cleaner way to do this?
                 entry.register_lazy_func(self.lazy_movie_actor_lookup, self.movie_actor_map)
                 entry.register_lazy_func(self.lazy_movie_translate_lookup, self.movie_translate_map)
@@ -1,12 +1,14 @@
 from __future__ import unicode_literals, division, absolute_import
 
 import logging
+from functools import partial
 
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 from flexget import plugin
 from flexget.event import event
 from flexget.manager import Session
+from flexget.utils.bulk_lookup import BulkLookup
 
 log = logging.getLogger('tvmaze_lookup')
 
@@ -125,22 +127,22 @@ class PluginTVMazeLookup(object):
 
     schema = {'type': 'boolean'}
 
-    def lazy_series_lookup(self, entry):
-        """Does the lookup for this entry and populates the entry fields."""
+    @staticmethod
+    def bulk_key(entry):
+        return tuple(entry.get(field, eval_lazy=False) for field in ('series_name', 'year', 'tvmaze_id', 'tvdb_id',
+                                                                     'tvrage_id'))
+
+    @staticmethod
+    def bulk_series_lookup(key, session, only_cached):
         series_lookup = plugin.get_plugin_by_name('api_tvmaze').instance.series_lookup
-        with Session() as session:
-            lookupargs = {'title': entry.get('series_name', eval_lazy=False),
-                          'year': entry.get('year', eval_lazy=False),
-                          'tvmaze_id': entry.get('tvmaze_id', eval_lazy=False),
-                          'tvdb_id': entry.get('tvdb_id', eval_lazy=False),
-                          'tvrage_id': entry.get('tvrage_idk', eval_lazy=False),
-                          'session': session}
-            try:
-                series = series_lookup(**lookupargs)
-            except LookupError as e:
-                log.debug(e)
-            else:
-                entry.update_using_map(self.series_map, series)
+        title, year, tvmaze_id, tvdb_id, tvrage_id = key
+        return series_lookup(title=title, year=year, tvmaze_id=tvmaze_id, tvdb_id=tvdb_id, tvrage_id=tvrage_id,
+                             only_cached=only_cached, session=session)
+
+    def lazy_series_lookup(self, entry, bulk):
+        """Populates the entry fields from the series lookup shared by all entries of the task."""
+        if not bulk.populate(entry):
+            log.debug('Could not look up tvmaze series information for %s', entry['title'])
         return entry
 
     def lazy_season_lookup(self, entry):
@@ -188,10 +190,14 @@ class PluginTVMazeLookup(object):
         if not config:
             return
 
+        # All entries of the same series share a single series lookup
+        bulk = BulkLookup('tvmaze_lookup', self.bulk_key, self.bulk_series_lookup, self.series_map)
+        lazy_series_lookup = partial(self.lazy_series_lookup, bulk=bulk)
         for entry in task.entries:
             if entry.get('series_name') or entry.get('tvdb_id', eval_lazy=False) \
                     or entry.get('tvmaze_id', eval_lazy=False) or entry.get('tvrage_id', eval_lazy=False):
-                entry.register_lazy_func(self.lazy_series_lookup, self.series_map)
+                bulk.add(entry)
+                entry.register_lazy_func(lazy_series_lookup, self.series_map)
                 if entry.get('season_pack', eval_lazy=False):
                     entry.register_lazy_func(self.lazy_season_lookup, self.season_map)
                 if ('series_season' in entry and 'series_episode' in entry) or ('series_date' in entry):
@@ -29,10 +29,14 @@ class TorrentFilename(object):
             if not os.path.exists(entry['file']):
                 log.debug('File %s does not exist', entry['file'])
                 continue
-            if os.path.getsize(entry['file']) == 0:
+            if 'file_type' in entry:
+                # Size and type were found by the download plugin while downloading
+                if entry['file_type'] != 'torrent':
+                    continue
+            elif os.path.getsize(entry['file']) == 0:
                 log.debug('File %s is 0 bytes in size', entry['file'])
                 continue
-            if not is_torrent_file(entry['file']):
+            elif not is_torrent_file(entry['file']):
                 continue
             log.debug('%s seems to be a torrent', entry['title'])
 
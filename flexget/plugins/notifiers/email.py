@@ -6,6 +6,8 @@ import logging
 import smtplib
 import socket
 import getpass
+import threading
+import time
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.utils import formatdate
@@ -19,6 +21,105 @@ from flexget.plugin import PluginWarning
 plugin_name = 'email'
 log = logging.getLogger(plugin_name)
 
+# Seconds an unused smtp connection is kept open
+IDLE_TIMEOUT = 60
+
+
+def connect_to_smtp_server(config):
+    host = config['smtp_host']
+    port = config['smtp_port']
+    username = config.get('smtp_username')
+    try:
+        log.debug('connecting to smtp server %s:%s', host, port)
+        mail_server = smtplib.SMTP_SSL if config['smtp_ssl'] else smtplib.SMTP
+        mail_server = mail_server(host, port)
+        if config['smtp_tls']:
+            mail_server.ehlo()
+            mail_server.starttls()
+            mail_server.ehlo()
+    except (socket.error, OSError) as e:
+        raise PluginWarning(str(e))
+
+    try:
+        if username:
+            # Forcing to use `str` type
+            log.debug('logging in to smtp server using username: %s', username)
+            mail_server.login(text_to_native_str(username), text_to_native_str(config.get('smtp_password')))
+    except (IOError, SMTPAuthenticationError) as e:
+        mail_server.close()
+        raise PluginWarning(str(e))
+    return mail_server
+
+
+def close_connection(mail_server):
+    try:
+        mail_server.quit()
+    except (smtplib.SMTPException, socket.error, OSError):
+        mail_server.close()
+
+
+class SmtpPool(object):
+    """
+    Open smtp connections, shared by all email notifications in the process so that each mail doesn't pay for
+    connecting, TLS negotiation and login. Connections unused for :data:`IDLE_TIMEOUT` seconds are closed.
+    """
+
+    def __init__(self):
+        # Connection parameters -> list of (connection, last used)
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    @staticmethod
+    def key(config):
+        return tuple(config.get(option) for option in
+                     ['smtp_host', 'smtp_port', 'smtp_ssl', 'smtp_tls', 'smtp_username', 'smtp_password'])
+
+    def get(self, config):
+        """:return: An open connection for the smtp server in `config`, and whether it is a new one"""
+        self.close_idle()
+        with self._lock:
+            idle = self._idle.get(self.key(config))
+            mail_server = idle.pop()[0] if idle else None
+        if mail_server:
+            log.debug('reusing connection to smtp server %s:%s', config['smtp_host'], config['smtp_port'])
+            return mail_server, False
+        return connect_to_smtp_server(config), True
+
+    def put(self, config, mail_server):
+        """Keeps a connection returned by :meth:`get` open for later notifications."""
+        with self._lock:
+            self._idle.setdefault(self.key(config), []).append((mail_server, time.time()))
+            if not self._reaper:
+                self._schedule_reaper()
+
+    def _schedule_reaper(self):
+        self._reaper = threading.Timer(IDLE_TIMEOUT, self._reap)
+        self._reaper.daemon = True
+        self._reaper.start()
+
+    def _reap(self):
+        self.close_idle()
+        with self._lock:
+            self._reaper = None
+            if any(self._idle.values()):
+                self._schedule_reaper()
+
+    def close_idle(self, max_idle=None):
+        """Closes the connections unused for `max_idle` seconds, :data:`IDLE_TIMEOUT` by default."""
+        max_idle = IDLE_TIMEOUT if max_idle is None else max_idle
+        expired = []
+        with self._lock:
+            now = time.time()
+            for key, idle in self._idle.items():
+                expired.extend(mail_server for mail_server, last_used in idle if now - last_used >= max_idle)
+                idle[:] = [(mail_server, last_used) for mail_server, last_used in idle if now - last_used < max_idle]
+        for mail_server in expired:
+            close_connection(mail_server)
+
+
+smtp_pool = SmtpPool()
+
 
 class EmailNotifier(object):
     """
@@ -37,6 +138,7 @@ class EmailNotifier(object):
     smtp_password    The password to use to connect to the smtp server
     smtp_tls         Should we use TLS to connect to the smtp server
     smtp_ssl         Should we use SSL to connect to the smtp server
+    digest           Combine notifications waiting to be sent into one email
     ===============  ===================================================================
 
     Config basic example::
@@ -92,42 +194,12 @@ class EmailNotifier(object):
                 smtp_password:
                 smtp_tls: False
                 smtp_ssl: False
+                digest: False
     """
 
-    def __init__(self):
-        self.mail_server = None
-        self.host = None
-        self.port = None
-        self.username = None
-        self.password = None
-        self.ssl = None
-        self.tls = None
-
-    def connect_to_smtp_server(self, config):
-        self.host = config['smtp_host']
-        self.port = config['smtp_port']
-        self.ssl = config['smtp_ssl']
-        self.tls = config['smtp_tls']
-        self.username = config.get('smtp_username')
-        self.password = config.get('smtp_password')
-        try:
-            log.debug('connecting to smtp server %s:%s', self.host, self.port)
-            self.mail_server = smtplib.SMTP_SSL if self.ssl else smtplib.SMTP
-            self.mail_server = self.mail_server(self.host, self.port)
-            if self.tls:
-                self.mail_server.ehlo()
-                self.mail_server.starttls()
-                self.mail_server.ehlo()
-        except (socket.error, OSError) as e:
-            raise PluginWarning(str(e))
-
-        try:
-            if self.username:
-                # Forcing to use `str` type
-                log.debug('logging in to smtp server using username: %s', self.username)
-                self.mail_server.login(text_to_native_str(self.username), text_to_native_str(self.password))
-        except (IOError, SMTPAuthenticationError) as e:
-            raise PluginWarning(str(e))
+    @staticmethod
+    def batch_messages(config):
+        return config['digest']
 
     schema = {
         'type': 'object',
@@ -142,6 +214,7 @@ class EmailNotifier(object):
             'smtp_tls': {'type': 'boolean', 'default': False},
             'smtp_ssl': {'type': 'boolean', 'default': False},
             'html': {'type': 'boolean', 'default': False},
+            'digest': {'type': 'boolean', 'default': False},
         },
         'required': ['to'],
         'dependencies': {
@@ -172,23 +245,30 @@ class EmailNotifier(object):
         content_type = 'html' if config['html'] else 'plain'
         email.attach(MIMEText(message.encode('utf-8'), content_type, _charset='utf-8'))
 
-        # Making sure mail server connection will remain open per host or username
-        # (in case several mail servers are used in the same task)
-        if not self.mail_server or not (
-                self.host == config['smtp_host'] and self.username == config.get('smtp_username')):
-            self.connect_to_smtp_server(config)
-
-        connection_error = None
-        while True:
+        mail_server, new = smtp_pool.get(config)
+        try:
+            mail_server.sendmail(email['From'], config['to'], email.as_string())
+        except (SMTPServerDisconnected, SMTPSenderRefused) as e:
+            close_connection(mail_server)
+            if new:
+                raise PluginWarning('Could not connect to SMTP server: %s' % str(e))
+            # The server may have dropped a connection we kept open
+            log.debug('kept smtp connection failed, reconnecting: %s', e)
+            mail_server = connect_to_smtp_server(config)
             try:
-                self.mail_server.sendmail(email['From'], config['to'], email.as_string())
-                break
+                mail_server.sendmail(email['From'], config['to'], email.as_string())
             except (SMTPServerDisconnected, SMTPSenderRefused) as e:
-                if not connection_error:
-                    self.connect_to_smtp_server(config)
-                    connection_error = e
-                else:
-                    raise PluginWarning('Could not connect to SMTP server: %s' % str(e))
+                close_connection(mail_server)
+                raise PluginWarning('Could not connect to SMTP server: %s' % str(e))
+        except Exception:
+            close_connection(mail_server)
+            raise
+        smtp_pool.put(config, mail_server)
+
+
+@event('manager.shutdown')
+def close_connections(manager):
+    smtp_pool.close_idle(max_idle=0)
 
 
 @event('plugin.register')
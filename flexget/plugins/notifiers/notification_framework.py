@@ -18,22 +18,54 @@ To implement a plugin that can deliver messages, it should implement a `notify`
 `(title, message, config)` as arguments. The plugin should also have a `schema` attribute which is a JSON schema that
 describes the config format for the plugin.
 
+Notifications are sent from a background dispatcher, so that slow services don't hold up the task sending them.
+Messages are still rendered right away, in the calling thread. A notifier plugin can tune how it is called:
+
+`concurrency`
+    How many notifications may be sent through it at the same time, 1 (in order) by default.
+`batch_messages`
+    If True, notifications for the same notifier config which pile up in the queue are combined into one message.
+    Can also be a function deciding this from the notifier config, e.g. from a `digest` option of the notifier.
+`batch_max_length`
+    Maximum length of a combined message, e.g. the longest message the service accepts. Notifications which would
+    make it longer are left for the next message.
+
+Failed sends raising a `PluginWarning` or a network error are retried with increasing delays, a `PluginError` is not
+retried, and any other error is logged with its traceback as a bug of the notifier. When a
+command execution completes (outside of daemon mode), and at shutdown, the remaining notifications are waited for.
+`dispatcher.stats()` reports queue depth and delivery latency of each notifier.
+
 """
 
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
 import logging
+import socket
+import threading
+import time
+from collections import deque
 
 from jinja2 import Template
+from requests import RequestException
 
 from flexget import plugin
 from flexget.event import event
-from flexget.plugin import PluginWarning
+from flexget.plugin import PluginWarning, PluginError
+from flexget.utils.parallel import copy_log_context
 from flexget.utils.template import RenderError
 
 log = logging.getLogger('notify')
 
+DEFAULT_CONCURRENCY = 1
+# Attempts to send a notification, retries wait RETRY_INTERVAL seconds, doubled after each try
+MAX_ATTEMPTS = 4
+RETRY_INTERVAL = 5
+# Maximum amount of queued notifications combined into one message
+MAX_BATCH = 20
+# Errors after which sending is retried
+RETRY_ERRORS = (PluginWarning, RequestException, socket.error, IOError)
+
 NOTIFY_VIA_SCHEMA = {
     'type': 'array',
     'items': {
@@ -77,8 +109,186 @@ def render_config(config, template_renderer, _path=''):
         return config
 
 
+class QueuedNotification(object):
+    def __init__(self, notifier_name, title, message, config):
+        self.notifier_name = notifier_name
+        self.title = title
+        self.message = message
+        self.config = config
+        self.queued = time.time()
+        # Log messages about sending it are attributed to the task which queued it
+        self.restore_context = copy_log_context()
+
+
+def combine(notifications):
+    """:return: Title and message of one notification containing all of `notifications`"""
+    titles = [n.title for n in notifications]
+    if all(title == titles[0] for title in titles):
+        return titles[0], '\n\n'.join(n.message for n in notifications)
+    title = '%d notifications' % len(notifications)
+    messages = ['%s\n%s' % (n.title, n.message) if n.title != n.message else n.message for n in notifications]
+    return title, '\n\n'.join(messages)
+
+
+def combined_length(notifications):
+    """:return: Maximum length `notifications` take in a message combined by :func:`combine`"""
+    # Title, message, and the line breaks separating them
+    return sum(len(n.title) + len(n.message) + 3 for n in notifications)
+
+
+class NotifierStats(object):
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.total_latency = 0
+        self.max_latency = 0
+
+    def delivered(self, notifications, success):
+        now = time.time()
+        for notification in notifications:
+            latency = now - notification.queued
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+        if success:
+            self.sent += len(notifications)
+        else:
+            self.failed += len(notifications)
+
+
+class NotificationDispatcher(object):
+    """
+    Sends queued notifications from background threads, with a separate queue and concurrency limit per notifier.
+    Threads are started as notifications come in and exit once their notifier's queue is empty.
+    """
+
+    def __init__(self):
+        self._queues = {}
+        self._active = {}
+        self._stats = {}
+        self._condition = threading.Condition()
+
+    def put(self, notification):
+        name = notification.notifier_name
+        notifier = plugin.get_plugin_by_name(name).instance
+        with self._condition:
+            self._queues.setdefault(name, deque()).append(notification)
+            self._stats.setdefault(name, NotifierStats())
+            if self._active.get(name, 0) < getattr(notifier, 'concurrency', DEFAULT_CONCURRENCY):
+                self._active[name] = self._active.get(name, 0) + 1
+                thread = threading.Thread(target=self._work, args=(name, notifier), name='notify-%s' % name)
+                thread.daemon = True
+                thread.start()
+
+    def _next(self, name, notifier):
+        """:return: Next notifications to send as one message, or an empty list when the queue is empty"""
+        with self._condition:
+            pending = self._queues[name]
+            if not pending:
+                self._active[name] -= 1
+                self._condition.notify_all()
+                return []
+            batch = [pending.popleft()]
+            batch_messages = getattr(notifier, 'batch_messages', False)
+            if callable(batch_messages):
+                batch_messages = batch_messages(batch[0].config)
+            if batch_messages:
+                max_length = getattr(notifier, 'batch_max_length', None)
+                length = combined_length(batch)
+                for notification in list(pending):
+                    if len(batch) >= MAX_BATCH:
+                        break
+                    if notification.config != batch[0].config:
+                        continue
+                    if max_length and length + combined_length([notification]) > max_length:
+                        break
+                    pending.remove(notification)
+                    batch.append(notification)
+                    length += combined_length([notification])
+            return batch
+
+    def _work(self, name, notifier):
+        while True:
+            batch = self._next(name, notifier)
+            if not batch:
+                return
+            batch[0].restore_context()
+            success = self._send(name, notifier, batch)
+            with self._condition:
+                self._stats[name].delivered(batch, success)
+
+    def _send(self, name, notifier, batch):
+        """:return: True if the notifications were sent"""
+        title, message = combine(batch) if len(batch) > 1 else (batch[0].title, batch[0].message)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            log.debug('Sending %d notification(s) to `%s`', len(batch), name)
+            try:
+                notifier.notify(title, message, batch[0].config)  # TODO: Update notifiers for new api
+            except PluginError as e:
+                log.error('Error while sending notification to `%s`: %s', name, e.value)
+                return False
+            except RETRY_ERRORS as e:
+                reason = e.value if isinstance(e, PluginWarning) else e
+                if attempt == MAX_ATTEMPTS:
+                    log.warning('Error while sending notification to `%s`: %s', name, reason)
+                    return False
+                delay = RETRY_INTERVAL * 2 ** (attempt - 1)
+                log.verbose('Error while sending notification to `%s`: %s, retrying in %s seconds', name, reason,
+                            delay)
+                with self._condition:
+                    self._stats[name].retries += 1
+                time.sleep(delay)
+            except Exception:
+                log.exception('Unexpected error while sending notification to `%s`', name)
+                return False
+            else:
+                log.verbose('Successfully sent a notification to `%s`', name)
+                return True
+
+    def __len__(self):
+        with self._condition:
+            return sum(len(pending) for pending in self._queues.values())
+
+    def wait(self, timeout=None):
+        """
+        Waits until all queued notifications have been sent.
+
+        :return: False if `timeout` seconds passed first
+        """
+        end = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while any(self._active.values()):
+                remaining = end - time.time() if end is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stats(self):
+        """
+        :return: Dict with, for each notifier used, the amount of notifications queued, sent and failed, the amount of
+            retries, and the average and maximum seconds taken from queueing a notification to finishing sending it
+        """
+        with self._condition:
+            result = {}
+            for name, stats in self._stats.items():
+                done = stats.sent + stats.failed
+                result[name] = {
+                    'queued': len(self._queues[name]),
+                    'sent': stats.sent,
+                    'failed': stats.failed,
+                    'retries': stats.retries,
+                    'average_latency': stats.total_latency / done if done else 0,
+                    'max_latency': stats.max_latency
+                }
+            return result
+
+
+dispatcher = NotificationDispatcher()
+
+
 class NotificationFramework(object):
-    def send_notification(self, title, message, notifiers, template_renderer=None):
+    def send_notification(self, title, message, notifiers, template_renderer=None, wait=False):
         """
         Send a notification out to the given `notifiers` with a given `title` and `message`.
         If `template_renderer` is specified, `title`, `message`, as well as any string options in a notifier's config
@@ -89,6 +299,7 @@ class NotificationFramework(object):
         :param list notifiers: A list of configured notifier output plugins. The `NOTIFY_VIA_SCHEMA` JSON schema
             describes the data structure for this parameter.
         :param template_renderer: A function that should be used to render any jinja strings in the configuration.
+        :param bool wait: Wait until the notification has been sent (along with any others queued before it).
         """
         if template_renderer:
             try:
@@ -112,13 +323,27 @@ class NotificationFramework(object):
                     except RenderError as e:
                         log.error('Error rendering %s plugin config field %s: %s', notifier_name, e.config_path, e)
 
-                log.debug('Sending a notification to `%s`', notifier_name)
-                try:
-                    notifier.notify(title, message, rendered_config)  # TODO: Update notifiers for new api
-                except PluginWarning as e:
-                    log.warning('Error while sending notification to `%s`: %s', notifier_name, e.value)
-                else:
-                    log.verbose('Successfully sent a notification to `%s`', notifier_name)
+                log.debug('Queueing a notification to `%s`', notifier_name)
+                dispatcher.put(QueuedNotification(notifier_name, title, message, rendered_config))
+        if wait:
+            dispatcher.wait()
+
+
+@event('manager.execute.completed')
+def wait_notifications(manager, options):
+    # The daemon keeps sending in the background, other executions end with the process
+    if manager.is_daemon:
+        return
+    if len(dispatcher):
+        log.verbose('Waiting for %d queued notifications to be sent', len(dispatcher))
+    dispatcher.wait()
+    for name, stats in dispatcher.stats().items():
+        log.debug('`%s` notifications: %s', name, stats)
+
+
+@event('manager.shutdown')
+def finish_notifications(manager):
+    dispatcher.wait()
 
 
 @event('plugin.register')
@@ -29,8 +29,16 @@ class SlackNotifier(object):
                 [username: <string>] (override username)
                 [icon_emoji: <string>] (override emoji icon)
                 [icon_url: <string>] (override emoji icon)
+                [digest: <boolean>] (combine messages waiting to be sent into one, defaults to no)
 
     """
+    # Slack truncates longer messages
+    batch_max_length = 40000
+
+    @staticmethod
+    def batch_messages(config):
+        return config.get('digest')
+
     schema = {
         'type': 'object',
         'properties': {
@@ -38,7 +46,8 @@ class SlackNotifier(object):
             'channel': {'type': 'string'},
             'username': {'type': 'string', 'default': 'Flexget'},
             'icon_emoji': {'type': 'string'},
-            'icon_url': {'type': 'string', 'format': 'url'}
+            'icon_url': {'type': 'string', 'format': 'url'},
+            'digest': {'type': 'boolean', 'default': False}
         },
         'not': {
             'required': ['icon_emoji', 'icon_url']
@@ -26,6 +26,7 @@ _PARSERS = ['markdown', 'html']
 
 _TOKEN_ATTR = 'bot_token'
 _PARSE_ATTR = 'parse_mode'
+_DIGEST_ATTR = 'digest'
 _RCPTS_ATTR = 'recipients'
 _USERNAME_ATTR = 'username'
 _FULLNAME_ATTR = 'fullname'
@@ -106,6 +107,9 @@ class TelegramNotifier(object):
     `parse_mode`::
     Optional. Whether the template uses `markdown` or `html` formatting.
 
+    `digest`::
+    Optional. Combine messages waiting to be sent into one, as long as it fits in a Telegram message. Defaults to no.
+
     NOTE: The markdown parser will fall back to basic parsing if there is a parsing error. This can be cause due to
     unclosed tags (watch out for wandering underscore when using markdown)
 
@@ -122,12 +126,19 @@ class TelegramNotifier(object):
     _fullnames = None
     _groups = None
     _bot = None
+    # Longest message telegram accepts
+    batch_max_length = 4096
+
+    @staticmethod
+    def batch_messages(config):
+        return config.get(_DIGEST_ATTR)
 
     schema = {
         'type': 'object',
         'properties': {
             _TOKEN_ATTR: {'type': 'string'},
             _PARSE_ATTR: {'type': 'string', 'enum': _PARSERS},
+            _DIGEST_ATTR: {'type': 'boolean', 'default': False},
             _RCPTS_ATTR: {
                 'type': 'array',
                 'minItems': 1,
@@ -173,8 +184,12 @@ class TelegramNotifier(object):
     def notify(self, title, message, config):
         """
         Send a Telegram notification
+
+        This is called from the background thread of the notification dispatcher. The chat ids are looked up (and new
+        ones stored) in the database with a session of its own, which is closed before the message is sent.
         """
-        chat_ids = self._real_init(Session(), config)
+        with Session() as session:
+            chat_ids = [chat.id for chat in self._real_init(session, config)]
 
         if not chat_ids:
             return
@@ -239,7 +254,7 @@ class TelegramNotifier(object):
             kwargs['parse_mode'] = telegram.ParseMode.MARKDOWN
         elif self._parse_mode == 'html':
             kwargs['parse_mode'] = telegram.ParseMode.HTML
-        for chat_id in (x.id for x in chat_ids):
+        for chat_id in chat_ids:
             try:
                 self.log.debug('sending msg to telegram servers: %s', msg)
                 self._bot.sendMessage(chat_id=chat_id, text=msg, **kwargs)
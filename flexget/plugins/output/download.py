@@ -1,13 +1,14 @@
 from __future__ import unicode_literals, division, absolute_import
 
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
-from future.moves.urllib.parse import unquote
+from future.moves.urllib.parse import unquote, urlparse
 
 import hashlib
 import io
 import logging
 import mimetypes
 import os
+import re
 import shutil
 import socket
 import sys
@@ -18,13 +19,71 @@ from http.client import BadStatusLine
 from requests import RequestException
 
 from flexget import options, plugin
+from flexget.config_schema import one_or_more
 from flexget.event import event
+from flexget.utils.bittorrent import TORRENT_RE
+from flexget.utils.parallel import KeyedSemaphore, parallel_map
 from flexget.utils.tools import decode_html, native_str_to_text
 from flexget.utils.template import RenderError
 from flexget.utils.pathscrub import pathscrub
 
 log = logging.getLogger('download')
 
+CHUNK_SIZE = 150 * 1024
+HTML_RE = re.compile(br'\s*(?:<!--.*?-->\s*)*<(?:!doctype\s+html|html|head|body)[\s>]', re.IGNORECASE | re.DOTALL)
+NZB_RE = re.compile(br'\s*(?:<\?xml[^>]*>\s*)?(?:<!doctype\s+nzb[^>]*>\s*)?<nzb[\s>]', re.IGNORECASE)
+
+
+class ContentInspector(object):
+    """
+    Looks at downloaded content while it is being written, so it does not have to be read again afterwards.
+
+    Counts the size, computes the requested digests and sniffs the type of the content (`torrent`, `nzb` or `html`)
+    from its first bytes.
+    """
+
+    sniff_size = 512
+
+    def __init__(self, digests=None):
+        self.size = 0
+        self.digests = dict((name, hashlib.new(name)) for name in digests or [])
+        self.content_type = None
+        self.sniffed = False
+        self._head = b''
+
+    def update(self, chunk):
+        self.size += len(chunk)
+        for digest in self.digests.values():
+            digest.update(chunk)
+        if not self.sniffed:
+            self._head += chunk[:self.sniff_size]
+            if len(self._head) >= self.sniff_size:
+                self.sniff()
+
+    def sniff(self):
+        head = self._head
+        if head.startswith(b'\xef\xbb\xbf'):
+            head = head[3:]
+        if TORRENT_RE.match(head):
+            self.content_type = 'torrent'
+        elif NZB_RE.match(head):
+            self.content_type = 'nzb'
+        elif HTML_RE.match(head):
+            self.content_type = 'html'
+        self.sniffed = True
+        self._head = b''
+
+    def finish(self):
+        if not self.sniffed:
+            self.sniff()
+
+    def fields(self):
+        """:return: Dict of entry fields describing the content"""
+        fields = {'file_size': self.size, 'file_type': self.content_type}
+        for name, digest in self.digests.items():
+            fields['file_%s' % name] = digest.hexdigest()
+        return fields
+
 
 class PluginDownload(object):
     """
@@ -52,8 +111,25 @@ class PluginDownload(object):
 
     You may use commandline parameter --dl-path to temporarily override
     all paths to another location.
+
+    While downloading, the size and type (torrent, nzb or html) of the content are stored in the `file_size` and
+    `file_type` fields, so other plugins do not need to read the file again. Digests of the content can be stored too,
+    e.g. `digests: [sha1]` sets the `file_sha1` field. Downloads of html pages are stopped as soon as they are
+    recognized, unless `fail_html` is disabled.
+
+    Several entries can be downloaded at once, `concurrency` is the total amount of simultaneous downloads and
+    `host_concurrency` the amount of simultaneous downloads from each host (default 2). Rate limits of sites are still
+    respected.
+
+    Example::
+
+      download:
+        path: ~/torrents/
+        concurrency: 8
     """
 
+    default_host_concurrency = 2
+
     schema = {
         'oneOf': [
             {
@@ -64,7 +140,10 @@ class PluginDownload(object):
                     'fail_html': {'type': 'boolean', 'default': True},
                     'overwrite': {'type': 'boolean', 'default': False},
                     'temp': {'type': 'string', 'format': 'path'},
-                    'filename': {'type': 'string'}
+                    'filename': {'type': 'string'},
+                    'concurrency': {'type': 'integer', 'minimum': 1},
+                    'host_concurrency': {'type': 'integer', 'minimum': 1},
+                    'digests': one_or_more({'type': 'string', 'enum': ['md5', 'sha1', 'sha256']})
                 },
                 'additionalProperties': False
             },
@@ -91,10 +170,12 @@ class PluginDownload(object):
         tmp = config.get('temp', os.path.join(task.manager.config_base, 'temp'))
 
         self.get_temp_files(task, require_path=config.get('require_path', False), fail_html=config['fail_html'],
-                            tmp_path=tmp)
+                            tmp_path=tmp, concurrency=config.get('concurrency', 1),
+                            host_concurrency=config.get('host_concurrency', self.default_host_concurrency),
+                            digests=config.get('digests'))
 
     def get_temp_file(self, task, entry, require_path=False, handle_magnets=False, fail_html=True,
-                      tmp_path=tempfile.gettempdir()):
+                      tmp_path=tempfile.gettempdir(), host_limits=None, fail=None, digests=None):
         """
         Download entry content and store in temporary folder.
         Fails entry with a reason if there was problem.
@@ -108,7 +189,16 @@ class PluginDownload(object):
           fail entries which url respond with html content
         :param tmp_path:
           path to use for temporary files while downloading
+        :param KeyedSemaphore host_limits:
+          limits the amount of simultaneous downloads per host
+        :param fail:
+          function called with the reason instead of `entry.fail`, when not downloading in the main thread
+        :param digests:
+          names of hashlib digests of the content to store in the entry
         """
+        if isinstance(digests, str):
+            digests = [digests]
+        fail = fail or entry.fail
         if entry.get('urls'):
             urls = entry.get('urls')
         else:
@@ -129,7 +219,8 @@ class PluginDownload(object):
                 # Don't fail here, there might be a magnet later in the list of urls
                 log.debug('Skipping url %s because there is no path for download', url)
                 continue
-            error = self.process_entry(task, entry, url, tmp_path)
+            error = self.process_entry(task, entry, url, tmp_path, host_limits, fail, fail_html=fail_html,
+                                       digests=digests)
 
             # disallow html content
             html_mimes = ['html', 'text/html']
@@ -148,9 +239,9 @@ class PluginDownload(object):
             # check if entry must have a path (download: yes)
             if require_path and 'path' not in entry:
                 log.error('%s can\'t be downloaded, no path specified for entry', entry['title'])
-                entry.fail('no path specified for entry')
+                fail('no path specified for entry')
             else:
-                entry.fail(', '.join(errors))
+                fail(', '.join(errors))
 
     def save_error_page(self, entry, task, page):
         received = os.path.join(task.manager.config_base, 'received', task.name)
@@ -162,7 +253,8 @@ class PluginDownload(object):
             outfile.write(page)
 
     def get_temp_files(self, task, require_path=False, handle_magnets=False, fail_html=True,
-                       tmp_path=tempfile.gettempdir()):
+                       tmp_path=tempfile.gettempdir(), concurrency=1, host_concurrency=default_host_concurrency,
+                       digests=None):
         """Download all task content and store in temporary folder.
 
         :param bool require_path:
@@ -174,12 +266,35 @@ class PluginDownload(object):
           fail entries which url respond with html content
         :param tmp_path:
           path to use for temporary files while downloading
+        :param int concurrency:
+          amount of entries downloaded at once
+        :param int host_concurrency:
+          amount of simultaneous downloads from a single host
+        :param digests:
+          names of hashlib digests of the content to store in the entries
         """
-        for entry in task.accepted:
-            self.get_temp_file(task, entry, require_path, handle_magnets, fail_html, tmp_path)
+        entries = list(task.accepted)
+        if concurrency <= 1 or len(entries) <= 1:
+            for entry in entries:
+                self.get_temp_file(task, entry, require_path, handle_magnets, fail_html, tmp_path, digests=digests)
+            return
+
+        host_limits = KeyedSemaphore(host_concurrency)
+
+        def download(entry):
+            # Entries are failed afterwards in the main thread, their fail hooks may use the database
+            failures = []
+            self.get_temp_file(task, entry, require_path, handle_magnets, fail_html, tmp_path, host_limits,
+                               fail=failures.append, digests=digests)
+            return failures
+
+        # Each entry is handled by one thread only, temp files are placed the same way as when downloading one by one
+        for entry, failures in zip(entries, parallel_map(download, entries, workers=concurrency, name='download')):
+            for reason in failures:
+                entry.fail(reason)
 
     # TODO: a bit silly method, should be get rid of now with simplier exceptions ?
-    def process_entry(self, task, entry, url, tmp_path):
+    def process_entry(self, task, entry, url, tmp_path, host_limits=None, fail=None, fail_html=False, digests=None):
         """
         Processes `entry` by using `url`. Does not use entry['url'].
         Does not fail the `entry` if there is a network issue, instead just logs and returns a string error.
@@ -188,6 +303,10 @@ class PluginDownload(object):
         :param entry: Entry
         :param url: Url to try download
         :param tmp_path: Path to store temporary files
+        :param host_limits: Optional `KeyedSemaphore` limiting simultaneous downloads per host
+        :param fail: Optional function called with the reason to fail `entry`, instead of `entry.fail`
+        :param fail_html: Stop downloading html content
+        :param digests: Names of hashlib digests of the content to store in the entry
         :return: String error, if failed.
         """
         try:
@@ -196,7 +315,10 @@ class PluginDownload(object):
             else:
                 if not task.manager.unit_test:
                     log.info('Downloading: %s', entry['title'])
-                self.download_entry(task, entry, url, tmp_path)
+                if host_limits is None:
+                    return self.download_entry(task, entry, url, tmp_path, fail, fail_html, digests)
+                with host_limits(urlparse(url).hostname):
+                    return self.download_entry(task, entry, url, tmp_path, fail, fail_html, digests)
         except RequestException as e:
             log.warning('RequestException %s, while downloading %s', e, url)
             return 'Network error during request: %s' % e
@@ -217,14 +339,20 @@ class PluginDownload(object):
             log.debug(msg, exc_info=True)
             return msg
 
-    def download_entry(self, task, entry, url, tmp_path):
+    def download_entry(self, task, entry, url, tmp_path, fail=None, fail_html=False, digests=None):
         """Downloads `entry` by using `url`.
 
+        :param fail: Optional function called with the reason to fail `entry`, instead of `entry.fail`
+        :param fail_html: Stop downloading as soon as the content is recognized as html
+        :param digests: Names of hashlib digests of the content to store in the entry
+        :return: String error if the content was not wanted
+
         :raises: Several types of exceptions ...
         :raises: PluginWarning
         """
 
         log.debug('Downloading url \'%s\'', url)
+        fail = fail or entry.fail
 
         # get content
         auth = None
@@ -246,12 +374,17 @@ class PluginDownload(object):
             response.raise_for_status()
             return
 
+        html_error = 'Unexpected html content received from `%s` - maybe a login page?' % url
+        if fail_html and parse_header(response.headers.get('content-type', ''))[0] in ('html', 'text/html'):
+            response.close()
+            return html_error
+
         # expand ~ in temp path
         # TODO jinja?
         try:
             tmp_path = os.path.expanduser(tmp_path)
         except RenderError as e:
-            entry.fail('Could not set temp path. Error during string replacement: %s' % e)
+            fail('Could not set temp path. Error during string replacement: %s' % e)
             return
 
         # Clean illegal characters from temp path name
@@ -260,7 +393,12 @@ class PluginDownload(object):
         # create if missing
         if not os.path.isdir(tmp_path):
             log.debug('creating tmp_path %s' % tmp_path)
-            os.mkdir(tmp_path)
+            try:
+                os.mkdir(tmp_path)
+            except OSError:
+                # Another download thread may have created it meanwhile
+                if not os.path.isdir(tmp_path):
+                    raise
 
         # check for write-access
         if not os.access(tmp_path, os.W_OK):
@@ -271,9 +409,14 @@ class PluginDownload(object):
         fname = hashlib.md5(url.encode('utf-8', 'replace')).hexdigest()
         datafile = os.path.join(tmp_dir, fname)
         outfile = io.open(datafile, 'wb')
+        inspector = ContentInspector(digests)
         try:
-            for chunk in response.iter_content(chunk_size=150 * 1024, decode_unicode=False):
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=False):
+                inspector.update(chunk)
+                if fail_html and inspector.content_type == 'html':
+                    break
                 outfile.write(chunk)
+            inspector.finish()
         except Exception as e:
             # don't leave futile files behind
             # outfile has to be closed before we can delete it on Windows
@@ -286,11 +429,17 @@ class PluginDownload(object):
                 raise
         else:
             outfile.close()
+            if fail_html and inspector.content_type == 'html':
+                log.debug('%s is a html page, download stopped after %s bytes', url, inspector.size)
+                response.close()
+                shutil.rmtree(tmp_dir)
+                return html_error
             # Do a sanity check on downloaded file
-            if os.path.getsize(datafile) == 0:
-                entry.fail('File %s is 0 bytes in size' % datafile)
+            if inspector.size == 0:
+                fail('File %s is 0 bytes in size' % datafile)
                 os.remove(datafile)
                 return
+            entry.update(inspector.fields())
             # store temp filename into entry so other plugins may read and modify content
             # temp file is moved into final destination at self.output
             entry['file'] = datafile
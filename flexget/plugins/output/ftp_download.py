@@ -5,14 +5,22 @@ from future.moves.urllib.parse import urlparse, unquote
 import logging
 import os
 import ftplib
+import posixpath
 import time
+from functools import partial
 
 from flexget import plugin
 from flexget.event import event
+from flexget.utils.client_pool import ConnectionPool
+from flexget.utils.parallel import WorkQueue
 from flexget.utils.pathscrub import pathscrub
+from flexget.utils.template import RenderError
 
 log = logging.getLogger('ftp')
 
+# Seconds to wait before retrying a failed download
+RETRY_INTERVAL = 1
+
 
 class OutputFtp(object):
     """
@@ -27,9 +35,9 @@ class OutputFtp(object):
               ftp_tmp_path: <path>
               delete_origin: <True/False>
               download_empty_dirs: <True/False>
+              concurrency: <number of files downloaded at once>
 
         TODO:
-          - Resume downloads
           - create banlists files
           - validate connection parameters
 
@@ -41,7 +49,8 @@ class OutputFtp(object):
             'use-ssl': {'type': 'boolean', 'default': False},
             'ftp_tmp_path': {'type': 'string', 'format': 'path'},
             'delete_origin': {'type': 'boolean', 'default': False},
-            'download_empty_dirs': {'type': 'boolean', 'default': False}
+            'download_empty_dirs': {'type': 'boolean', 'default': False},
+            'concurrency': {'type': 'integer', 'minimum': 1, 'default': 1}
         },
         'additionalProperties': False
     }
@@ -51,6 +60,7 @@ class OutputFtp(object):
         config.setdefault('delete_origin', False)
         config.setdefault('ftp_tmp_path', os.path.join(task.manager.config_base, 'temp'))
         config.setdefault('download_empty_dirs', False)
+        config.setdefault('concurrency', 1)
         return config
 
     def ftp_connect(self, config, ftp_url, current_path):
@@ -72,149 +82,197 @@ class OutputFtp(object):
 
         return ftp
 
-    def check_connection(self, ftp, config, ftp_url, current_path):
-        try:
-            ftp.voidcmd("NOOP")
-        except (IOError, ftplib.Error):
-            ftp = self.ftp_connect(config, ftp_url, current_path)
-        return ftp
-
     def on_task_download(self, task, config):
         config = self.prepare_config(config, task)
-        for entry in task.accepted:
-            ftp_url = urlparse(entry.get('url'))
-            ftp_url = ftp_url._replace(path=unquote(ftp_url.path))
-            current_path = os.path.dirname(ftp_url.path)
-            try:
-                ftp = self.ftp_connect(config, ftp_url, current_path)
-            except ftplib.all_errors as e:
-                entry.fail("Unable to connect to server : %s" % (e))
-                break
-
-            to_path = config['ftp_tmp_path']
-
-            try:
-                to_path = entry.render(to_path)
-            except RenderError as err:
-                raise plugin.PluginError("Path value replacement `%s` failed: %s" % (to_path, err.args[0]))
-
-            # Clean invalid characters with pathscrub plugin
-            to_path = pathscrub(to_path)
-
-            if not os.path.exists(to_path):
-                log.debug("Creating base path: %s" % to_path)
-                os.makedirs(to_path)
-            if not os.path.isdir(to_path):
-                raise plugin.PluginWarning("Destination `%s` is not a directory." % to_path)
-
-            file_name = os.path.basename(ftp_url.path)
-
-            try:
-                # Directory
-                ftp = self.check_connection(ftp, config, ftp_url, current_path)
-                ftp.cwd(file_name)
-                self.ftp_walk(ftp, os.path.join(to_path, file_name), config, ftp_url, ftp_url.path)
-                ftp = self.check_connection(ftp, config, ftp_url, current_path)
-                ftp.cwd('..')
-                if config['delete_origin']:
-                    ftp.rmd(file_name)
-            except ftplib.error_perm:
-                # File
-                self.ftp_down(ftp, file_name, to_path, config, ftp_url, current_path)
+        # One pool of connections per server, shared by the entries of the task
+        pools = {}
+        # Files are downloaded by workers while the directories of the entries are still being walked
+        downloads = WorkQueue(partial(self.download_job, config=config), workers=config['concurrency'], name='ftp')
+        # entry -> (pool, remote directories to remove when all files were downloaded)
+        walked = []
+        try:
+            for entry in task.accepted:
+                ftp_url = urlparse(entry.get('url'))
+                ftp_url = ftp_url._replace(path=unquote(ftp_url.path))
+                current_path = os.path.dirname(ftp_url.path)
+                key = (ftp_url.hostname, ftp_url.port, ftp_url.username, ftp_url.password)
+                if key not in pools:
+                    connect = partial(self.ftp_connect, config, ftp_url, current_path)
+                    pools[key] = ConnectionPool(connect, self.check_alive, self.ftp_close)
+                pool = pools[key]
+                try:
+                    ftp = pool.get()
+                except ftplib.all_errors as e:
+                    entry.fail("Unable to connect to server : %s" % (e))
+                    break
 
-            ftp.close()
+                to_path = config['ftp_tmp_path']
+
+                try:
+                    to_path = entry.render(to_path)
+                except RenderError as err:
+                    raise plugin.PluginError("Path value replacement `%s` failed: %s" % (to_path, err.args[0]))
+
+                # Clean invalid characters with pathscrub plugin
+                to_path = pathscrub(to_path)
+
+                if not os.path.exists(to_path):
+                    log.debug("Creating base path: %s" % to_path)
+                    os.makedirs(to_path)
+                if not os.path.isdir(to_path):
+                    raise plugin.PluginWarning("Destination `%s` is not a directory." % to_path)
+
+                file_name = os.path.basename(ftp_url.path)
+                directories = []
+                try:
+                    # Directory
+                    ftp.cwd(ftp_url.path)
+                    self.ftp_walk(ftp, downloads, entry, pool, ftp_url.path, os.path.join(to_path, file_name),
+                                  config, directories)
+                except ftplib.error_perm:
+                    # File
+                    downloads.put((entry, pool, ftp_url.path, to_path))
+                pool.put(ftp)
+                walked.append((entry, pool, directories))
+
+            failed = {}
+            for (entry, _, _, _), error in downloads.join():
+                failed.setdefault(entry, error)
+            for entry, pool, directories in walked:
+                if entry in failed:
+                    entry.fail('Download failed: %s' % failed[entry])
+                elif config['delete_origin'] and directories:
+                    ftp = pool.get()
+                    for directory in directories:
+                        ftp.rmd(directory)
+                    pool.put(ftp)
+        finally:
+            # When walking failed the workers are still waiting for more files, stop them before closing their pools
+            downloads.stop()
+            for pool in pools.values():
+                pool.close()
 
     def on_task_output(self, task, config):
         """Count this as an output plugin."""
 
-    def ftp_walk(self, ftp, tmp_path, config, ftp_url, current_path):
-        log.debug("DIR->" + ftp.pwd())
+    @staticmethod
+    def check_alive(ftp):
+        try:
+            ftp.voidcmd("NOOP")
+        except (IOError, ftplib.Error):
+            return False
+        return True
+
+    @staticmethod
+    def ftp_close(ftp):
+        # Without a timeout a QUIT could wait forever on a broken connection
+        ftp.close()
+
+    def ftp_walk(self, ftp, downloads, entry, pool, remote_path, tmp_path, config, directories):
+        """
+        Queues the files in `remote_path` and its subdirectories for download, appending the walked directories
+        to `directories` deepest first.
+        """
+        log.debug("DIR->" + remote_path)
         log.debug("FTP tmp_path : " + tmp_path)
         try:
-            ftp = self.check_connection(ftp, config, ftp_url, current_path)
-            dirs = ftp.nlst(ftp.pwd())
+            names = ftp.nlst(remote_path)
         except ftplib.error_perm as ex:
             log.info("Error %s" % ex)
-            return ftp
+            return
 
-        if not dirs:
+        if not names:
             if config['download_empty_dirs']:
-                os.mkdir(tmp_path)
+                if not os.path.isdir(tmp_path):
+                    os.makedirs(tmp_path)
             else:
                 log.debug("Empty directory, skipping.")
-            return ftp
+            directories.append(remote_path)
+            return
 
-        for file_name in (path for path in dirs if path not in ('.', '..')):
-            file_name = os.path.basename(file_name)
+        for file_name in (os.path.basename(path) for path in names):
+            if file_name in ('.', '..'):
+                continue
+            path = posixpath.join(remote_path, file_name)
             try:
-                ftp = self.check_connection(ftp, config, ftp_url, current_path)
-                ftp.cwd(file_name)
-                if not os.path.isdir(tmp_path):
-                    os.mkdir(tmp_path)
-                    log.debug("Directory %s created" % tmp_path)
-                ftp = self.ftp_walk(ftp,
-                                    os.path.join(tmp_path, os.path.basename(file_name)),
-                                    config,
-                                    ftp_url,
-                                    os.path.join(current_path, os.path.basename(file_name)))
-                ftp = self.check_connection(ftp, config, ftp_url, current_path)
-                ftp.cwd('..')
-                if config['delete_origin']:
-                    ftp.rmd(os.path.basename(file_name))
+                ftp.cwd(path)
             except ftplib.error_perm:
-                ftp = self.ftp_down(ftp, os.path.basename(file_name), tmp_path, config, ftp_url, current_path)
-        ftp = self.check_connection(ftp, config, ftp_url, current_path)
-        return ftp
-
-    def ftp_down(self, ftp, file_name, tmp_path, config, ftp_url, current_path):
-        log.debug("Downloading %s into %s" % (file_name, tmp_path))
+                downloads.put((entry, pool, path, tmp_path))
+                continue
+            self.ftp_walk(ftp, downloads, entry, pool, path, os.path.join(tmp_path, file_name), config, directories)
+        directories.append(remote_path)
+
+    def download_job(self, job, config):
+        entry, pool, remote_path, tmp_path = job
+        self.ftp_down(pool, remote_path, tmp_path, config)
+
+    def ftp_down(self, pool, remote_path, tmp_path, config):
+        """
+        Downloads `remote_path` into directory `tmp_path`. A partially downloaded file left by an earlier attempt is
+        resumed from where it stopped.
+        """
+        file_name = posixpath.basename(remote_path)
+        local_path = os.path.join(tmp_path, file_name)
+        log.debug("Downloading %s into %s" % (remote_path, tmp_path))
 
         if not os.path.exists(tmp_path):
-            os.makedirs(tmp_path)
-
-        local_file = open(os.path.join(tmp_path, file_name), 'a+b')
-        ftp = self.check_connection(ftp, config, ftp_url, current_path)
-        try:
-            ftp.sendcmd("TYPE I")
-            file_size = ftp.size(file_name)
-        except Exception:
-            file_size = 1
+            try:
+                os.makedirs(tmp_path)
+            except OSError:
+                # Created by another worker meanwhile
+                if not os.path.isdir(tmp_path):
+                    raise
 
         max_attempts = 5
-        size_at_last_err = 0
+        size_at_last_err = None
         log.info("Starting download of %s into %s" % (file_name, tmp_path))
-        while file_size > local_file.tell():
+        while True:
+            ftp = pool.get()
+            offset = os.path.getsize(local_path) if os.path.exists(local_path) else 0
             try:
-                if local_file.tell() != 0:
-                    ftp = self.check_connection(ftp, config, ftp_url, current_path)
-                    ftp.retrbinary('RETR %s' % file_name, local_file.write, local_file.tell())
-                else:
-                    ftp = self.check_connection(ftp, config, ftp_url, current_path)
-                    ftp.retrbinary('RETR %s' % file_name, local_file.write)
-            except Exception as error:
-                if max_attempts != 0:
-                    if size_at_last_err == local_file.tell():
-                        # Nothing new was downloaded so the error is most likely connected to the resume functionality.
-                        # Delete the downloaded file and try again from the beginning.
-                        local_file.close()
-                        os.remove(os.path.join(tmp_path, file_name))
-                        local_file = open(os.path.join(tmp_path, file_name), 'a+b')
-                        max_attempts -= 1
-
-                    size_at_last_err = local_file.tell()
-                    log.debug("Retrying download after error %s" %  error.args[0])
-                    # Short timeout before retry.
-                    time.sleep(1)
-                else:
+                try:
+                    file_size = ftp.size(remote_path)
+                except ftplib.error_perm:
+                    file_size = None
+                if file_size is not None and offset >= file_size:
+                    if offset == file_size:
+                        log.verbose('%s was already downloaded' % file_name)
+                        break
+                    # Not the same file anymore
+                    offset = 0
+                if offset:
+                    log.debug('Resuming %s at %s bytes' % (file_name, offset))
+                with open(local_path, 'ab' if offset else 'wb') as local_file:
+                    ftp.retrbinary('RETR %s' % remote_path, local_file.write, rest=offset or None)
+                break
+            except ftplib.all_errors as error:
+                # Don't put a connection in an unknown state back into the pool
+                pool.discard(ftp)
+                ftp = None
+                downloaded = os.path.getsize(local_path) if os.path.exists(local_path) else 0
+                if max_attempts == 0:
                     log.error("Too many errors downloading %s. Aborting." % file_name)
-                    break
+                    raise
+                if size_at_last_err == downloaded:
+                    # Nothing new was downloaded so the error is most likely connected to the resume functionality.
+                    # Delete the downloaded file and try again from the beginning.
+                    if os.path.exists(local_path):
+                        os.remove(local_path)
+                    max_attempts -= 1
+                size_at_last_err = downloaded
+                log.debug("Retrying download after error %s" % error)
+                # Short timeout before retry.
+                time.sleep(RETRY_INTERVAL)
+            finally:
+                if ftp is not None:
+                    pool.put(ftp)
 
-        local_file.close()
         if config['delete_origin']:
-            ftp = self.check_connection(ftp, config, ftp_url, current_path)
-            ftp.delete(file_name)
-
-        return ftp
+            ftp = pool.get()
+            try:
+                ftp.delete(remote_path)
+            finally:
+                pool.put(ftp)
 
 
 @event('plugin.register')
@@ -6,6 +6,7 @@ import logging
 from flexget import plugin
 from flexget.event import event
 from flexget.plugin import PluginError
+from flexget.utils.list_interface import add_many
 
 log = logging.getLogger('list_add')
 
@@ -51,7 +52,7 @@ class ListAdd(object):
                              'Skipping', plugin_name)
                     continue
                 log.verbose('adding accepted entries into %s - %s', plugin_name, plugin_config)
-                thelist |= task.accepted
+                add_many(thelist, task.accepted)
 
 
 @event('plugin.register')
@@ -6,6 +6,7 @@ import logging
 from flexget import plugin
 from flexget.event import event
 from flexget.plugin import PluginError
+from flexget.utils.list_interface import discard_many
 
 log = logging.getLogger('list_remove')
 
@@ -42,7 +43,7 @@ class ListRemove(object):
                              plugin_name)
                     continue
                 log.verbose('removing accepted entries from %s - %s', plugin_name, plugin_config)
-                thelist -= task.accepted
+                discard_many(thelist, task.accepted)
 
 
 @event('plugin.register')
@@ -9,20 +9,45 @@ import time
 from flexget import plugin
 from flexget.event import event
 from flexget.config_schema import one_or_more
+from flexget.utils import transfer
+from flexget.utils.parallel import parallel_map
 from flexget.utils.template import RenderError
 from flexget.utils.pathscrub import pathscrub
 
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
 
-def get_directory_size(directory):
+# Seconds between progress messages of a long copy
+PROGRESS_INTERVAL = 10
+
+
+def get_directory_size(directory, limit=None):
     """
     :param directory: Path
-    :return: Size in bytes (recursively)
+    :param limit: Stop counting once the size is over this many bytes
+    :return: Size in bytes (recursively), or the size counted so far when `limit` was exceeded
     """
     dir_size = 0
-    for (path, _, files) in os.walk(directory):
-        for file in files:
-            filename = os.path.join(path, file)
-            dir_size += os.path.getsize(filename)
+    if scandir is None:
+        for (path, _, files) in os.walk(directory):
+            for file in files:
+                filename = os.path.join(path, file)
+                dir_size += os.path.getsize(filename)
+                if limit is not None and dir_size > limit:
+                    return dir_size
+        return dir_size
+    # scandir gets the type of the entries along with their names, saving a stat call for each directory entry
+    directories = [directory]
+    while directories:
+        for dir_entry in scandir(directories.pop()):
+            if dir_entry.is_dir(follow_symlinks=False):
+                directories.append(dir_entry.path)
+            elif dir_entry.is_file():
+                dir_size += dir_entry.stat().st_size
+                if limit is not None and dir_size > limit:
+                    return dir_size
     return dir_size
 
 
@@ -82,49 +107,71 @@ class BaseFileOps(object):
         config = self.prepare_config(config)
         if config is None:
             return
+        entries = []
         for entry in task.accepted:
             if 'location' not in entry:
                 self.log.verbose('Cannot handle %s because it does not have the field location.', entry['title'])
                 continue
-            src = entry['location']
-            src_isdir = os.path.isdir(src)
+            entries.append(entry)
+
+        def process(entry):
             try:
-                # check location
-                if not os.path.exists(src):
-                    self.log.warning('location `%s` does not exists (anymore).' % src)
+                return self.process_entry(task, config, entry), None
+            except plugin.PluginWarning as warning:
+                self.log.warning(warning)
+                return False, None
+            except (OSError, IOError, plugin.PluginError) as err:
+                return False, str(err)
+            except Exception as err:
+                self.log.exception('Unexpected error handling %s', entry['title'])
+                return False, 'Unexpected error: %s' % err
+
+        # Entries are handled by a pool of workers, but entries are failed and source directories cleaned from the
+        # main thread, when all transfers are done
+        results = parallel_map(process, entries, workers=config.get('concurrency', 1), name=self.log.name)
+        for entry, (clean, error) in zip(entries, results):
+            if error:
+                entry.fail(error)
+            elif clean:
+                self.clean_source(task, config, entry)
+
+    def process_entry(self, task, config, entry):
+        """:return: True if the directory the entry came from should be cleaned"""
+        src = entry['location']
+        src_isdir = os.path.isdir(src)
+        # check location
+        if not os.path.exists(src):
+            self.log.warning('location `%s` does not exists (anymore).' % src)
+            return
+        if src_isdir:
+            if not config.get('allow_dir'):
+                self.log.warning('location `%s` is a directory.' % src)
+                return
+        elif not os.path.isfile(src):
+            self.log.warning('location `%s` is not a file.' % src)
+            return
+        # search for namesakes
+        siblings = {}  # dict of (path=ext) pairs
+        if not src_isdir and 'along' in config:
+            parent = os.path.dirname(src)
+            filename_no_ext, filename_ext = os.path.splitext(os.path.basename(src))
+            for ext in config['along']['extensions']:
+                siblings.update(get_siblings(ext, filename_no_ext, filename_ext, parent))
+
+            files = os.listdir(parent)
+            files_lower = list(map(str.lower, files))
+            for subdir in config['along'].get('subdirs', []):
+                try:
+                    idx = files_lower.index(subdir)
+                except ValueError:
                     continue
-                if src_isdir:
-                    if not config.get('allow_dir'):
-                        self.log.warning('location `%s` is a directory.' % src)
-                        continue
-                elif not os.path.isfile(src):
-                    self.log.warning('location `%s` is not a file.' % src)
+                subdir_path = os.path.join(parent, files[idx])
+                if not os.path.isdir(subdir_path):
                     continue
-                # search for namesakes
-                siblings = {}  # dict of (path=ext) pairs
-                if not src_isdir and 'along' in config:
-                    parent = os.path.dirname(src)
-                    filename_no_ext, filename_ext = os.path.splitext(os.path.basename(src))
-                    for ext in config['along']['extensions']:
-                        siblings.update(get_siblings(ext, filename_no_ext, filename_ext, parent))
-
-                    files = os.listdir(parent)
-                    files_lower = list(map(str.lower, files))
-                    for subdir in config['along'].get('subdirs', []):
-                        try:
-                            idx = files_lower.index(subdir)
-                        except ValueError:
-                            continue
-                        subdir_path = os.path.join(parent, files[idx])
-                        if not os.path.isdir(subdir_path):
-                            continue
-                        for ext in config['along']['extensions']:
-                            siblings.update(get_siblings(ext, filename_no_ext, filename_ext, subdir_path))
-                # execute action in subclasses
-                self.handle_entry(task, config, entry, siblings)
-            except (OSError, IOError) as err:
-                entry.fail(str(err))
-                continue
+                for ext in config['along']['extensions']:
+                    siblings.update(get_siblings(ext, filename_no_ext, filename_ext, subdir_path))
+        # execute action in subclasses
+        return self.handle_entry(task, config, entry, siblings)
 
     def clean_source(self, task, config, entry):
         min_size = entry.get('clean_source', config.get('clean_source', -1))
@@ -136,7 +183,8 @@ class BaseFileOps(object):
         if not os.path.isdir(base_path):
             self.log.warning('Cannot delete path `%s` because it does not exists (anymore).', base_path)
             return
-        dir_size = get_directory_size(base_path) / 1024 / 1024
+        # No need to know the exact size of large directories
+        dir_size = get_directory_size(base_path, limit=min_size * 1024 * 1024) / 1024 / 1024
         if dir_size >= min_size:
             self.log.info('Path `%s` left because it exceeds safety value set in clean_source option.', base_path)
             return
@@ -150,6 +198,7 @@ class BaseFileOps(object):
             self.log.warning('Unable to delete path `%s`: %s', base_path, err)
 
     def handle_entry(self, task, config, entry, siblings):
+        """:return: True if the directory the entry came from should be cleaned"""
         raise NotImplementedError()
 
 
@@ -198,8 +247,7 @@ class DeleteFiles(BaseFileOps):
                 self.log.info('`%s` has been deleted as well.', s)
             except Exception as err:
                 self.log.warning(str(err))
-        if not src_isdir:
-            self.clean_source(task, config, entry)
+        return not src_isdir
 
 
 class TransformingOps(BaseFileOps):
@@ -246,7 +294,12 @@ class TransformingOps(BaseFileOps):
                 self.log.info('Would create `%s`', dst_path)
             else:
                 self.log.info('Creating destination directory `%s`', dst_path)
-                os.makedirs(dst_path)
+                try:
+                    os.makedirs(dst_path)
+                except OSError:
+                    # Another worker may have just created it
+                    if not os.path.isdir(dst_path):
+                        raise
         if not os.path.isdir(dst_path) and not task.options.test:
             raise plugin.PluginWarning('destination `%s` is not a directory.' % dst_path)
 
@@ -287,29 +340,33 @@ class TransformingOps(BaseFileOps):
                 self.log.info('Would also %s `%s` to `%s`', funct_name, s, d)
         else:
             # IO errors will have the entry mark failed in the base class
-            if self.move:
-                shutil.move(src, dst)
-            elif src_isdir:
-                shutil.copytree(src, dst)
-            else:
-                shutil.copy(src, dst)
+            verify = config.get('verify')
+            operation = transfer.move if self.move else transfer.copy
+            done = operation(src, dst, verify_method=verify, progress=self.log_progress)
             self.log.info('`%s` has been %s to `%s`', src, funct_done, dst)
+            if not done.renamed:
+                self.log.verbose('%.1f MiB in %.1f seconds (%.1f MiB/s)', done.bytes / 1024 / 1024, done.seconds,
+                                 done.throughput / 1024 / 1024)
             # further errors will not have any effect (the entry has been successfully moved or copied out)
             for s, ext in siblings.items():
                 # we cannot rely on splitext for extensions here (subtitles may have the language code)
                 d = dst_file + ext
                 try:
-                    if self.move:
-                        shutil.move(s, d)
-                    else:
-                        shutil.copy(s, d)
+                    operation(s, d, verify_method=verify)
                     self.log.info('`%s` has been %s to `%s` as well.', s, funct_done, d)
                 except Exception as err:
                     self.log.warning(str(err))
         entry['old_location'] = entry['location']
         entry['location'] = dst
-        if self.move and not src_isdir:
-            self.clean_source(task, config, entry)
+        return self.move and not src_isdir
+
+    def log_progress(self, progress):
+        now = time.time()
+        if now - progress.reported < PROGRESS_INTERVAL:
+            return
+        progress.reported = now
+        self.log.verbose('`%s`: %.1f MiB %s (%.1f MiB/s)', progress.src, progress.bytes / 1024 / 1024,
+                         'moved' if self.move else 'copied', progress.throughput / 1024 / 1024)
 
 
 class CopyFiles(TransformingOps):
@@ -326,7 +383,9 @@ class CopyFiles(TransformingOps):
                     'allow_dir': {'type': 'boolean'},
                     'unpack_safety': {'type': 'boolean'},
                     'keep_extension': {'type': 'boolean'},
-                    'along': TransformingOps.along
+                    'along': TransformingOps.along,
+                    'verify': {'type': 'string', 'enum': transfer.VERIFY_METHODS},
+                    'concurrency': {'type': 'integer', 'minimum': 1}
                 },
                 'additionalProperties': False
             }
@@ -353,7 +412,9 @@ class MoveFiles(TransformingOps):
                     'unpack_safety': {'type': 'boolean'},
                     'keep_extension': {'type': 'boolean'},
                     'along': TransformingOps.along,
-                    'clean_source': {'type': 'number'}
+                    'clean_source': {'type': 'number'},
+                    'verify': {'type': 'string', 'enum': transfer.VERIFY_METHODS},
+                    'concurrency': {'type': 'integer', 'minimum': 1}
                 },
                 'additionalProperties': False
             }
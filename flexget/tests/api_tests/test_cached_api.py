@@ -9,7 +9,9 @@ import requests
 class TestCachedAPI(object):
     config = 'tasks: {}'
 
-    def test_cached_api(self, api_client):
+    def test_cached_api(self, api_client, manager, tmpdir):
+        # Keep the cached files out of the tests directory
+        manager.config_base = tmpdir.strpath
         rsp = api_client.get('/cached/')
         assert rsp.status_code == 400, 'Response code is %s' % rsp.status_code
 
@@ -6,6 +6,7 @@ import pytest
 from flexget import plugin
 from flexget.event import event
 from flexget.plugin import get_plugin_by_name
+from flexget.plugins.notifiers.notification_framework import dispatcher
 
 
 class DebugNotification(object):
@@ -27,3 +28,15 @@ def register_plugin():
 def debug_notifications(manager):
     notifications = get_plugin_by_name('debug_notification').instance.notifications = []
     return notifications
+
+
+@pytest.fixture()
+def execute_task(execute_task):
+    """Notifications are sent in the background, waits for them to be sent after each task."""
+
+    def execute(*args, **kwargs):
+        task = execute_task(*args, **kwargs)
+        dispatcher.wait(timeout=10)
+        return task
+
+    return execute
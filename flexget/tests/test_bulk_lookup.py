@@ -0,0 +1,112 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import threading
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from flexget.entry import Entry
+from flexget.utils.bulk_lookup import BulkLookup
+
+
+class FakeItem(object):
+    def __init__(self, name, expired=False):
+        self.name = name
+        self.expired = expired
+
+
+class FakeLookup(object):
+    """Lookup function with a cache of 'a' (fresh) and 'b' (expired), which finds anything except 'missing' online."""
+
+    def __init__(self):
+        self.cached_calls = []
+        self.online_calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, key, session, only_cached):
+        with self.lock:
+            (self.cached_calls if only_cached else self.online_calls).append(key)
+        if only_cached:
+            if key in ('a', 'b'):
+                return FakeItem(key.upper(), expired=key == 'b')
+            raise LookupError('%s not in cache' % key)
+        if key == 'missing':
+            raise LookupError('%s not found' % key)
+        if key == 'broken':
+            raise ValueError('broken lookup')
+        return FakeItem(key.upper())
+
+
+class TestBulkLookup(object):
+    config = 'tasks: {}'
+
+    def test_distinct_keys_looked_up_once(self, manager):
+        lookup = FakeLookup()
+        bulk = BulkLookup('test', lambda entry: entry.get('key'), lookup, {'looked_up_name': 'name'}, workers=3)
+        entries = [Entry(title=key, url='', key=key) for key in ['a', 'b', 'c', 'a', 'c', 'missing', 'd']]
+        rejected = Entry(title='rejected', url='', key='rejected')
+        rejected.reject('not wanted')
+        for entry in entries + [rejected]:
+            bulk.add(entry)
+
+        # Populating the first entry resolves all of them
+        assert bulk.populate(entries[0])
+        assert sorted(lookup.cached_calls) == ['a', 'b', 'c', 'd', 'missing']
+        # Expired cache items are refreshed online
+        assert sorted(lookup.online_calls) == ['b', 'c', 'd', 'missing']
+
+        results = [bulk.populate(entry) for entry in entries]
+        assert results == [True, True, True, True, True, False, True]
+        assert [entry.get('looked_up_name') for entry in entries] == ['A', 'B', 'C', 'A', 'C', None, 'D']
+        # No further lookups were needed
+        assert len(lookup.cached_calls) == 5
+        assert len(lookup.online_calls) == 4
+
+    def test_unregistered_entry(self, manager):
+        lookup = FakeLookup()
+        bulk = BulkLookup('test', lambda entry: entry.get('key'), lookup, {'looked_up_name': 'name'})
+        entry = Entry(title='e', url='', key='e')
+        assert bulk.populate(entry)
+        assert entry['looked_up_name'] == 'E'
+        assert not bulk.populate(Entry(title='no key', url=''))
+        assert lookup.cached_calls == ['e']
+
+    def test_error_raised_for_its_entry(self, manager):
+        lookup = FakeLookup()
+        bulk = BulkLookup('test', lambda entry: entry.get('key'), lookup, {'looked_up_name': 'name'})
+        broken = Entry(title='broken', url='', key='broken')
+        working = Entry(title='working', url='', key='working')
+        bulk.add(broken)
+        bulk.add(working)
+        assert bulk.populate(working)
+        with pytest.raises(ValueError):
+            bulk.populate(broken)
+
+    def test_conflicting_store_read_again(self, manager):
+        stored = set()
+
+        def lookup(key, session, only_cached):
+            # Both keys name the same show, only the first one can store it
+            if only_cached:
+                if stored:
+                    return FakeItem('SHOW')
+                raise LookupError('not in cache')
+            if key == 'first':
+                stored.add(key)
+            elif key == 'second':
+                raise IntegrityError('INSERT INTO series', {}, Exception('UNIQUE constraint failed'))
+            return FakeItem('SHOW')
+
+        bulk = BulkLookup('test', lambda entry: entry.get('key'), lookup, {'looked_up_name': 'name'}, workers=1)
+        entries = [Entry(title=key, url='', key=key) for key in ['first', 'second']]
+        for entry in entries:
+            bulk.add(entry)
+        assert [bulk.populate(entry) for entry in entries] == [True, True]
+        assert [entry['looked_up_name'] for entry in entries] == ['SHOW', 'SHOW']
+
+    def test_tmdb_key_names_movie(self, manager):
+        from flexget.plugins.metainfo.tmdb_lookup import PluginTmdbLookup
+        keys = [PluginTmdbLookup.bulk_key(Entry(title=title, url=''), 'en')
+                for title in ['Some Movie 2010 720p BluRay x264-GRP', 'Some.Movie.2010.1080p.WEB-DL-OTHER']]
+        assert keys[0] == keys[1] == (None, None, 'Some Movie', 2010, 'en')
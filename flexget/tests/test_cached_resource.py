@@ -0,0 +1,117 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import os
+import threading
+import time
+
+import pytest
+from requests import HTTPError
+
+from flexget.utils.cache import cached_resource, ResourceCache, MANIFEST_NAME
+
+
+def slow_image(body, delay=0.3):
+    def route(handler):
+        time.sleep(delay)
+        return 200, {'Content-Type': 'image/jpeg'}, body
+
+    return route
+
+
+class TestCachedResource(object):
+    def test_cached(self, http_server, tmpdir):
+        http_server.routes['/poster.jpg'] = (200, {'Content-Type': 'image/jpeg'}, b'poster')
+        path, mime_type = cached_resource(http_server.url('/poster.jpg'), tmpdir.strpath)
+        assert mime_type == 'image/jpeg'
+        with open(path, 'rb') as f:
+            assert f.read() == b'poster'
+        # The mime type is also known for cached files
+        assert cached_resource(http_server.url('/poster.jpg'), tmpdir.strpath) == (path, 'image/jpeg')
+        assert len(http_server.requests) == 1
+        cached_resource(http_server.url('/poster.jpg'), tmpdir.strpath, force=True)
+        assert len(http_server.requests) == 2
+
+    def test_concurrent_fetches_coalesced(self, http_server, tmpdir):
+        http_server.routes['/banner.jpg'] = slow_image(b'banner')
+        http_server.routes['/missing.jpg'] = (404, {}, b'')
+        results = []
+
+        def fetch(path):
+            try:
+                results.append(cached_resource(http_server.url(path), tmpdir.strpath))
+            except HTTPError as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=fetch, args=(path,)) for path in ['/banner.jpg', '/missing.jpg'] * 5]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len([r for r in results if isinstance(r, tuple)]) == 5
+        assert len(set(r for r in results if isinstance(r, tuple))) == 1
+        assert len([r for r in results if isinstance(r, HTTPError)]) == 5
+        assert sorted(path for _, path, _ in http_server.requests).count('/banner.jpg') == 1
+
+    def test_evicted_to_low_water_mark(self, http_server, tmpdir):
+        body = b'x' * (200 * 1024)
+        for name in 'abcdef':
+            http_server.routes['/%s.jpg' % name] = (200, {'Content-Type': 'image/jpeg'}, body)
+        for name in 'abcde':
+            cached_resource(http_server.url('/%s.jpg' % name), tmpdir.strpath, max_size=1)
+        # a is the most recently used now
+        cached_resource(http_server.url('/a.jpg'), tmpdir.strpath, max_size=1)
+        # Over 1 MB: the least recently used files are removed until 80% of the limit is left
+        cached_resource(http_server.url('/f.jpg'), tmpdir.strpath, max_size=1)
+        directory = tmpdir.join('cached_resources')
+        files = set(p.basename for p in directory.listdir()) - {MANIFEST_NAME}
+        assert len(files) == 4
+        cache = ResourceCache(directory.strpath)
+        assert cache.size == 4 * len(body)
+        for name in 'af':
+            assert cached_resource(http_server.url('/%s.jpg' % name), tmpdir.strpath)[0] in \
+                [p.strpath for p in directory.listdir()]
+        assert len(http_server.requests) == 6
+
+    def test_existing_files_indexed(self, tmpdir):
+        directory = tmpdir.mkdir('cached')
+        directory.join('old').write_binary(b'old file')
+        directory.join('other.1.tmp').write_binary(b'partial')
+        cache = ResourceCache(directory.strpath)
+        assert cache.size == len(b'old file')
+        assert cache.get('old') is None
+        assert cache.get('new') is False
+        assert not directory.join('other.1.tmp').check()
+        os.remove(directory.join('old').strpath)
+        assert cache.get('old') is False
+        assert cache.size == 0
+
+    def test_replace_removed_file(self, tmpdir):
+        cache = ResourceCache(tmpdir.strpath)
+        cache.add('a', 'http://a', b'first', 'text/plain')
+        # Removed by someone else, e.g. another process cleaning the cache
+        tmpdir.join('a').remove()
+        cache.add('a', 'http://a', b'second', 'text/plain')
+        assert tmpdir.join('a').read_binary() == b'second'
+        assert cache.size == len(b'second')
+
+    def test_access_times_buffered(self, tmpdir):
+        cache = ResourceCache(tmpdir.strpath)
+        cache.add('a', 'http://a', b'a', 'text/plain')
+
+        def accessed():
+            return cache._db.execute('SELECT accessed FROM resources WHERE name = ?', ('a',)).fetchone()[0]
+
+        added = accessed()
+        time.sleep(0.01)
+        # Hits don't write to the manifest
+        assert cache.get('a') == 'text/plain'
+        assert accessed() == added
+        cache.flush()
+        assert accessed() > added
+
+    @pytest.mark.parametrize('force', [True, False])
+    def test_failed_fetch(self, http_server, tmpdir, force):
+        http_server.routes['/error.jpg'] = (500, {}, b'')
+        with pytest.raises(HTTPError):
+            cached_resource(http_server.url('/error.jpg'), tmpdir.strpath, force=force)
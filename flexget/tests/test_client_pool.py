@@ -0,0 +1,86 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import pytest
+
+from flexget.utils import client_pool
+
+
+class Client(object):
+    connections = 0
+
+    def __init__(self):
+        Client.connections += 1
+        self.closed = False
+
+    def add(self, value):
+        return value
+
+    def fail(self, error):
+        raise error
+
+    def close(self):
+        self.closed = True
+
+
+class TestClientPool(object):
+    config = 'tasks: {}'
+
+    def test_shared_until_execution_completes(self, manager):
+        Client.connections = 0
+        first = client_pool.get_client('test', ('localhost', 1), Client)
+        assert client_pool.get_client('test', ('localhost', 1), Client) is first
+        assert client_pool.get_client('test', ('localhost', 2), Client) is not first
+        assert Client.connections == 2
+        client_pool.discard_client('test', ('localhost', 2))
+        client_pool.get_client('test', ('localhost', 2), Client)
+        assert Client.connections == 3
+        client_pool.release_clients(manager, manager.options)
+        client_pool.get_client('test', ('localhost', 1), Client)
+        assert Client.connections == 4
+
+    def test_calls_timed(self, manager):
+        client_pool.call_stats.reset()
+        client = client_pool.get_client('test', 'timed', Client)
+        assert client.add(1) == 1
+        client.add(2)
+        assert client_pool.call_stats.stats()['test']['add'][0] == 2
+        client_pool.release_clients(manager, manager.options)
+        assert not client_pool.call_stats.stats()
+
+    def test_discarded_when_broken(self, manager):
+        def is_broken(error):
+            return isinstance(error, IOError)
+
+        Client.connections = 0
+        first = client_pool.get_client('test', 'broken', Client, is_broken=is_broken)
+        with pytest.raises(ValueError):
+            first.fail(ValueError('refused'))
+        assert client_pool.get_client('test', 'broken', Client, is_broken=is_broken) is first
+        with pytest.raises(IOError):
+            first.fail(IOError('connection reset'))
+        second = client_pool.get_client('test', 'broken', Client, is_broken=is_broken)
+        assert second is not first
+        assert Client.connections == 2
+        # A late failure of the old connection doesn't discard the new one
+        with pytest.raises(IOError):
+            first.fail(IOError('connection reset'))
+        assert client_pool.get_client('test', 'broken', Client, is_broken=is_broken) is second
+        client_pool.release_clients(manager, manager.options)
+
+
+class TestConnectionPool(object):
+    def test_dead_connection_replaced(self):
+        Client.connections = 0
+        pool = client_pool.ConnectionPool(Client, lambda client: not client.closed, Client.close)
+        first = pool.get()
+        pool.put(first)
+        assert pool.get() is first
+        pool.put(first)
+        first.close()
+        second = pool.get()
+        assert second is not first
+        assert Client.connections == 2
+        pool.put(second)
+        pool.close()
+        assert second.closed
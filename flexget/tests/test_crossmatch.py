@@ -1,6 +1,11 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import random
+
+from flexget.entry import Entry
+from flexget.plugins.filter.crossmatch import CrossMatch, CrossMatchIndex
+
 
 class TestCrossmatch(object):
     config = """
@@ -15,9 +20,74 @@ class TestCrossmatch(object):
                 - title: entry 2
               action: reject
               fields: [title]
+          test_not_exact:
+            mock:
+            - {title: 'Some.Show.S01E01.720p', series_name: Some Show}
+            - {title: 'Other.Show.S01E01', series_name: Other}
+            - {title: 'Third', series_name: Third Show}
+            crossmatch:
+              from:
+              - mock:
+                - {title: 'Some.Show.S01E01', imdb_id: tt1}
+                - {title: 'Third Show S01E01', imdb_id: tt2}
+              action: accept
+              fields: [title]
+              exact: no
+          test_all_fields:
+            mock:
+            - {title: 'entry 1', imdb_id: tt1}
+            - {title: 'entry 2', imdb_id: tt2}
+            crossmatch:
+              from:
+              - mock:
+                - {title: 'entry 1', imdb_id: tt1}
+                - {title: 'entry 2', imdb_id: tt3}
+              action: accept
+              fields: [title, imdb_id]
+              all_fields: yes
     """
 
     def test_reject_title(self, execute_task):
         task = execute_task('test_title')
         assert task.find_entry('rejected', title='entry 2')
         assert len(task.rejected) == 1
+
+    def test_not_exact(self, execute_task):
+        task = execute_task('test_not_exact')
+        # the generated title is contained in the entry title
+        assert task.find_entry('accepted', title='Some.Show.S01E01.720p')['imdb_id'] == 'tt1'
+        # the entry title is contained in the generated title
+        assert task.find_entry('accepted', title='Third')['imdb_id'] == 'tt2'
+        assert len(task.accepted) == 2
+
+    def test_all_fields(self, execute_task):
+        task = execute_task('test_all_fields')
+        assert task.find_entry('accepted', title='entry 1')
+        assert len(task.accepted) == 1
+
+    def test_index_finds_all_matches(self):
+        rand = random.Random(42)
+
+        def value():
+            kind = rand.random()
+            if kind < 0.1:
+                return rand.randint(0, 3)
+            if kind < 0.15:
+                return ['ab', 'abc']
+            return ''.join(rand.choice('abc') for _ in range(rand.randint(0, 6)))
+
+        generated = [Entry(title='g%d' % i, a=value(), b=value()) for i in range(150)]
+        entries = [Entry(title='e%d' % i, a=value(), b=value()) for i in range(50)]
+        del entries[0]['a']
+        crossmatch = CrossMatch()
+        position = dict((id(g), i) for i, g in enumerate(generated))
+        for exact in (True, False):
+            index = CrossMatchIndex(generated, ['a', 'b'], exact)
+            for all_fields in (False, True):
+                for entry in entries:
+                    candidates = [position[id(g)] for g in index.candidates(entry, all_fields)]
+                    assert candidates == sorted(candidates)
+                    for g in generated:
+                        common = crossmatch.entry_intersects(entry, g, ['a', 'b'], exact)
+                        if common and (not all_fields or len(common) == 2):
+                            assert position[id(g)] in candidates
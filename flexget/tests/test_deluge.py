@@ -0,0 +1,81 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from flexget.plugins.clients.deluge import InputDeluge
+
+
+class Result(object):
+    def __init__(self, value):
+        self.value = value
+
+    def addCallback(self, callback):
+        callback(self.value)
+
+
+class Client(object):
+    """Fake deluge client answering get_torrents_status right away"""
+
+    def __init__(self, torrents):
+        self.torrents = torrents
+        self.requests = []
+        self.core = self
+
+    def get_torrents_status(self, filter, keys):
+        ids = filter.get('id', list(self.torrents))
+        self.requests.append((sorted(ids), sorted(keys)))
+        return Result(dict((torrent_id, dict((key, value) for key, value in torrent.items() if key in keys))
+                           for torrent_id, torrent in self.torrents.items() if torrent_id in ids))
+
+
+class TestDelugeIncremental(object):
+    config = {'incremental': True, 'keys': ['private']}
+
+    def get_status(self, plugin, client, config=None):
+        result = []
+        config = plugin.prepare_config(dict(self.config if config is None else config))
+        plugin.get_torrents_status(client, config, result.append)
+        return result[0]
+
+    def static_requests(self, client):
+        return [ids for ids, keys in client.requests if 'files' in keys]
+
+    def test_first_run(self):
+        client = Client({'a': {'name': 'A', 'files': ['a.mkv'], 'private': True}})
+        assert self.get_status(InputDeluge(), client) == {'a': {'name': 'A', 'files': ['a.mkv'], 'private': True}}
+        assert self.static_requests(client) == [['a']]
+
+    def test_static_keys_from_snapshot(self):
+        plugin = InputDeluge()
+        client = Client({'a': {'name': 'A', 'files': ['a.mkv'], 'private': True}})
+        self.get_status(plugin, client)
+        client.torrents['a']['name'] = 'Renamed'
+        client.torrents['b'] = {'name': 'B', 'files': ['b.mkv'], 'private': False}
+        assert self.get_status(plugin, client) == {
+            'a': {'name': 'Renamed', 'files': ['a.mkv'], 'private': True},
+            'b': {'name': 'B', 'files': ['b.mkv'], 'private': False}}
+        # Only the new torrent had its static keys fetched again
+        assert self.static_requests(client) == [['a'], ['b']]
+
+    def test_magnet_without_metadata(self):
+        plugin = InputDeluge()
+        client = Client({'a': {'name': 'A', 'files': [], 'private': False}})
+        self.get_status(plugin, client)
+        client.torrents['a']['files'] = ['a.mkv']
+        assert self.get_status(plugin, client)['a']['files'] == ['a.mkv']
+        assert self.static_requests(client) == [['a'], ['a']]
+
+    def test_removed(self):
+        plugin = InputDeluge()
+        client = Client({'a': {'name': 'A', 'files': ['a.mkv']}, 'b': {'name': 'B', 'files': ['b.mkv']}})
+        self.get_status(plugin, client)
+        del client.torrents['a']
+        assert list(self.get_status(plugin, client)) == ['b']
+        assert [list(snapshot) for snapshot in plugin.snapshots.values()] == [['b']]
+
+    def test_not_incremental_by_default(self):
+        plugin = InputDeluge()
+        client = Client({'a': {'name': 'A', 'files': ['a.mkv']}})
+        self.get_status(plugin, client, {})
+        self.get_status(plugin, client, {})
+        assert len(self.static_requests(client)) == 2
+        assert not plugin.snapshots
@@ -38,6 +38,22 @@ class EstRelease(object):
 plugin.register(EstRelease, 'test_release', interfaces=['estimate_release'], api_ver=2)
 
 
+class BatchEstRelease(object):
+    """Fake batch release estimate plugin. Returns 'batch_est_release' entry field, and records its batches."""
+
+    batches = []
+
+    def estimate(self, entry):
+        return entry.get('batch_est_release')
+
+    def estimate_entries(self, entries):
+        self.batches.append([entry['title'] for entry in entries])
+        return [self.estimate(entry) for entry in entries]
+
+
+plugin.register(BatchEstRelease, 'test_batch_release', interfaces=['estimate_release'], api_ver=2)
+
+
 class TestDiscover(object):
     config = """
         tasks:
@@ -70,6 +86,16 @@ class TestDiscover(object):
                 - title: Foo
               from:
               - test_search: yes
+          test_batch_estimates:
+            discover:
+              interval: 0 seconds
+              what:
+              - mock:
+                - title: Foo
+                - title: Bar
+                - title: Baz
+              from:
+              - test_search: yes
           test_next_series_episodes:
             discover:
               release_estimations: ignore
@@ -97,6 +123,24 @@ class TestDiscover(object):
                 identified_by: ep
             mock_output: yes
             max_reruns: 3
+          test_concurrent_searches:
+            discover:
+              release_estimations: ignore
+              concurrency: 4
+              plugin_concurrency:
+                test_search: 3
+              what:
+              - next_series_episodes:
+                  from_start: yes
+              from:
+              - test_search: fail
+              - test_search: no
+              - test_search: yes
+            series:
+            - My Show:
+                identified_by: ep
+            mock_output: yes
+            max_reruns: 3
 
     """
 
@@ -133,6 +177,17 @@ class TestDiscover(object):
         task = execute_task('test_estimates')
         assert len(task.entries) == 1
 
+    def test_batch_estimates(self, execute_task, manager):
+        mock_config = manager.config['tasks']['test_batch_estimates']['discover']['what'][0]['mock']
+        mock_config[0]['batch_est_release'] = datetime.now() + timedelta(days=7)
+        mock_config[1]['batch_est_release'] = datetime.now()
+        del BatchEstRelease.batches[:]
+        task = execute_task('test_batch_estimates')
+        # All entries should have been estimated in a single call
+        assert BatchEstRelease.batches == [['Foo', 'Bar', 'Baz']]
+        # Foo is not released yet, Baz has no release date at all
+        assert [e['title'] for e in task.entries] == ['Bar']
+
     def test_next_series_episodes(self, execute_task):
         task = execute_task('test_next_series_episodes')
         assert task.find_entry(title='My Show S01E01')
@@ -145,6 +200,12 @@ class TestDiscover(object):
         assert len(task.mock_output) == 4, \
             '4 episodes should have been accepted, not %s' % len(task.mock_output)
 
+    def test_concurrent_searches(self, execute_task):
+        task = execute_task('test_concurrent_searches')
+        assert [e['title'] for e in task.mock_output] == ['My Show S01E0%d' % epnum for epnum in range(1, 5)]
+        for entry in task.mock_output:
+            assert entry['discovered_with'] == 'test_search'
+
 
 class TestEmitSeriesInDiscover(object):
     config = """
@@ -241,3 +302,39 @@ class TestEmitSeriesInDiscover(object):
         assert task.find_entry(title='My Show 2 S03')
 
 
+class TestEstimateSeriesInternal(object):
+    config = """
+        tasks:
+          series:
+            mock:
+              - {title: 'Foo.S01E01.720p.HDTV-FlexGet'}
+              - {title: 'Foo.S01E02.720p.HDTV-FlexGet'}
+              - {title: 'Bar.S01E01.720p.HDTV-FlexGet'}
+              - {title: 'Bar.S01E02.720p.HDTV-FlexGet'}
+              - {title: 'Bar.S01E03.720p.HDTV-FlexGet'}
+            series:
+              - Foo
+              - Bar
+    """
+
+    def test_many_series(self, execute_task):
+        from flexget.manager import Session
+        from flexget.plugins.filter.series import Episode, EpisodeRelease
+
+        execute_task('series')
+        with Session() as session:
+            # The last episode of each series was just seen, the ones before every 4 days for Foo, 3 days for Bar
+            for release in session.query(EpisodeRelease).join(Episode):
+                last, interval = {'Foo': (2, 4), 'Bar': (3, 3)}[release.episode.series.name]
+                release.first_seen = datetime.now() - timedelta(days=(last - release.episode.number) * interval)
+        estimator = plugin.get_plugin_by_name('est_series_internal').instance
+        # More series than sqlite allows variables in a query
+        entries = [Entry(title='Show %s S01E03' % i, series_name='Show %s' % i, series_season=1, series_episode=3)
+                   for i in range(1500)]
+        entries.append(Entry(title='Foo S01E03', series_name='Foo', series_season=1, series_episode=3))
+        entries.append(Entry(title='Bar S01E04', series_name='Bar', series_season=1, series_episode=4))
+        results = estimator.estimate_entries(entries)
+        assert results[:-2] == [None] * 1500
+        assert results[-2] > results[-1] > datetime.now()
+        # The last two episodes of each series are used, like when estimating the entries one at a time
+        assert results[-2:] == [estimator.estimate(entry) for entry in entries[-2:]]
@@ -1,9 +1,13 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import hashlib
+
 import pytest
 import sys
 import os
+import threading
+import time
 
 from jinja2 import Template
 
@@ -175,3 +179,102 @@ class TestDownloadAuth(object):
 
         task = execute_task('with_auth')
         assert len(task.accepted) == 2
+
+
+@pytest.mark.usefixtures('tmpdir')
+class TestDownloadConcurrency(object):
+    _config = """
+        tasks:
+          concurrent:
+            disable: builtins
+            mock:
+            {% for name in names %}
+              - {title: '{{ name }}', url: '{{ url }}{{ name }}'}
+            {% endfor %}
+              - {title: 'missing', url: '{{ url }}missing'}
+            accept_all: yes
+            download:
+              path: __tmp__/out
+              temp: __tmp__/temp
+              concurrency: 4
+              host_concurrency: 2
+    """
+    names = ['a', 'b', 'c', 'd', 'e']
+
+    @pytest.fixture
+    def config(self, http_server, tmpdir):
+        tmpdir.mkdir('out')
+        tmpdir.mkdir('temp')
+        lock = threading.Lock()
+        in_flight = http_server.in_flight = [0, 0]
+
+        def route(name):
+            def respond(handler):
+                with lock:
+                    in_flight[0] += 1
+                    in_flight[1] = max(in_flight)
+                time.sleep(0.2)
+                with lock:
+                    in_flight[0] -= 1
+                return 200, {'Content-Type': 'application/x-bittorrent'}, name.encode('ascii')
+
+            return respond
+
+        for name in self.names:
+            http_server.routes['/' + name] = route(name)
+        return Template(self._config).render({'names': self.names, 'url': http_server.url('/')})
+
+    def test_concurrent_downloads(self, execute_task, http_server, tmpdir, manager):
+        task = execute_task('concurrent')
+        # Never more than `host_concurrency` simultaneous downloads from the same host
+        assert http_server.in_flight[1] == 2
+        for name in self.names:
+            assert task.find_entry('accepted', title=name)
+            assert tmpdir.join('out', name).read_binary() == name.encode('ascii')
+        assert task.find_entry('failed', title='missing')
+        error_page = os.path.join(manager.config_base, 'received', 'concurrent', 'missing.error')
+        assert os.path.exists(error_page)
+        os.remove(error_page)
+        assert not tmpdir.join('temp').listdir()
+
+
+@pytest.mark.usefixtures('tmpdir')
+class TestDownloadInspection(object):
+    _config = """
+        tasks:
+          inspect:
+            disable: builtins
+            mock:
+              - {title: 'torrent', url: '{{ url }}torrent'}
+              - {title: 'disguised page', url: '{{ url }}disguised'}
+              - {title: 'page', url: '{{ url }}page'}
+            accept_all: yes
+            download:
+              path: __tmp__/out
+              temp: __tmp__/temp
+              digests: [md5, sha1]
+    """
+    torrent = b'd8:announce3:url4:infod4:name4:testee'
+
+    @pytest.fixture
+    def config(self, http_server, tmpdir):
+        tmpdir.mkdir('out')
+        tmpdir.mkdir('temp')
+        http_server.routes['/torrent'] = (200, {'Content-Type': 'application/octet-stream'}, self.torrent)
+        http_server.routes['/disguised'] = (200, {'Content-Type': 'application/x-bittorrent'},
+                                            b'\n  <!DOCTYPE html>\n<html><body>Please log in' + b' ' * 1000000)
+        http_server.routes['/page'] = (200, {'Content-Type': 'text/html; charset=utf-8'}, b'<html></html>')
+        return Template(self._config).render({'url': http_server.url('/')})
+
+    def test_inspected_while_downloading(self, execute_task, tmpdir):
+        task = execute_task('inspect')
+        entry = task.find_entry('accepted', title='torrent')
+        assert entry['file_size'] == len(self.torrent)
+        assert entry['file_type'] == 'torrent'
+        assert entry['file_md5'] == hashlib.md5(self.torrent).hexdigest()
+        assert entry['file_sha1'] == hashlib.sha1(self.torrent).hexdigest()
+        # Html pages are recognized, the download of the disguised page is stopped after the first chunk
+        assert task.find_entry('failed', title='disguised page')
+        assert task.find_entry('failed', title='page')
+        assert tmpdir.join('out').listdir() == [tmpdir.join('out', 'torrent')]
+        assert not tmpdir.join('temp').listdir()
@@ -0,0 +1,128 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import asyncore
+import smtpd
+import threading
+from email import message_from_string
+
+import mock
+import pytest
+from jinja2 import Template
+
+from flexget.plugins.notifiers.email import smtp_pool
+from flexget.plugins.notifiers.notification_framework import dispatcher
+
+
+class SmtpServer(smtpd.SMTPServer, object):
+    """Local smtp server keeping the received mails, and counting the connections made to it."""
+
+    def __init__(self):
+        self.socket_map = {}
+        super(SmtpServer, self).__init__(('127.0.0.1', 0), None, map=self.socket_map, decode_data=True)
+        self.port = self.socket.getsockname()[1]
+        self.mails = []
+        self.connections = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def serve(self):
+        while self.running:
+            asyncore.loop(timeout=0.05, count=1, map=self.socket_map)
+
+    def handle_accepted(self, conn, addr):
+        self.connections += 1
+        smtpd.SMTPChannel(self, conn, addr, map=self.socket_map, decode_data=True)
+
+    def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+        self.mails.append(message_from_string(data))
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        asyncore.close_all(map=self.socket_map)
+
+
+@pytest.fixture()
+def smtp_server():
+    server = SmtpServer()
+    yield server
+    smtp_pool.close_idle(max_idle=0)
+    server.stop()
+
+
+class TestEmailNotifier(object):
+    _config = """
+        templates:
+          global:
+            disable: builtins
+            mock:
+              - {title: 'a'}
+              - {title: 'b'}
+              - {title: 'c'}
+            accept_all: yes
+        tasks:
+          per_entry:
+            notify:
+              entries:
+                message: 'got {% raw %}{{ title }}{% endraw %}'
+                via:
+                  - email:
+                      to: to@flexget.com
+                      smtp_host: 127.0.0.1
+                      smtp_port: {{ port }}
+          digest:
+            notify:
+              entries:
+                message: 'got {% raw %}{{ title }}{% endraw %}'
+                via:
+                  - email:
+                      to: to@flexget.com
+                      smtp_host: 127.0.0.1
+                      smtp_port: {{ port }}
+                      digest: yes
+    """
+
+    @pytest.fixture
+    def config(self, smtp_server):
+        return Template(self._config).render(port=smtp_server.port)
+
+    def test_connection_reused(self, execute_task, smtp_server):
+        execute_task('per_entry')
+        dispatcher.wait(timeout=10)
+        assert [mail['Subject'] for mail in smtp_server.mails] == ['a', 'b', 'c']
+        assert smtp_server.mails[0].get_payload()[0].get_payload(decode=True) == b'got a'
+        assert smtp_server.connections == 1
+        # Later notifications keep using the same connection
+        execute_task('per_entry')
+        dispatcher.wait(timeout=10)
+        assert len(smtp_server.mails) == 6
+        assert smtp_server.connections == 1
+
+    def test_idle_timeout(self, execute_task, smtp_server):
+        with mock.patch('flexget.plugins.notifiers.email.IDLE_TIMEOUT', 0):
+            execute_task('per_entry')
+            dispatcher.wait(timeout=10)
+        assert len(smtp_server.mails) == 3
+        assert smtp_server.connections == 3
+
+    def test_server_closed_connection(self, execute_task, smtp_server):
+        execute_task('per_entry')
+        dispatcher.wait(timeout=10)
+        for channel in list(smtp_server.socket_map.values()):
+            if channel is not smtp_server:
+                channel.close()
+        execute_task('per_entry')
+        dispatcher.wait(timeout=10)
+        assert len(smtp_server.mails) == 6
+        assert smtp_server.connections == 2
+
+    def test_digest(self, execute_task, smtp_server):
+        execute_task('digest')
+        dispatcher.wait(timeout=10)
+        # The messages queued while the first one was being sent go out in one email
+        assert len(smtp_server.mails) <= 2
+        bodies = b'\n\n'.join(mail.get_payload()[0].get_payload(decode=True) for mail in smtp_server.mails)
+        assert bodies.replace(b'\r\n', b'\n').endswith(b'b\ngot b\n\nc\ngot c')
@@ -1,9 +1,11 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import mock
+
 from flexget.entry import Entry
 from flexget.manager import Session
-from flexget.plugins.list.entry_list import EntryListList, EntryListEntry
+from flexget.plugins.list.entry_list import EntryListList, EntryListEntry, DBEntrySet
 
 
 class TestEntryListSearch(object):
@@ -91,3 +93,21 @@ class TestEntryListQuality(object):
         assert entry['quality'] == '720p hdtv'
 
 
+class TestEntryListIteration(object):
+    config = 'tasks: {}'
+
+    @mock.patch('flexget.plugins.list.entry_list.PAGE_SIZE', 2)
+    def test_paginated_lazy_entries(self, manager):
+        entry_list = DBEntrySet('paged')
+        entry_list.add_many([Entry(title='entry %d' % i, url='http://%d' % i, number=i) for i in range(5)])
+        entry_list.discard_many([Entry(title='entry 3', url='')])
+        entries = list(entry_list)
+        assert [entry['title'] for entry in entries] == ['entry 4', 'entry 2', 'entry 1', 'entry 0']
+        entry = entries[0]
+        assert entry.is_lazy('number')
+        assert entry['url'] == 'http://4'
+        assert entry['number'] == 4
+        assert not entry.is_lazy('number')
+        entries[1]['number'] = 'changed'
+        assert entries[1]['number'] == 'changed'
+        assert entry_list.get(Entry(title='entry 1', url=''))['number'] == 1
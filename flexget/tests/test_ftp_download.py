@@ -0,0 +1,54 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import mock
+import pytest
+from jinja2 import Template
+
+
+@mock.patch('flexget.plugins.output.ftp_download.RETRY_INTERVAL', 0)
+class TestFtpDownload(object):
+    _config = """
+        tasks:
+          download:
+            disable: builtins
+            mock:
+              - {title: 'pack', url: '{{ url }}pack'}
+              - {title: 'single', url: '{{ url }}single.mkv'}
+            accept_all: yes
+            ftp_download:
+              ftp_tmp_path: __tmp__/out
+              concurrency: 3
+              delete_origin: {{ delete_origin }}
+    """
+
+    @pytest.fixture(params=[False, True], ids=['keep', 'delete_origin'])
+    def config(self, request, ftp_server, tmpdir):
+        tmpdir.mkdir('out')
+        pack = ftp_server.root.mkdir('pack')
+        for episode in range(1, 6):
+            pack.join('e%02d.mkv' % episode).write_binary(b'%d' % episode * 10000)
+        pack.mkdir('subs').join('e01.srt').write_binary(b'subs')
+        ftp_server.root.join('single.mkv').write_binary(b's' * 50000)
+        return Template(self._config).render(url=ftp_server.url('/'), delete_origin=request.param)
+
+    def test_download(self, execute_task, ftp_server, tmpdir):
+        # The first download of this file is cut short, the second resumes it
+        ftp_server.interrupt['/pack/e03.mkv'] = 4321
+        task = execute_task('download')
+        assert not task.failed
+        out = tmpdir.join('out')
+        for episode in range(1, 6):
+            assert out.join('pack', 'e%02d.mkv' % episode).read_binary() == b'%d' % episode * 10000
+        assert out.join('pack', 'subs', 'e01.srt').read_binary() == b'subs'
+        assert out.join('single.mkv').read_binary() == b's' * 50000
+        assert ('REST', '4321') in ftp_server.commands
+        # Connections are reused by the downloads, at most one per concurrent download and one for walking the tree
+        assert ftp_server.connections <= 5
+        if task.config['ftp_download']['delete_origin']:
+            assert ftp_server.root.listdir() == []
+
+    def test_already_downloaded(self, execute_task, ftp_server, tmpdir):
+        tmpdir.join('out').join('single.mkv').write_binary(b's' * 50000)
+        execute_task('download')
+        assert ('RETR', '/single.mkv') not in ftp_server.commands
@@ -0,0 +1,214 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import os
+
+import pytest
+
+from flexget.utils import http_cache, requests
+from flexget.utils.http_cache import HTTPCache
+from flexget.utils.requests import DomainLimiter
+
+
+class CountingLimiter(DomainLimiter):
+    def __init__(self, domain):
+        super(CountingLimiter, self).__init__(domain)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+
+
+def revalidated(etag, body):
+    """Route answering requests with a matching If-None-Match with 304 Not Modified."""
+
+    def route(handler):
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, headers, b''
+        return 200, headers, body
+
+    return route
+
+
+class TestHTTPCache(object):
+    config = 'tasks: {}'
+
+    def test_fresh_response_reused(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = (200, {'Cache-Control': 'max-age=60', 'Content-Type': 'text/plain'}, b'a')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        first = session.get(http_server.url('/a'))
+        assert first.content == b'a'
+        assert not first.from_cache
+        second = session.get(http_server.url('/a'))
+        assert second.from_cache
+        assert second.text == 'a'
+        assert second.headers['Content-Type'] == 'text/plain'
+        assert len(http_server.requests) == 1
+        assert session.cache.stats()['hit_rate'] == 0.5
+
+    def test_not_stored(self, manager, http_server, tmpdir):
+        http_server.routes['/no-store'] = (200, {'Cache-Control': 'no-store, max-age=60'}, b'a')
+        http_server.routes['/no-info'] = (200, {}, b'a')
+        http_server.routes['/stale'] = (200, {'Cache-Control': 'max-age=0'}, b'a')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        for path in ['/no-store', '/no-info', '/stale']:
+            session.get(http_server.url(path)).content
+            assert not session.get(http_server.url(path)).from_cache
+        # The request can also ask for a fresh response
+        http_server.routes['/a'] = (200, {'Cache-Control': 'max-age=60'}, b'a')
+        session.get(http_server.url('/a'))
+        assert not session.get(http_server.url('/a'), headers={'Cache-Control': 'no-cache'}).from_cache
+        assert len(http_server.requests) == 8
+
+    def test_revalidation(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = revalidated('"v1"', b'first')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        assert session.get(http_server.url('/a')).content == b'first'
+        response = session.get(http_server.url('/a'))
+        assert response.from_cache
+        assert response.status_code == 200
+        assert response.content == b'first'
+        assert http_server.requests[1][2]['If-None-Match'] == '"v1"'
+        http_server.routes['/a'] = revalidated('"v2"', b'second')
+        response = session.get(http_server.url('/a'))
+        assert not response.from_cache
+        assert response.content == b'second'
+        stats = session.cache.stats()
+        assert (stats['hits'], stats['revalidated'], stats['misses']) == (1, 1, 2)
+
+    def test_domain_ttl(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = (200, {'Cache-Control': 'no-cache'}, b'a')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath, domains={'127.0.0.1': 60}))
+        session.get(http_server.url('/a')).content
+        assert session.get(http_server.url('/a')).from_cache
+        assert len(http_server.requests) == 1
+
+    def test_invalidated_by_post(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = (200, {'Cache-Control': 'max-age=60'}, b'a')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        session.get(http_server.url('/a')).content
+        session.post(http_server.url('/a'), data={'x': 1})
+        assert not session.get(http_server.url('/a')).from_cache
+
+    def test_credentials_not_cached(self, manager, http_server, tmpdir):
+        def route(handler):
+            user = handler.headers.get('Authorization') or handler.headers.get('Cookie')
+            return 200, {'Cache-Control': 'max-age=60'}, (user or 'anonymous').encode('ascii')
+
+        http_server.routes['/account'] = route
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        first = session.get(http_server.url('/account'), auth=('first', 'secret'))
+        second = session.get(http_server.url('/account'), auth=('second', 'other'))
+        assert first.content != second.content
+        assert not second.from_cache
+        assert session.get(http_server.url('/account'), cookies={'user': 'third'}).content == b'user=third'
+        assert len(http_server.requests) == 3
+        # Only the response to the anonymous request is reused, and only for anonymous requests
+        assert session.get(http_server.url('/account')).content == b'anonymous'
+        assert session.get(http_server.url('/account')).from_cache
+        response = session.get(http_server.url('/account'), auth=('first', 'secret'))
+        assert not response.from_cache
+        assert response.content == first.content
+
+    def test_compressed_lru(self, manager, http_server, tmpdir):
+        body = b'x' * 20000
+        for path in ['/a', '/b', '/c']:
+            http_server.routes[path] = (200, {'Cache-Control': 'max-age=60'}, body)
+        cache = HTTPCache(tmpdir.strpath, max_size=2000, max_item_size=50000)
+        session = requests.Session(cache=cache)
+        session.get(http_server.url('/a')).content
+        # Bodies are stored compressed
+        assert 0 < cache.store.size < len(body) / 10
+        session.get(http_server.url('/b')).content
+        # Using /a makes /b the least recently used
+        assert session.get(http_server.url('/a')).from_cache
+        # Room for two items, item sizes vary by a few bytes
+        max_size = cache.store.size + 50
+        cache.store.max_size = max_size
+        session.get(http_server.url('/c')).content
+        assert cache.stats()['evictions'] == 1
+        assert len(os.listdir(tmpdir.strpath)) == 2
+        # The cache is kept across restarts
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath, max_size=max_size))
+        assert session.get(http_server.url('/a')).from_cache
+        assert session.get(http_server.url('/c')).from_cache
+        assert not session.get(http_server.url('/b')).from_cache
+
+    def test_caller_validators(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = revalidated('"v2"', b'second')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        assert session.get(http_server.url('/a')).content == b'second'
+        # Validators of the caller are sent as they are, and a 304 answer is passed on
+        response = session.get(http_server.url('/a'), headers={'If-None-Match': '"v2"'}, raise_status=False)
+        assert response.status_code == 304
+        assert not response.from_cache
+        response = session.get(http_server.url('/a'), headers={'If-None-Match': '"v1"'})
+        assert http_server.requests[2][2]['If-None-Match'] == '"v1"'
+        assert response.content == b'second'
+
+    def test_streamed(self, manager, http_server, tmpdir):
+        body = b'x' * 100000
+        http_server.routes['/a'] = (200, {'Cache-Control': 'max-age=60'}, body)
+        cache = HTTPCache(tmpdir.strpath, max_item_size=200000)
+        session = requests.Session(cache=cache)
+        response = session.get(http_server.url('/a'), stream=True)
+        # The response is not read by the cache, and is not stored when the caller stops reading early
+        assert not response._content_consumed
+        next(response.iter_content(1000))
+        response.close()
+        assert not session.get(http_server.url('/a'), stream=True).from_cache
+        assert cache.stats()['stored'] == 0
+        response = session.get(http_server.url('/a'), stream=True)
+        assert b''.join(response.iter_content(1000)) == body
+        assert cache.stats()['stored'] == 1
+        assert session.get(http_server.url('/a')).from_cache
+
+    def test_rate_limit_skipped_for_hits(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = (200, {'Cache-Control': 'max-age=60'}, b'a')
+        session = requests.Session(cache=HTTPCache(tmpdir.strpath))
+        limiter = CountingLimiter('127.0.0.1')
+        session.add_domain_limiter(limiter)
+        session.get(http_server.url('/a')).content
+        assert session.get(http_server.url('/a')).from_cache
+        assert limiter.calls == 1
+        session.get(http_server.url('/a'), headers={'Cache-Control': 'no-cache'}).content
+        assert limiter.calls == 2
+        # Sessions without a cache are limited too
+        session = requests.Session(cache=False)
+        session.add_domain_limiter(limiter)
+        session.get(http_server.url('/a')).content
+        assert limiter.calls == 3
+
+    def test_default_cache_set_later(self, manager, http_server, tmpdir):
+        http_server.routes['/a'] = (200, {'Cache-Control': 'max-age=60'}, b'a')
+        # Like module level sessions, created before the cache is configured
+        session = requests.Session()
+        assert not session.cache
+        http_cache.set_default_cache(HTTPCache(tmpdir.strpath))
+        try:
+            session.get(http_server.url('/a')).content
+            assert session.get(http_server.url('/a')).from_cache
+        finally:
+            http_cache.set_default_cache(None)
+
+
+@pytest.mark.usefixtures('tmpdir')
+class TestHTTPCacheConfig(object):
+    config = """
+        http_cache:
+          directory: __tmp__
+          max_size: 1 MiB
+          domains:
+            example.com: 2 hours
+        tasks: {}
+    """
+
+    def test_default_cache(self, manager, tmpdir):
+        cache = http_cache.default_cache
+        assert cache.store.directory == tmpdir.strpath
+        assert cache.store.max_size == 1024 * 1024
+        assert cache.domain_ttl('http://api.example.com/x') == 7200
+        assert cache.domain_ttl('http://example.org/x') is None
+        assert requests.Session().cache is cache
+        assert not requests.Session(cache=False).cache
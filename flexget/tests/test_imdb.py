@@ -11,8 +11,13 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import mock
 import pytest
 
+from flexget.manager import Session
+from flexget.plugins.metainfo.imdb_lookup import Actor, Genre
+from flexget.utils.imdb import ImdbParser, ImdbSearch, extract_id, make_url
+
 
 @pytest.mark.online
 class TestImdb(object):
@@ -332,3 +337,61 @@ class TestImdbLookup(object):
             # Should have only been one call to the actual imdb page
             imdb_calls = sum(1 for r in use_vcr.requests if 'title/tt0133093' in r.uri)
             assert imdb_calls == 1
+
+
+class TestImdbLookupPrefetch(object):
+    config = """
+        tasks:
+          movies:
+            mock:
+              - {title: 'The.Matrix.1999.720p'}
+              - {title: 'The Matrix 1999 1080p'}
+              - {title: 'Inception.2010.720p'}
+              - {title: 'Unknown.Movie.2011'}
+              - {title: 'the matrix by id', imdb_id: 'tt0133093'}
+            imdb_lookup: yes
+    """
+
+    movies = {
+        ('the matrix', 1999): ('tt0133093', 'The Matrix', ['Action', 'Sci-Fi']),
+        ('inception', 2010): ('tt1375666', 'Inception', ['Action', 'Thriller']),
+    }
+
+    @pytest.fixture
+    def imdb(self):
+        calls = {'search': [], 'parse': []}
+        ids = dict((imdb_id, (name, year, genres)) for (_, year), (imdb_id, name, genres) in self.movies.items())
+
+        def best_match(search, name, year=None, single_match=True):
+            calls['search'].append((name, year))
+            movie = self.movies.get((name.lower(), year))
+            return {'url': make_url(movie[0])} if movie else None
+
+        def parse(parser, imdb_id):
+            calls['parse'].append(imdb_id)
+            parser.imdb_id = extract_id(imdb_id)
+            parser.name, parser.year, parser.genres = ids[parser.imdb_id]
+            parser.actors = {'nm0000206': 'Keanu Reeves'}
+
+        with mock.patch.object(ImdbSearch, 'best_match', best_match), mock.patch.object(ImdbParser, 'parse', parse):
+            yield calls
+
+    def test_lookups_shared(self, execute_task, imdb):
+        task = execute_task('movies')
+        assert task.find_entry(title='The.Matrix.1999.720p')['imdb_name'] == 'The Matrix'
+        # All entries were looked up together, each movie searched for and parsed once
+        assert sorted(imdb['search']) == [('Inception', 2010), ('The Matrix', 1999), ('Unknown Movie', 2011)]
+        assert sorted(imdb['parse']) == [make_url('tt0133093'), make_url('tt1375666')]
+        assert [entry.get('imdb_name') for entry in task.entries] == \
+            ['The Matrix', 'The Matrix', 'Inception', None, 'The Matrix']
+        assert task.find_entry(title='Inception.2010.720p')['imdb_genres'] == ['Action', 'Thriller']
+        assert task.find_entry(title='Inception.2010.720p')['imdb_actors'] == {'nm0000206': 'Keanu Reeves'}
+        with Session() as session:
+            assert session.query(Genre).filter(Genre.name == 'Action').count() == 1
+            assert session.query(Actor).count() == 1
+
+        # Everything is cached now
+        task = execute_task('movies')
+        assert task.find_entry(title='The Matrix 1999 1080p')['imdb_name'] == 'The Matrix'
+        assert len(imdb['search']) == 3
+        assert len(imdb['parse']) == 2
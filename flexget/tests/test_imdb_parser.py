@@ -1,9 +1,14 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import gzip
+import os
+
 import pytest
 
-from flexget.utils.imdb import ImdbParser
+from flexget.utils.imdb import ImdbParser, page_sections
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), 'imdb_pages')
 
 
 @pytest.mark.online
@@ -75,3 +80,28 @@ class TestImdbParser(object):
                                        "about the thrill of creating explosions of taste. To land his own kitchen and "
                                        "that third elusive Michelin star though, he'll need the best of the best on "
                                        "his side, including the beautiful Helene (Sienna Miller).")
+
+
+class TestImdbParserSections(object):
+    attributes = ['name', 'original_name', 'year', 'genres', 'languages', 'actors', 'directors', 'writers', 'score',
+                  'votes', 'plot_outline', 'mpaa_rating', 'photo']
+
+    @pytest.fixture(params=sorted(os.listdir(PAGES_DIR)))
+    def html(self, request):
+        with gzip.open(os.path.join(PAGES_DIR, request.param)) as page:
+            return page.read().decode('utf-8')
+
+    def test_same_as_whole_page(self, html):
+        assert 'overview' in page_sections(html)
+        lean, full = ImdbParser(), ImdbParser()
+        lean.parse_html(html)
+        full.parse_html(html, lean=False)
+        for attribute in self.attributes:
+            assert getattr(lean, attribute) == getattr(full, attribute), attribute
+        assert full.name
+
+    def test_missing_section(self, html):
+        parser = ImdbParser()
+        parser.parse_html(html.replace('id="titleCast"', 'id="cast"'))
+        assert parser.name
+        assert not parser.actors
@@ -1,6 +1,13 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+from flexget.entry import Entry
+from flexget.manager import Session
+from flexget.plugins.list.entry_list import DBEntrySet
+from flexget.plugins.list.pending_list import PendingListEntry, PendingListSet
+from flexget.plugins.list.sonarr_list import SonarrSet
+from flexget.utils.list_interface import EntryIndex, add_many, discard_many, get_many
+
 
 class TestListInterface(object):
     config = """
@@ -327,3 +334,69 @@ class TestListInterface(object):
         entry = task.find_entry(title="title 1")
         assert entry
         assert entry['attribute_name'] == 'some data'
+
+
+class TestBulkListInterface(object):
+    config = 'tasks: {}'
+
+    def test_entry_index(self):
+        items = [Entry(title='a', imdb_id='tt1'), Entry(title='b', tvdb_id=2, series_season=1),
+                 Entry(title='c', tvdb_id=2, series_season=2), Entry(title='d', imdb_id='tt1')]
+        index = EntryIndex(items, ['imdb_id', ('tvdb_id', 'series_season')])
+        assert index.find(Entry(imdb_id='tt1'))['title'] == 'a'
+        assert index.find(Entry(tvdb_id=2, series_season=2))['title'] == 'c'
+        assert index.find(Entry(tvdb_id=2)) is None
+        # The first item in list order matching by any key wins
+        assert index.find(Entry(imdb_id='tt1', tvdb_id=2, series_season=1))['title'] == 'a'
+        assert index.find(Entry(imdb_id='tt1'), match=lambda entry, item: item['title'] == 'd')['title'] == 'd'
+
+    def test_get_many_without_bulk_support(self):
+        class GetOnlyList(object):
+            def get(self, entry):
+                if entry['title'].startswith('match'):
+                    return Entry(title='item')
+
+        results = get_many(GetOnlyList(), [Entry(title='match 1'), Entry(title='other'), Entry(title='match 2')])
+        assert results[1] is None
+        assert results[0] == Entry(title='item')
+        # Equal items are returned as the same object, so that list_match single_match can tell them apart cheaply
+        assert results[0] is results[2]
+
+    def test_entry_list_many(self, manager):
+        thelist = DBEntrySet('bulk')
+        add_many(thelist, [Entry(title='title %d' % i, url='http://mock.url/%d' % i) for i in range(2000)])
+        # The same entry twice is only added once
+        add_many(thelist, [Entry(title='title 0', url='http://mock.url/0', refreshed=True)] * 2)
+        assert len(thelist) == 2000
+        entries = [Entry(title='title %d' % i, url='http://mock.url/%d' % i) for i in range(1500, 3000)]
+        entries.append(Entry(title='renamed', url='http://mock.url/10'))
+        results = get_many(thelist, entries)
+        assert sum(1 for result in results if result) == 501
+        assert results[0]['title'] == 'title 1500'
+        assert results[-1]['title'] == 'title 10'
+        assert get_many(thelist, [Entry(title='title 0', url='http://mock.url/0')])[0]['refreshed']
+        discard_many(thelist, entries)
+        assert len(thelist) == 1499
+
+    def test_pending_list_many(self, manager):
+        thelist = PendingListSet('bulk')
+        add_many(thelist, [Entry(title='title %d' % i, url='http://mock.url/%d' % i) for i in range(3)])
+        with Session() as session:
+            session.query(PendingListEntry).filter(PendingListEntry.title == 'title 1').one().approved = True
+        # Only approved entries are matched
+        results = get_many(thelist, [Entry(title='title %d' % i, url='http://mock.url/%d' % i) for i in range(3)])
+        assert [result and result['title'] for result in results] == [None, 'title 1', None]
+        discard_many(thelist, [Entry(title='title 0', url='http://mock.url/0'), Entry(title='title 1')])
+        with Session() as session:
+            assert [db_entry.title for db_entry in session.query(PendingListEntry)] == ['title 2']
+
+    def test_sonarr_many(self):
+        thelist = SonarrSet({})
+        thelist._shows = [Entry(title='Show A', tvdb_id=1), Entry(title='Show B', tvdb_id=2),
+                          Entry(title='Show C', tvdb_id=None)]
+        entries = [Entry(title='Other', tvdb_id=2), Entry(title='show c'), Entry(title='SHOW A', tvdb_id=3),
+                   Entry(title='Show B', tvdb_id=1), Entry(title='Unknown')]
+        # Shows are matched by id, or by title ignoring case, the first matching show winning
+        assert [result and result['title'] for result in get_many(thelist, entries)] == [
+            'Show B', 'Show C', 'Show A', 'Show A', None]
+        assert get_many(thelist, entries) == [thelist.get(entry) for entry in entries]
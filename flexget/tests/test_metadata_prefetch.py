@@ -0,0 +1,111 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from datetime import datetime, timedelta
+
+import mock
+import pytest
+
+from flexget.manager import Session
+from flexget.plugins.daemon.metadata_prefetch import prefetch, prepare_config
+from flexget.plugins.internal.api_trakt import TraktShow, TraktShowSearchResult
+from flexget.plugins.internal.api_tvmaze import TVMazeLookup, TVMazeSeries
+
+
+def trakt_show(trakt_id, title, overview=None):
+    return {
+        'ids': {'trakt': trakt_id, 'slug': title.lower(), 'imdb': None, 'tmdb': None, 'tvrage': None, 'tvdb': None},
+        'title': title,
+        'year': 2015,
+        'status': 'returning series',
+        'updated_at': '2016-01-01T00:00:00.000Z',
+        'overview': overview,
+    }
+
+
+def tvmaze_show(tvmaze_id, name, summary=None):
+    return {
+        'id': tvmaze_id, 'name': name, 'status': 'Running', 'rating': {'average': None}, 'weight': 0,
+        'updated': 1451606400, 'language': 'English', 'schedule': {}, 'url': '', 'externals': {}, 'summary': summary,
+        'runtime': 30, 'type': 'Scripted', 'genres': [], '_embedded': {'seasons': []},
+    }
+
+
+@mock.patch('flexget.plugins.daemon.metadata_prefetch.mark_expired')
+class TestMetadataPrefetch(object):
+    config = """
+        tasks:
+          series:
+            series:
+              - Show A
+              - Show B
+              - Show C
+    """
+
+    @pytest.fixture(autouse=True)
+    def shows(self, execute_task):
+        # Connects the configured series to the task
+        execute_task('series')
+        with Session() as session:
+            for trakt_id, title, age in [(1, 'Show A', 1), (2, 'Show B', 3), (3, 'Other', 5), (4, 'Show C (2015)', 4)]:
+                show = TraktShow(trakt_show(trakt_id, title), session)
+                show.cached_at = datetime.now() - timedelta(days=age)
+                session.add(show)
+            session.add(TraktShowSearchResult('Show C', series_id=4))
+
+    @mock.patch('flexget.plugins.daemon.metadata_prefetch.get_trakt')
+    def test_refresh_expiring(self, get_trakt, mark_expired):
+        get_trakt.side_effect = lambda style, trakt_id: trakt_show(trakt_id, 'Show %s' % trakt_id, overview='new')
+        assert prefetch(prepare_config({'ahead': '12 hours'})) == 2
+        # The series not configured in a task, or which don't expire soon, aren't refreshed
+        assert sorted(call[1]['trakt_id'] for call in get_trakt.call_args_list) == [2, 4]
+        with Session() as session:
+            assert session.query(TraktShow).get(2).overview == 'new'
+            assert not session.query(TraktShow).get(2).expired
+            assert session.query(TraktShow).get(1).overview is None
+
+    @mock.patch('flexget.plugins.daemon.metadata_prefetch.get_trakt')
+    def test_request_budget(self, get_trakt, mark_expired):
+        get_trakt.side_effect = lambda style, trakt_id: trakt_show(trakt_id, 'Show %s' % trakt_id)
+        assert prefetch(prepare_config({'ahead': '2 days', 'requests': 2})) == 2
+        # The ones expiring first are refreshed first
+        assert [call[1]['trakt_id'] for call in get_trakt.call_args_list] == [4, 2]
+
+    @mock.patch('flexget.plugins.daemon.metadata_prefetch.get_trakt')
+    def test_lookup_error(self, get_trakt, mark_expired):
+        get_trakt.side_effect = [LookupError('trakt is down'), trakt_show(2, 'Show B')]
+        assert prefetch(prepare_config({'ahead': '12 hours'})) == 1
+
+
+@mock.patch('flexget.plugins.daemon.metadata_prefetch.mark_expired')
+class TestTvmazePrefetch(object):
+    config = """
+        tasks:
+          series:
+            series:
+              - Show A
+              - Show C
+    """
+
+    @pytest.yield_fixture(autouse=True)
+    def shows(self, execute_task):
+        execute_task('series')
+        # The shows have no seasons
+        with mock.patch('flexget.plugins.internal.api_tvmaze.get_seasons', return_value=[]):
+            with Session() as session:
+                for tvmaze_id, name in [(1, 'Show A'), (2, 'Other'), (3, 'Show C (2015)')]:
+                    show = TVMazeSeries(tvmaze_show(tvmaze_id, name), session)
+                    show.last_update = datetime.now() - timedelta(days=8)
+                    session.add(show)
+                session.add(TVMazeLookup('Show C', series_id=3))
+            yield
+
+    @mock.patch('flexget.plugins.daemon.metadata_prefetch.get_show')
+    def test_refresh_expiring(self, get_show, mark_expired):
+        get_show.side_effect = lambda tvmaze_id: tvmaze_show(tvmaze_id, 'Show %s' % tvmaze_id, summary='new')
+        assert prefetch(prepare_config({'ahead': '12 hours'})) == 2
+        # Series are found by name, and through the lookups stored by earlier searches
+        assert sorted(call[1]['tvmaze_id'] for call in get_show.call_args_list) == [1, 3]
+        with Session() as session:
+            assert session.query(TVMazeSeries).get(3).summary == 'new'
+            assert session.query(TVMazeSeries).get(2).summary is None
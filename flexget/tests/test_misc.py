@@ -282,3 +282,39 @@ class TestSetPlugin(object):
         entry = task.find_entry('entries', title='Entry 1')
         assert entry['title'] == 'Entry 1', 'should fall back to original value when template fails'
         assert entry['other'] is None
+
+
+class TestTemplateCache(object):
+    config = 'tasks: {}'
+
+    def test_compiled_once(self, manager):
+        from flexget.utils import template
+        stats = template.cache_stats()
+        entries = [Entry(title='Entry %s' % i, url='', number=i) for i in range(5)]
+        for entry in entries:
+            assert entry.render('{{ title|upper }}') == entry['title'].upper()
+            assert template.evaluate_expression('number > 2', entry) == (entry['number'] > 2)
+        new_stats = template.cache_stats()
+        for name in ('templates', 'expressions'):
+            assert new_stats[name]['misses'] - stats[name]['misses'] == 1
+            assert new_stats[name]['hits'] - stats[name]['hits'] == 4
+
+    def test_bounded(self):
+        from flexget.utils.template import CompiledCache
+        cache = CompiledCache(lambda source: source.upper(), max_size=2)
+        assert cache.get('a') == 'A'
+        assert cache.get('b') == 'B'
+        # Makes 'b' the least recently used
+        cache.get('a')
+        cache.get('c')
+        assert cache.stats() == {'size': 2, 'max_size': 2, 'hits': 1, 'misses': 3}
+        cache.get('b')
+        assert cache.stats()['misses'] == 4
+
+    def test_render_lazy_without_copy(self, manager):
+        entry = Entry(title='Entry 1', url='')
+        entry.register_lazy_func(lambda e: e.update({'lazy_a': 'A', 'lazy_b': 'B'}), ['lazy_a', 'lazy_b'])
+        assert entry.render('{{ title }} {{ lazy_a }} {{ now is defined }}') == 'Entry 1 A True'
+        # Rendering must not add the extra fields to the entry
+        assert 'now' not in entry
+        assert entry['lazy_b'] == 'B'
@@ -0,0 +1,176 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import errno
+import os
+
+import mock
+import pytest
+
+from flexget.utils import transfer
+
+
+class TestTransfer(object):
+    def test_copy_file(self, tmpdir):
+        src = tmpdir.join('src')
+        src.write_binary(b'x' * 1000)
+        done = transfer.copy(src.strpath, tmpdir.mkdir('dst').strpath, verify_method='sha1')
+        assert done.dst == tmpdir.join('dst', 'src').strpath
+        assert done.bytes == 1000
+        assert tmpdir.join('dst', 'src').read_binary() == b'x' * 1000
+
+    def test_copy_without_kernel_support(self, tmpdir):
+        src = tmpdir.join('src')
+        src.write_binary(b'x' * 1000)
+        unsupported = OSError(errno.EINVAL, 'Invalid argument')
+        with mock.patch('os.sendfile', side_effect=unsupported, create=True), \
+                mock.patch('os.copy_file_range', side_effect=unsupported, create=True):
+            transfer.copy(src.strpath, tmpdir.join('dst').strpath)
+        assert tmpdir.join('dst').read_binary() == b'x' * 1000
+
+    def test_move_across_filesystems(self, tmpdir):
+        src = tmpdir.mkdir('src')
+        src.join('a.mkv').write_binary(b'a' * 100)
+        src.mkdir('subs').join('a.srt').write_binary(b'subs')
+        with mock.patch('os.rename', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')):
+            done = transfer.move(src.strpath, tmpdir.join('dst').strpath, verify_method='size')
+        assert not done.renamed
+        assert done.bytes == 104
+        assert not src.check()
+        assert tmpdir.join('dst', 'subs', 'a.srt').read_binary() == b'subs'
+
+    def test_copy_keeps_times(self, tmpdir):
+        src = tmpdir.join('src')
+        src.write_binary(b'x')
+        os.utime(src.strpath, (1000000000, 1000000000))
+        transfer.copy(src.strpath, tmpdir.join('dst').strpath)
+        copied = os.stat(tmpdir.join('dst').strpath)
+        assert copied.st_mtime == 1000000000
+        # Reading the source may have updated its access time, the copy gets the same one
+        assert copied.st_atime == os.stat(src.strpath).st_atime
+
+    def test_move_keeps_symlinks(self, tmpdir):
+        outside = tmpdir.mkdir('outside')
+        outside.join('b.mkv').write_binary(b'b')
+        src = tmpdir.mkdir('src')
+        src.join('a.mkv').write_binary(b'a')
+        src.join('linked').mksymlinkto(outside)
+        src.join('b.mkv').mksymlinkto(outside.join('b.mkv'))
+        src.join('dangling').mksymlinkto(tmpdir.join('missing'))
+        with mock.patch('os.rename', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')):
+            transfer.move(src.strpath, tmpdir.join('dst').strpath, verify_method='size')
+        assert not src.check()
+        dst = tmpdir.join('dst')
+        assert dst.join('a.mkv').read_binary() == b'a'
+        links = [('linked', outside), ('b.mkv', outside.join('b.mkv')), ('dangling', tmpdir.join('missing'))]
+        for name, target in links:
+            assert dst.join(name).islink()
+            assert dst.join(name).readlink() == target.strpath
+        # The symlinked directory is not removed with the source
+        assert outside.join('b.mkv').read_binary() == b'b'
+
+    def test_failed_verification_keeps_source(self, tmpdir):
+        src = tmpdir.join('src')
+        src.write_binary(b'x' * 1000)
+        with mock.patch('os.rename', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')), \
+                mock.patch('flexget.utils.transfer._file_digest', side_effect=['a', 'b']):
+            with pytest.raises(transfer.VerificationError):
+                transfer.move(src.strpath, tmpdir.join('dst').strpath, verify_method='md5')
+        assert src.check()
+        assert not tmpdir.join('dst').check()
+
+    def test_failed_copy_keeps_existing_file(self, tmpdir):
+        src = tmpdir.join('src')
+        src.write_binary(b'new')
+        dst = tmpdir.join('dst')
+        dst.write_binary(b'old')
+        with mock.patch('flexget.utils.transfer.copy_file', side_effect=IOError('Permission denied')):
+            with pytest.raises(IOError):
+                transfer.copy(src.strpath, dst.strpath)
+        assert dst.read_binary() == b'old'
+
+
+class TestMove(object):
+    _config = """
+        tasks:
+          move:
+            disable: builtins
+            mock:
+              - {title: 'a', location: '__tmp__/src/a.mkv'}
+              - {title: 'b', location: '__tmp__/src/b.mkv'}
+              - {title: 'c', location: '__tmp__/src/c.mkv'}
+              - {title: 'missing', location: '__tmp__/src/missing.mkv'}
+            accept_all: yes
+            move:
+              to: __tmp__/dst
+              unpack_safety: no
+              along:
+                extensions: [srt]
+              verify: sha256
+              concurrency: 3
+          copy:
+            disable: builtins
+            mock:
+              - {title: 'a', location: '__tmp__/src/a.mkv'}
+              - {title: 'b', location: '__tmp__/src/b.mkv'}
+            accept_all: yes
+            copy:
+              to: __tmp__/dst/{{title}}
+              unpack_safety: no
+              concurrency: 2
+    """
+
+    @pytest.fixture
+    def config(self, tmpdir):
+        tmpdir.mkdir('dst')
+        return self._config
+
+    @pytest.fixture
+    def src(self, tmpdir):
+        src = tmpdir.mkdir('src')
+        for name in 'abc':
+            src.join(name + '.mkv').write_binary(name.encode('ascii') * 1000)
+        src.join('a.srt').write_binary(b'subs')
+        return src
+
+    def test_move(self, execute_task, tmpdir, src):
+        task = execute_task('move')
+        dst = tmpdir.join('dst')
+        assert sorted(p.basename for p in dst.listdir()) == ['a.mkv', 'a.srt', 'b.mkv', 'c.mkv']
+        assert src.listdir() == []
+        assert task.find_entry('accepted', title='b')['location'] == dst.join('b.mkv').strpath
+        assert task.find_entry('accepted', title='b')['old_location'] == src.join('b.mkv').strpath
+
+    def test_copy(self, execute_task, tmpdir, src):
+        execute_task('copy')
+        for name in 'ab':
+            assert tmpdir.join('dst', name, name + '.mkv').read_binary() == name.encode('ascii') * 1000
+        assert len(src.listdir()) == 4
+
+    def test_failure(self, execute_task, tmpdir, src):
+        copy = transfer.copy
+
+        def fail_a(src, dst, **kwargs):
+            if src.endswith('a.mkv'):
+                raise IOError('No space left on device')
+            return copy(src, dst, **kwargs)
+
+        with mock.patch('flexget.utils.transfer.copy', side_effect=fail_a):
+            task = execute_task('copy')
+        assert [entry['title'] for entry in task.failed] == ['a']
+        assert task.find_entry('accepted', title='b')
+
+    def test_unexpected_error(self, execute_task, tmpdir, src):
+        move = transfer.move
+
+        def fail_a(src, dst, **kwargs):
+            if src.endswith('a.mkv'):
+                raise ValueError('broken')
+            return move(src, dst, **kwargs)
+
+        with mock.patch('flexget.utils.transfer.move', side_effect=fail_a):
+            task = execute_task('move')
+        # Only the entry with the error fails, the others are moved and their source cleaned
+        assert [entry['title'] for entry in task.failed] == ['a']
+        assert sorted(p.basename for p in tmpdir.join('dst').listdir()) == ['b.mkv', 'c.mkv']
+        assert sorted(p.basename for p in src.listdir()) == ['a.mkv', 'a.srt']
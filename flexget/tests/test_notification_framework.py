@@ -0,0 +1,161 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import socket
+import threading
+
+import mock
+import pytest
+
+from flexget import plugin
+from flexget.plugins.notifiers.notification_framework import dispatcher
+
+
+class NotifierPlugin(object):
+    """Fake notifier which records the messages sent, and can be held back to let messages queue up."""
+
+    schema = {
+        'type': 'object',
+        'properties': {'fail': {'type': 'integer'}, 'error': {'type': 'string', 'enum': ['warning', 'network', 'bug']}}
+    }
+    sent = []
+    release = threading.Event()
+
+    def notify(self, title, message, config):
+        self.release.wait()
+        if config.get('fail'):
+            config['fail'] -= 1
+            error = config.get('error', 'warning')
+            if error == 'network':
+                raise socket.error('Connection refused')
+            if error == 'bug':
+                raise KeyError('chat_id')
+            raise plugin.PluginWarning('service unavailable')
+        self.sent.append((title, message))
+
+
+class BatchNotifierPlugin(NotifierPlugin):
+    batch_messages = True
+
+
+class ShortBatchNotifierPlugin(NotifierPlugin):
+    batch_messages = True
+    # Two of the test messages fit
+    batch_max_length = 20
+
+
+plugin.register(NotifierPlugin, 'test_notifier', api_ver=2, interfaces=['notifiers'])
+plugin.register(BatchNotifierPlugin, 'test_batch_notifier', api_ver=2, interfaces=['notifiers'])
+plugin.register(ShortBatchNotifierPlugin, 'test_short_batch_notifier', api_ver=2, interfaces=['notifiers'])
+
+
+@mock.patch('flexget.plugins.notifiers.notification_framework.RETRY_INTERVAL', 0)
+class TestNotificationDispatch(object):
+    config = """
+        templates:
+          global:
+            disable: builtins
+            mock:
+              - {title: 'a'}
+              - {title: 'b'}
+              - {title: 'c'}
+            accept_all: yes
+        tasks:
+          entries:
+            notify:
+              entries:
+                message: 'got {{ title }}'
+                via:
+                  - test_notifier: {}
+          batched:
+            notify:
+              entries:
+                message: 'got {{ title }}'
+                via:
+                  - test_batch_notifier: {}
+          short_batches:
+            notify:
+              entries:
+                message: 'got {{ title }}'
+                via:
+                  - test_short_batch_notifier: {}
+          retried:
+            notify:
+              entries:
+                via:
+                  - test_notifier:
+                      fail: 2
+          network_error:
+            notify:
+              entries:
+                via:
+                  - test_notifier:
+                      fail: 1
+                      error: network
+          bug:
+            notify:
+              entries:
+                via:
+                  - test_notifier:
+                      fail: 1
+                      error: bug
+    """
+
+    @pytest.fixture(autouse=True)
+    def notifier(self):
+        NotifierPlugin.sent = []
+        NotifierPlugin.release.clear()
+        yield
+        NotifierPlugin.release.set()
+        dispatcher.wait()
+
+    def test_task_does_not_wait(self, execute_task):
+        execute_task('entries')
+        # The notifications are still waiting to be sent
+        assert not NotifierPlugin.sent
+        assert len(dispatcher) >= 2
+        assert dispatcher.stats()['test_notifier']['queued'] >= 2
+        NotifierPlugin.release.set()
+        assert dispatcher.wait(timeout=10)
+        assert NotifierPlugin.sent == [('a', 'got a'), ('b', 'got b'), ('c', 'got c')]
+        assert dispatcher.stats()['test_notifier']['queued'] == 0
+
+    def test_batch(self, execute_task):
+        execute_task('batched')
+        NotifierPlugin.release.set()
+        dispatcher.wait(timeout=10)
+        # The messages queued while the first one was being sent are combined, the first may be in the batch too
+        assert NotifierPlugin.sent[-1] == ('2 notifications', 'b\ngot b\n\nc\ngot c') or \
+            NotifierPlugin.sent[-1] == ('3 notifications', 'a\ngot a\n\nb\ngot b\n\nc\ngot c')
+        assert len(NotifierPlugin.sent) <= 2
+
+    def test_batch_max_length(self, execute_task):
+        execute_task('short_batches')
+        NotifierPlugin.release.set()
+        dispatcher.wait(timeout=10)
+        # Each message takes 9 characters combined, more than two don't fit
+        assert [title for title, _ in NotifierPlugin.sent] in (['a', '2 notifications'], ['2 notifications', 'c'])
+
+    def test_retry(self, execute_task):
+        execute_task('retried')
+        NotifierPlugin.release.set()
+        dispatcher.wait(timeout=10)
+        # Each of them failed twice before going through
+        assert NotifierPlugin.sent == [('a', 'a'), ('b', 'b'), ('c', 'c')]
+        assert dispatcher.stats()['test_notifier']['retries'] >= 6
+
+    def test_network_error_retried(self, execute_task):
+        execute_task('network_error')
+        NotifierPlugin.release.set()
+        dispatcher.wait(timeout=10)
+        assert NotifierPlugin.sent == [('a', 'a'), ('b', 'b'), ('c', 'c')]
+
+    def test_bug_not_retried(self, execute_task, caplog):
+        retries = dispatcher.stats().get('test_notifier', {}).get('retries', 0)
+        execute_task('bug')
+        NotifierPlugin.release.set()
+        dispatcher.wait(timeout=10)
+        assert NotifierPlugin.sent == []
+        assert dispatcher.stats()['test_notifier']['retries'] == retries
+        assert 'Unexpected error while sending notification' in caplog.text
+        assert 'Traceback' in caplog.text
@@ -0,0 +1,75 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import threading
+import time
+
+import pytest
+
+from flexget.utils.parallel import KeyedSemaphore, WorkQueue, parallel_map
+
+
+class TestParallel(object):
+    def test_results_in_order(self):
+        def work(i):
+            # Make the earlier items finish last
+            time.sleep((10 - i) * 0.005)
+            return i * 2
+
+        assert parallel_map(work, range(10), workers=5) == [i * 2 for i in range(10)]
+
+    def test_first_error_raised(self):
+        done = []
+
+        def work(i):
+            if i in (3, 6):
+                raise ValueError(i)
+            done.append(i)
+
+        with pytest.raises(ValueError) as excinfo:
+            parallel_map(work, range(8), workers=4)
+        assert excinfo.value.args == (3,)
+        # All other jobs should still have been run
+        assert sorted(done) == [0, 1, 2, 4, 5, 7]
+
+    def test_keyed_semaphore(self):
+        limits = KeyedSemaphore(3, {'one': 1})
+        lock = threading.Lock()
+        running = {'one': 0, 'other': 0}
+        peak = {'one': 0, 'other': 0}
+
+        def work(key):
+            with limits(key):
+                with lock:
+                    running[key] += 1
+                    peak[key] = max(peak[key], running[key])
+                time.sleep(0.01)
+                with lock:
+                    running[key] -= 1
+
+        parallel_map(work, ['one', 'other'] * 6, workers=8)
+        assert peak['one'] == 1
+        assert 1 < peak['other'] <= 3
+
+    def test_work_queue_stop(self):
+        started = threading.Semaphore(0)
+        release = threading.Event()
+        done = []
+
+        def work(i):
+            started.release()
+            release.wait(5)
+            done.append(i)
+
+        queue = WorkQueue(work, workers=2, name='stop-test')
+        for i in range(10):
+            queue.put(i)
+        # Both workers are handling an item
+        started.acquire()
+        started.acquire()
+        # Let the workers finish their items only while stop is waiting for them
+        threading.Timer(0.1, release.set).start()
+        queue.stop()
+        # The items being handled are finished, the others dropped, and no thread is left waiting for more
+        assert len(done) == 2
+        assert not [thread for thread in threading.enumerate() if thread.name.startswith('stop-test')]
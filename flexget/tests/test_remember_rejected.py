@@ -4,6 +4,8 @@ from past.builtins import basestring
 
 from flexget import plugin
 from flexget.event import event
+from flexget.manager import Session
+from flexget.plugins.filter.remember_rejected import RememberEntry
 from flexget.utils.tools import parse_timedelta
 
 
@@ -28,6 +30,12 @@ class TestRememberRejected(object):
             mock:
               - {title: 'title 1', url: 'http://localhost/title1'}
             test_remember_reject: yes
+          test_many:
+            mock:
+              - {title: 'title 1', url: 'http://localhost/title1'}
+              - {title: 'title 2', url: 'http://localhost/title2'}
+              - {title: 'title 2', url: 'http://localhost/title2.other'}
+            test_remember_reject: 1 day
     """
 
     def test_remember_rejected(self, execute_task):
@@ -36,3 +44,11 @@ class TestRememberRejected(object):
         task = execute_task('test')
         assert task.find_entry('rejected', title='title 1', rejected_by='remember_rejected'), \
             'remember_rejected should have rejected'
+
+    def test_remember_many(self, execute_task):
+        execute_task('test_many')
+        with Session() as session:
+            assert session.query(RememberEntry).filter(RememberEntry.expires != None).count() == 3
+        task = execute_task('test_many')
+        assert len(task.rejected) == 3
+        assert all(entry['rejected_by'] == 'remember_rejected' for entry in task.rejected)
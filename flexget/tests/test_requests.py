@@ -0,0 +1,45 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from flexget.utils import requests
+
+
+class TestSharedPools(object):
+    config = 'tasks: {}'
+
+    def test_connections_reused_across_sessions(self, manager, http_server):
+        http_server.routes['/a'] = (200, {}, b'a')
+        for _ in range(3):
+            session = requests.Session()
+            # Session specific state is not shared
+            session.headers['X-Session'] = str(id(session))
+            assert session.get(http_server.url('/a')).content == b'a'
+            session.close()
+        assert requests.get(http_server.url('/a')).content == b'a'
+        assert http_server.connections == 1
+        assert len(set(headers['X-Session'] for _, _, headers in http_server.requests[:3])) == 3
+        stats = requests.pool_stats.stats()['127.0.0.1']
+        assert stats == {'requests': 4, 'connections': 1, 'reused': 3}
+
+    def test_private_and_separate_pools(self, manager, http_server):
+        http_server.routes['/a'] = (200, {}, b'a')
+        # Sessions stream responses, reading the content releases the connection
+        requests.Session().get(http_server.url('/a')).content
+        requests.Session(pool='other').get(http_server.url('/a')).content
+        private = requests.Session(pool=None)
+        private.get(http_server.url('/a')).content
+        private.get(http_server.url('/a')).content
+        assert http_server.connections == 3
+
+    def test_configure_pools(self, manager, http_server):
+        http_server.routes['/a'] = (200, {}, b'a')
+        session = requests.Session()
+        session.get(http_server.url('/a')).content
+        requests.configure_pools(pool_maxsize=2)
+        try:
+            assert requests.pool_settings['pool_maxsize'] == 2
+            # Pools were reset, existing sessions open new connections
+            session.get(http_server.url('/a')).content
+            assert http_server.connections == 2
+        finally:
+            requests.configure_pools()
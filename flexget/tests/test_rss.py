@@ -158,6 +158,87 @@ class TestInputRSS(object):
             'RSS entry missing: multiple content tags'
 
 
+class TestInputRSSIncremental(object):
+    config = """
+        tasks:
+          test_incremental:
+            rss:
+              url: rss.xml
+              silent: yes
+              incremental: yes
+          test_incremental_growing:
+            rss:
+              # Replaced by a temporary file in the test
+              url: rss.xml
+              incremental: yes
+    """
+
+    feed = """<?xml version="1.0" encoding="utf-8"?>
+    <rss version="2.0"><channel><title>Incremental</title>%s</channel></rss>"""
+    item = """<item><title>%s</title><guid>http://localhost/%s</guid><pubDate>%s</pubDate></item>"""
+
+    def write_feed(self, path, *items):
+        path.write(self.feed % ''.join(self.item % (title, title, date) for title, date in items))
+        # reset input cache so that the cache is not used for next execution
+        from flexget.utils.cached_input import cached
+        cached.cache.clear()
+
+    def test_incremental(self, execute_task):
+        task = execute_task('test_incremental')
+        assert task.entries, 'Entries should have been produced on first run.'
+        from flexget.utils.cached_input import cached
+        cached.cache.clear()
+        task = execute_task('test_incremental')
+        assert not task.entries, 'No entries should have been produced the second run.'
+        assert task.no_entries_ok
+
+    def test_incremental_growing(self, execute_task, manager, tmpdir):
+        feed = tmpdir.join('feed.xml')
+        manager.config['tasks']['test_incremental_growing']['rss']['url'] = feed.strpath
+        self.write_feed(feed, ('B', 'Sun, 28 Dec 2008 14:10:00 -0000'), ('A', 'Sun, 28 Dec 2008 14:00:00 -0000'))
+        task = execute_task('test_incremental_growing')
+        assert [e['title'] for e in task.entries] == ['B', 'A']
+
+        self.write_feed(feed, ('D', 'Sun, 28 Dec 2008 14:30:00 -0000'), ('C', 'Sun, 28 Dec 2008 14:20:00 -0000'),
+                        ('B', 'Sun, 28 Dec 2008 14:10:00 -0000'), ('A', 'Sun, 28 Dec 2008 14:00:00 -0000'))
+        task = execute_task('test_incremental_growing')
+        assert [e['title'] for e in task.entries] == ['D', 'C']
+
+        # Items without a newer date, but with a guid not seen before are still new
+        self.write_feed(feed, ('E', 'Sun, 28 Dec 2008 14:30:00 -0000'), ('D', 'Sun, 28 Dec 2008 14:30:00 -0000'))
+        task = execute_task('test_incremental_growing')
+        assert [e['title'] for e in task.entries] == ['E']
+
+
+class TestInputRSSStream(TestInputRSS):
+    """Runs all of the above tests again, with incremental parsing enabled."""
+    config = TestInputRSS.config.replace("""
+              silent: yes
+""", """
+              silent: yes
+              stream: yes
+""") + """
+          test_max_items:
+            rss:
+              <<: *rss
+              max_items: 2
+          test_max_age:
+            rss:
+              <<: *rss
+              max_age: 1 day
+    """
+
+    def test_max_items(self, execute_task):
+        task = execute_task('test_max_items')
+        # The second item has 3 enclosures
+        assert [e['title'] for e in task.entries] == ['Zero sized enclosure'] + ['Multiple enclosures'] * 3
+
+    def test_max_age(self, execute_task):
+        task = execute_task('test_max_age')
+        assert not task.entries, 'All items of the test feed are older than a day'
+        assert task.no_entries_ok is False
+
+
 @pytest.mark.xfail(reason="silverorange changed some stuff")
 @pytest.mark.online
 class TestRssOnline(object):
@@ -71,6 +71,46 @@ class TestRTorrentClient(object):
         assert 'd.custom1.set=testing' in fields
         assert 'd.priority.set=3' in fields
 
+    def test_load_many(self, mocked_proxy):
+        mocked_proxy = mocked_proxy()
+        mocked_proxy.system.multicall.side_effect = [
+            [[0], {'faultCode': -503, 'faultString': 'Permission denied'}],
+            [[0], [0], [0]],
+        ]
+
+        client = RTorrent('http://localhost/RPC2')
+
+        resp = client.load_many([
+            (torrent_raw, {'directory': '/data/downloads'}),
+            (torrent_raw, {'directory': '/data/other'}),
+            (torrent_raw, {'directory': '/data/downloads', 'custom1': 'testing'}),
+            (torrent_raw, {}),
+        ], start=True)
+
+        assert resp[0] == 0
+        assert isinstance(resp[1], xmlrpc_client.Error)
+        assert resp[2] == 0
+        assert resp[3] == 0
+
+        # One request creating the directories, one loading the torrents
+        assert mocked_proxy.system.multicall.call_count == 2
+        mkdir_calls, load_calls = [c[0][0] for c in mocked_proxy.system.multicall.call_args_list]
+        assert [c['methodName'] for c in mkdir_calls] == ['execute.throw', 'execute.throw']
+        assert [c['params'][3] for c in mkdir_calls] == ['/data/downloads', '/data/other']
+        assert [c['methodName'] for c in load_calls] == ['load.raw_start'] * 3
+        assert 'd.custom1.set=testing' in load_calls[1]['params']
+
+    def test_existing(self, mocked_proxy):
+        mocked_proxy = mocked_proxy()
+        mocked_proxy.system.multicall.return_value = [
+            [torrent_info_hash], {'faultCode': -501, 'faultString': 'Could not find info-hash.'}
+        ]
+
+        client = RTorrent('http://localhost/RPC2')
+
+        assert client.existing([torrent_info_hash.lower(), 'A' * 40]) == {torrent_info_hash}
+        assert mocked_proxy.system.multicall.call_count == 1
+
     def test_torrent(self, mocked_proxy):
         mocked_proxy = mocked_proxy()
         mocked_proxy.system.multicall.return_value = [
@@ -260,39 +300,60 @@ class TestRTorrentOutputPlugin(object):
 
     def test_add(self, mocked_client, execute_task):
         mocked_client = mocked_client()
-        mocked_client.load.return_value = 0
+        mocked_client.load_many.return_value = [0]
         mocked_client.version = [0, 9, 4]
-        mocked_client.torrent.side_effect = [False, {'hash': torrent_info_hash}]
+        mocked_client.existing.side_effect = [set(), {torrent_info_hash}]
 
-        execute_task('test_add_torrent')
+        task = execute_task('test_add_torrent')
 
-        mocked_client.load.assert_called_with(
-            torrent_raw,
-            fields={'priority': 3, 'directory': '/data/downloads', 'custom1': 'test_custom1'},
+        mocked_client.load_many.assert_called_with(
+            [(torrent_raw, {'priority': 3, 'directory': '/data/downloads', 'custom1': 'test_custom1'})],
             start=True,
             mkdir=True,
         )
+        assert task.find_entry('accepted', title='test')
 
     def test_add_set(self, mocked_client, execute_task):
         mocked_client = mocked_client()
-        mocked_client.load.return_value = 0
+        mocked_client.load_many.return_value = [0]
         mocked_client.version = [0, 9, 4]
-        mocked_client.torrent.side_effect = [False, {'hash': torrent_info_hash}]
+        mocked_client.existing.side_effect = [set(), {torrent_info_hash}]
 
         execute_task('test_add_torrent_set')
 
-        mocked_client.load.assert_called_with(
-            torrent_raw,
-            fields={
+        mocked_client.load_many.assert_called_with(
+            [(torrent_raw, {
                 'priority': 1,
                 'directory': '/data/downloads',
                 'custom1': 'test_custom1',
                 'custom2': 'test_custom2'
-            },
+            })],
             start=False,
             mkdir=False,
         )
 
+    def test_add_existing(self, mocked_client, execute_task):
+        mocked_client = mocked_client()
+        mocked_client.version = [0, 9, 4]
+        mocked_client.existing.return_value = {torrent_info_hash}
+
+        execute_task('test_add_torrent')
+
+        assert not mocked_client.load_many.called
+
+    def test_add_not_loaded(self, mocked_client, execute_task):
+        mocked_client = mocked_client()
+        mocked_client.load_many.return_value = [0]
+        mocked_client.version = [0, 9, 4]
+        mocked_client.existing.return_value = set()
+
+        with mock.patch('flexget.plugins.clients.rtorrent.sleep'):
+            task = execute_task('test_add_torrent')
+
+        # Checked once before loading, then verification is retried 5 times before the entry is failed
+        assert mocked_client.existing.call_count == 6
+        assert not task.find_entry('accepted', title='test')
+
     def test_update(self, mocked_client, execute_task):
         mocked_client = mocked_client()
         mocked_client.version = [0, 9, 4]
@@ -0,0 +1,80 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+from flexget.plugins.clients.transmission import PluginTransmissionInput
+
+
+class Torrent(object):
+    def __init__(self, torrent_id, name, **fields):
+        self.id = torrent_id
+        self.hashString = 'hash%s' % torrent_id
+        self.name = name
+        for field in PluginTransmissionInput.probe_fields + PluginTransmissionInput.detail_fields:
+            setattr(self, field, fields.get(field, getattr(self, field, None)))
+
+    def copy(self, fields):
+        """The torrent as returned by transmissionrpc when asking for `fields`"""
+        return Torrent(self.id, self.name, **dict((field, getattr(self, field)) for field in fields
+                                                  if field not in ('id', 'name')))
+
+
+class Client(object):
+    def __init__(self, *torrents):
+        self.torrents = list(torrents)
+        self.detail_requests = []
+
+    def get_torrents(self, ids=None, arguments=None):
+        if set(PluginTransmissionInput.detail_fields).issubset(arguments):
+            self.detail_requests.append(sorted(ids) if ids else None)
+        return [torrent.copy(arguments) for torrent in self.torrents if ids is None or torrent.id in ids]
+
+
+class TestTransmissionIncremental(object):
+    config = {'host': 'localhost', 'port': 9091, 'incremental': True}
+
+    def get_torrents(self, plugin, client, config=None):
+        plugin.client = client
+        config = plugin.prepare_config(dict(self.config if config is None else config))
+        return sorted((torrent.id, torrent.name, torrent.percentDone, torrent.files)
+                      for torrent in plugin.get_torrents(config))
+
+    def test_first_run_fetches_all(self):
+        client = Client(Torrent(1, 'a', files=['a.mkv']), Torrent(2, 'b', files=['b.mkv']))
+        assert self.get_torrents(PluginTransmissionInput(), client) == [
+            (1, 'a', None, ['a.mkv']), (2, 'b', None, ['b.mkv'])]
+        assert client.detail_requests == [[1, 2]]
+
+    def test_unchanged_from_snapshot(self):
+        plugin = PluginTransmissionInput()
+        client = Client(Torrent(1, 'a', files=['a.mkv']), Torrent(2, 'b', files=['b.mkv']))
+        first = self.get_torrents(plugin, client)
+        client.detail_requests = []
+        assert self.get_torrents(plugin, client) == first
+        assert client.detail_requests == []
+
+    def test_changed_fields(self):
+        plugin = PluginTransmissionInput()
+        client = Client(Torrent(1, 'a', files=['a.mkv']), Torrent(2, 'b', files=['b.mkv']))
+        self.get_torrents(plugin, client)
+        client.detail_requests = []
+        client.torrents[1].percentDone = 1.0
+        client.torrents[1].files = ['b.mkv', 'b.nfo']
+        # Only the changed torrent gets its details again, the other one is merged from the snapshot
+        assert self.get_torrents(plugin, client) == [(1, 'a', None, ['a.mkv']), (2, 'b', 1.0, ['b.mkv', 'b.nfo'])]
+        assert client.detail_requests == [[2]]
+
+    def test_removed(self):
+        plugin = PluginTransmissionInput()
+        client = Client(Torrent(1, 'a'), Torrent(2, 'b'))
+        self.get_torrents(plugin, client)
+        del client.torrents[0]
+        assert self.get_torrents(plugin, client) == [(2, 'b', None, None)]
+        assert list(plugin.snapshots[('localhost', 9091)]) == ['hash2']
+
+    def test_not_incremental_by_default(self):
+        plugin = PluginTransmissionInput()
+        client = Client(Torrent(1, 'a'))
+        self.get_torrents(plugin, client, {'host': 'localhost', 'port': 9091})
+        self.get_torrents(plugin, client, {'host': 'localhost', 'port': 9091})
+        assert client.detail_requests == [None, None]
+        assert not plugin.snapshots
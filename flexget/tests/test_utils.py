@@ -7,7 +7,8 @@ import math
 import pytest
 
 from flexget.utils import json
-from flexget.utils.tools import parse_filesize, split_title_year
+from flexget.entry import Entry
+from flexget.utils.tools import parse_filesize, split_title_year, group_entries
 
 
 def compare_floats(float1, float2):
@@ -98,3 +99,25 @@ class TestSplitYearTitle(object):
     ])
     def test_split_year_title(self, title, expected_title, expected_year):
         assert split_title_year(title) == (expected_title, expected_year)
+
+
+class TestGroupEntries(object):
+    config = 'tasks: {}'
+
+    def test_group_by_identifier(self, manager):
+        entries = [Entry(title='a', id='S01E01'), Entry(title='b', id='s01e01 '), Entry(title='c'),
+                   Entry(title='d', id='S01E02')]
+        grouped = group_entries(entries, '{{ id }}')
+        assert [e['title'] for e in grouped['s01e01']] == ['a', 'b']
+        assert [e['title'] for e in grouped['s01e02']] == ['d']
+        assert len(grouped) == 2
+        # Templates doing more than outputting a field are rendered
+        assert list(group_entries(entries, '{{ id|upper }}-{{ title }}')) == ['s01e01-a', 's01e01 -b', 's01e02-d']
+
+    def test_group_by_field(self):
+        entries = [Entry(title='a', tags=['x']), Entry(title='b', tags=['x']), Entry(title='c', tags=None),
+                   Entry(title='d', tags=['X'])]
+        grouped = group_entries(entries, field='tags')
+        assert [e['title'] for e in grouped[('x',)]] == ['a', 'b']
+        assert [e['title'] for e in grouped[('X',)]] == ['d']
+        assert len(grouped) == 2
@@ -0,0 +1,151 @@
+"""Sharing of metainfo lookups between all the entries of a task which refer to the same show or movie."""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import sys
+import threading
+
+from future.utils import raise_with_traceback
+from sqlalchemy.exc import IntegrityError
+
+from flexget.manager import Session
+from flexget.utils.parallel import parallel_map
+
+log = logging.getLogger('bulk_lookup')
+
+
+def _shared_database():
+    """False if each database connection sees a separate database, so worker threads cannot use the cache."""
+    engine = Session.kw.get('bind')
+    if engine is None:
+        return True
+    url = engine.url
+    return not (url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:'))
+
+
+class BulkLookup(object):
+    """
+    Resolves a lookup for all registered entries at once, doing the work only once per distinct key.
+
+    Entries are registered with :meth:`add`, usually during the metainfo phase. The first time :meth:`populate` is
+    called (from a lazy lookup function), the distinct keys of all registered entries which have not been rejected or
+    failed are resolved: all of them are first tried from the cache in a single database session, and the cache misses
+    (or expired cache items) are then looked up on a pool of threads. The resulting field values are shared by all
+    entries with the same key.
+
+    Lookups which fail to store their item because a concurrent lookup for another key stored the same item first are
+    read again, from the cache when possible.
+
+    Unexpected errors of a lookup are only raised when populating an entry which needs that lookup, so one broken
+    lookup does not affect the other entries.
+
+    :param name: Name used in log messages
+    :param key_func: Function taking an entry, returns a hashable key identifying what to look up, or None
+    :param lookup_func: Function taking `key`, `session` and `only_cached` keyword arguments, returning the looked up
+        item or raising LookupError. Items which have an `expired` attribute set are not used from the cache phase.
+    :param dict field_map: Entry field map which is filled from the looked up item, see `Entry.update_using_map`
+    :param int workers: Amount of concurrent online lookups
+    """
+
+    def __init__(self, name, key_func, lookup_func, field_map, workers=4):
+        self.name = name
+        self.key_func = key_func
+        self.lookup_func = lookup_func
+        self.field_map = field_map
+        self.workers = workers
+        self.entries = []
+        # Maps key -> dict of entry fields, None if nothing was found, or exc_info of an unexpected error
+        self.results = {}
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        self.entries.append(entry)
+
+    def _fields(self, item):
+        # Imported here to avoid a circular import
+        from flexget.entry import Entry
+        fields = Entry()
+        fields.update_using_map(self.field_map, item)
+        return dict(fields)
+
+    def _lookup(self, key, session, only_cached):
+        """Returns (found, result) where result is the entry fields, or exc_info if an unexpected error occurred."""
+        try:
+            item = self.lookup_func(key=key, session=session, only_cached=only_cached)
+            if only_cached and getattr(item, 'expired', False):
+                return False, None
+            return True, self._fields(item)
+        except LookupError as e:
+            if not only_cached:
+                log.debug('%s lookup for %s failed: %s', self.name, key, e.args[0] if e.args else e)
+            return False, None
+        except IntegrityError:
+            raise
+        except Exception:
+            return True, sys.exc_info()
+
+    def _lookup_online(self, key):
+        try:
+            with Session() as session:
+                return self._lookup(key, session, only_cached=False)[1]
+        except IntegrityError as e:
+            # Different keys can name the same item, another worker stored it first. Use the stored one.
+            log.debug('%s lookup for %s conflicted with another lookup, reading it again: %s', self.name, key, e)
+            try:
+                with Session() as session:
+                    found, result = self._lookup(key, session, only_cached=True)
+                    if not found:
+                        found, result = self._lookup(key, session, only_cached=False)
+                    return result
+            except IntegrityError:
+                return sys.exc_info()
+
+    def resolve(self, keys):
+        """Looks up all of `keys` which have not been resolved yet."""
+        with self._lock:
+            # Deduplicate keeping the order of the entries, so lookups are done in a predictable order
+            seen = set(self.results)
+            unique_keys = []
+            for key in keys:
+                if key not in seen:
+                    seen.add(key)
+                    unique_keys.append(key)
+            keys = unique_keys
+            if not keys:
+                return
+            misses = []
+            with Session() as session:
+                for key in keys:
+                    found, result = self._lookup(key, session, only_cached=True)
+                    if found:
+                        self.results[key] = result
+                    else:
+                        misses.append(key)
+            log.debug('%s: %s of %s distinct lookups resolved from cache', self.name, len(keys) - len(misses),
+                      len(keys))
+            # In memory sqlite databases are private to each connection, worker threads would not see the cache
+            workers = self.workers if _shared_database() else 1
+            for key, result in zip(misses, parallel_map(self._lookup_online, misses, workers=workers,
+                                                        name=self.name)):
+                self.results[key] = result
+
+    def populate(self, entry):
+        """
+        Fills `entry` with the fields from the lookup shared by all entries with the same key.
+
+        :return: True if the lookup succeeded and entry fields were set
+        """
+        key = self.key_func(entry)
+        if key is None:
+            return False
+        if key not in self.results:
+            keys = [self.key_func(e) for e in self.entries if not (e.rejected or e.failed)]
+            self.resolve([k for k in keys if k is not None] + [key])
+        result = self.results.get(key)
+        if isinstance(result, tuple):
+            raise_with_traceback(result[1], result[2])
+        if result is None:
+            return False
+        entry.update(result)
+        return True
@@ -1,13 +1,219 @@
 from __future__ import unicode_literals, division, absolute_import
 from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
 
+import errno
 import hashlib
 import io
 import os
+import sqlite3
+import threading
+import time
 
 import requests
+from flexget.event import event
 from flexget.utils.tools import log
 
+MANIFEST_NAME = 'manifest.sqlite'
+# When the cache grows over its maximum size, least recently used files are removed until it is below this fraction
+LOW_WATER_MARK = 0.8
+
+
+def _remove_file(path):
+    """Removes `path`, which may already have been removed (e.g. by another process using the cache directory)."""
+    try:
+        os.remove(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+class ResourceCache(object):
+    """
+    Directory of cached remote resources, kept below a maximum size by removing the least recently used ones.
+
+    Names, sizes, mime types and access times of the files are kept in an indexed sqlite manifest inside the directory,
+    so the total size is known without scanning the directory and eviction does not need to stat the files. Access
+    times of cache hits are kept in memory, and written to the manifest before evicting or with :meth:`flush`.
+    Concurrent requests for the same url are coalesced into a single fetch.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.size = 0
+        self._lock = threading.Lock()
+        # Maps file name -> (threading.Event, list holding the exception of a failed fetch)
+        self._fetching = {}
+        # Maps file name -> access time not yet written to the manifest
+        self._accessed = {}
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self._db = sqlite3.connect(os.path.join(directory, MANIFEST_NAME), check_same_thread=False)
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS resources (name TEXT PRIMARY KEY, url TEXT, size INTEGER, '
+                             'mime_type TEXT, accessed REAL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS ix_resources_accessed ON resources (accessed)')
+        self._sync()
+
+    def _sync(self):
+        """Adds files which are not in the manifest (e.g. cached before it existed), and drops missing ones."""
+        known = dict(self._db.execute('SELECT name, size FROM resources'))
+        names = set()
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp'):
+                # Left over from an interrupted write
+                _remove_file(self.path(name))
+            elif not name.startswith(MANIFEST_NAME):
+                names.add(name)
+        with self._db:
+            for name in names.difference(known):
+                stat = os.stat(os.path.join(self.directory, name))
+                self._db.execute('INSERT INTO resources (name, size, accessed) VALUES (?, ?, ?)',
+                                 (name, stat.st_size, stat.st_atime))
+            missing = set(known).difference(names)
+            self._db.executemany('DELETE FROM resources WHERE name = ?', [(name,) for name in missing])
+        self.size = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM resources').fetchone()[0]
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def get(self, name):
+        """:return: Mime type of the cached file `name`, or False if it is not cached"""
+        with self._lock:
+            row = self._db.execute('SELECT mime_type FROM resources WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                return False
+            if not os.path.exists(self.path(name)):
+                self._remove(name)
+                return False
+            self._accessed[name] = time.time()
+            return row[0]
+
+    def _flush(self):
+        if not self._accessed:
+            return
+        with self._db:
+            self._db.executemany('UPDATE resources SET accessed = ? WHERE name = ?',
+                                 [(accessed, name) for name, accessed in self._accessed.items()])
+        self._accessed.clear()
+
+    def flush(self):
+        """Writes the access times of the cache hits to the manifest."""
+        with self._lock:
+            self._flush()
+
+    def add(self, name, url, content, mime_type, max_size=None):
+        """
+        Stores `content` as file `name`. If `max_size` (in bytes) is given, least recently used files are removed
+        when the cache grows above it.
+        """
+        temp_path = self.path('%s.%s.tmp' % (name, threading.current_thread().ident))
+        with io.open(temp_path, 'wb') as f:
+            f.write(content)
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM resources WHERE name = ?', (name,)).fetchone()
+            if previous:
+                _remove_file(self.path(name))
+                self.size -= previous[0]
+            os.rename(temp_path, self.path(name))
+            self._accessed.pop(name, None)
+            self._flush()
+            with self._db:
+                self._db.execute('INSERT OR REPLACE INTO resources (name, url, size, mime_type, accessed) '
+                                 'VALUES (?, ?, ?, ?, ?)', (name, url, len(content), mime_type, time.time()))
+            self.size += len(content)
+            if max_size is not None and self.size > max_size:
+                self._evict(int(max_size * LOW_WATER_MARK), keep=name)
+
+    def _remove(self, name):
+        self._accessed.pop(name, None)
+        row = self._db.execute('SELECT size FROM resources WHERE name = ?', (name,)).fetchone()
+        if row:
+            with self._db:
+                self._db.execute('DELETE FROM resources WHERE name = ?', (name,))
+            self.size -= row[0]
+        try:
+            os.remove(self.path(name))
+        except OSError:
+            pass
+
+    def _evict(self, target_size, keep=None):
+        """Removes least recently used files until the cache is not larger than `target_size` bytes."""
+        log.debug('cache directory %s is %s bytes, trimming to %s', self.directory, self.size, target_size)
+        self._flush()
+        evicted = []
+        cursor = self._db.execute('SELECT name, size FROM resources ORDER BY accessed')
+        for name, size in cursor:
+            if self.size <= target_size:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(self.path(name))
+            except OSError:
+                pass
+            evicted.append((name,))
+            self.size -= size
+        cursor.close()
+        with self._db:
+            self._db.executemany('DELETE FROM resources WHERE name = ?', evicted)
+        log.debug('removed %s least recently used files', len(evicted))
+
+    def fetch(self, url, name, force=False, max_size=None):
+        """
+        Returns the mime type of the resource at `url`, downloading it into file `name` unless it is already cached.
+        Threads asking for the same resource while it is downloaded wait for that download instead of starting one.
+        """
+        while True:
+            if not force:
+                mime_type = self.get(name)
+                if mime_type is not False:
+                    return mime_type
+            with self._lock:
+                waiting = self._fetching.get(name)
+                if waiting is None:
+                    waiting = self._fetching[name] = (threading.Event(), [])
+                    break
+            waiting[0].wait()
+            if waiting[1]:
+                raise waiting[1][0]
+            # The resource was just fetched (forced or not), use it
+            force = False
+
+        try:
+            log.debug('caching %s', url)
+            response = requests.get(url)
+            response.raise_for_status()
+            mime_type = response.headers.get('content-type')
+            self.add(name, url, response.content, mime_type, max_size)
+            return mime_type
+        except Exception as e:
+            waiting[1].append(e)
+            raise
+        finally:
+            with self._lock:
+                del self._fetching[name]
+            waiting[0].set()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(directory):
+    """:return: The :class:`ResourceCache` for `directory`, shared by all threads"""
+    directory = os.path.abspath(directory)
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = ResourceCache(directory)
+        return _caches[directory]
+
+
+@event('manager.shutdown')
+def flush_caches(manager):
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.flush()
+
 
 def cached_resource(url, base_dir, force=False, max_size=250, directory='cached_resources'):
     """
@@ -20,31 +226,10 @@ def cached_resource(url, base_dir, force=False, max_size=250, directory='cached_
     :param directory: Name of directory to use. Default is `cached_resources`
     :return: Tuple of file path and mime type
     """
-    mime_type = None
     hashed_name = hashlib.md5(url.encode('utf-8')).hexdigest()
-    file_path = os.path.join(base_dir, directory, hashed_name)
-    directory = os.path.dirname(file_path)
-
-    if not os.path.exists(file_path) or force:
-        log.debug('caching %s', url)
-        response = requests.get(url)
-        response.raise_for_status()
-        mime_type = response.headers.get('content-type')
-        content = response.content
-        if not os.path.exists(directory):
-            os.makedirs(directory)
-
-        # Checks directory size and trims if necessary.
-        size = dir_size(directory) / (1024 * 1024.0)
-        if not force:
-            while size >= max_size:
-                log.debug('directory %s size is over the allowed limit of %s, trimming', size, max_size)
-                trim_dir(directory)
-                size = dir_size(directory) / (1024 * 1024.0)
-
-        with io.open(file_path, 'wb') as file:
-            file.write(content)
-    return file_path, mime_type
+    cache = get_cache(os.path.join(base_dir, directory))
+    mime_type = cache.fetch(url, hashed_name, force=force, max_size=None if force else max_size * 1024 * 1024)
+    return cache.path(hashed_name), mime_type
 
 
 def dir_size(directory):
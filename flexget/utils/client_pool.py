@@ -0,0 +1,191 @@
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import functools
+import logging
+import threading
+import time
+
+from flexget.event import event
+
+log = logging.getLogger('client_pool')
+
+# Clients not used for this many seconds are reconnected the next time they are asked for
+MAX_IDLE = 300
+
+
+class CallStats(object):
+    """Amount and duration of the remote calls made through :class:`TimedClient` instances, by client name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name, method, seconds):
+        with self._lock:
+            calls = self._stats.setdefault(name, {})
+            count, total = calls.get(method, (0, 0.0))
+            calls[method] = (count + 1, total + seconds)
+
+    def stats(self):
+        """:return: Dict mapping client name -> method name -> (amount of calls, total seconds)"""
+        with self._lock:
+            return dict((name, dict(calls)) for name, calls in self._stats.items())
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+
+call_stats = CallStats()
+
+
+class TimedClient(object):
+    """
+    Proxy to a client object which records the time spent in each of its method calls.
+
+    :param on_error: Optional function called with the exception raised by a method call
+    """
+
+    def __init__(self, client, name, on_error=None):
+        self.client = client
+        self.name = name
+        self.on_error = on_error
+
+    def __getattr__(self, attr):
+        value = getattr(self.client, attr)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        def timed(*args, **kwargs):
+            start = time.time()
+            try:
+                return value(*args, **kwargs)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                raise
+            finally:
+                call_stats.record(self.name, attr, time.time() - start)
+
+        return timed
+
+
+class ConnectionPool(object):
+    """
+    Idle connections to one server, reused by all the workers transferring from it.
+
+    :param connect: Function creating a new connection
+    :param check_alive: Function taking an idle connection, returning False if it can't be used anymore
+    :param close: Function closing a connection, errors it raises are ignored
+    """
+
+    def __init__(self, connect, check_alive, close):
+        self.connect = connect
+        self.check_alive = check_alive
+        self._close = close
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        """:return: An idle connection which is still alive, or a new one"""
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self.connect()
+            if self.check_alive(connection):
+                return connection
+            self.discard(connection)
+
+    def put(self, connection):
+        """Returns a connection which is in a usable state to the pool."""
+        with self._lock:
+            self._idle.append(connection)
+
+    def discard(self, connection):
+        """Closes a connection instead of returning it to the pool, e.g. after an error left it in an unknown state."""
+        try:
+            self._close(connection)
+        except Exception as e:
+            log.debug('error closing connection: %s', e)
+
+    def close(self):
+        """Closes all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self.discard(connection)
+
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_client(name, key, connect, is_broken=None):
+    """
+    Returns a connection to a download client, shared by all tasks until the execution completes, so tasks using the
+    same client do not each log in and fetch the session again.
+
+    :param name: Name of the client, used in the call stats
+    :param key: Hashable connection parameters, tasks with the same ones share the connection
+    :param connect: Function creating a new client object
+    :param is_broken: Optional function taking an exception raised by a call of the client, returning True when the
+        connection can't be used anymore (e.g. the client restarted or the login expired). The connection is then
+        discarded, and the next task connects again.
+    :return: :class:`TimedClient` wrapping the client
+    """
+    with _lock:
+        client, last_used = _clients.get((name, key), (None, 0))
+        now = time.time()
+        if client is None or now - last_used > MAX_IDLE:
+            log.debug('connecting to %s', name)
+            client = TimedClient(connect(), name)
+            if is_broken:
+                client.on_error = functools.partial(_discard_if_broken, name, key, client, is_broken)
+        else:
+            log.debug('reusing connection to %s', name)
+        _clients[(name, key)] = (client, now)
+        return client
+
+
+def discard_client(name, key, client=None):
+    """
+    Forgets a shared connection, e.g. after it failed, so that the next task connects again.
+
+    :param client: Only forget the connection if it is still this :class:`TimedClient`, not a newer one
+    """
+    with _lock:
+        shared = _clients.get((name, key))
+        if shared and (client is None or shared[0] is client):
+            log.debug('discarding connection to %s', name)
+            del _clients[(name, key)]
+
+
+def _discard_if_broken(name, key, client, is_broken, error):
+    if is_broken(error):
+        discard_client(name, key, client)
+
+
+@event('manager.execute.completed')
+def release_clients(manager, options):
+    with _lock:
+        _clients.clear()
+    stats = call_stats.stats()
+    if not stats:
+        return
+    level = log.verbose if manager.options.profile else log.debug
+    for name, calls in sorted(stats.items()):
+        count = sum(c for c, _ in calls.values())
+        total = sum(t for _, t in calls.values())
+        level('%s: %s remote calls in %.2f seconds', name, count, total)
+        for method, (method_count, method_total) in sorted(calls.items()):
+            log.debug('%s.%s: %s calls in %.2f seconds', name, method, method_count, method_total)
+    call_stats.reset()
+
+
+@event('manager.shutdown')
+def shutdown(manager):
+    with _lock:
+        _clients.clear()
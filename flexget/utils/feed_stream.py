@@ -0,0 +1,174 @@
+"""
+Incremental RSS/Atom parsing.
+
+Items are produced one at a time while the document is being read, in the same shape feedparser gives its entries,
+so that code consuming ``feedparser.parse(...).entries`` can consume these too. Memory use does not depend on the
+size of the feed, and reading stops as soon as the consumer stops iterating.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+from xml.etree import ElementTree
+
+import feedparser
+
+log = logging.getLogger('utils.feed_stream')
+
+ParseError = ElementTree.ParseError
+
+# Canonical prefixes feedparser uses for well known namespaces, so that field names match those of feedparser
+KNOWN_NAMESPACES = getattr(getattr(feedparser, '_FeedParserMixin', None), 'namespaces', {'': ''})
+
+ITEM_TAGS = ('item', 'entry')
+
+
+def _split_tag(tag):
+    """Splits an ElementTree tag into (namespace uri, local name)."""
+    if tag.startswith('{'):
+        uri, local = tag[1:].split('}', 1)
+        return uri, local
+    return '', tag
+
+
+def _text(elem):
+    return (elem.text or '').strip()
+
+
+def _parse_date(value):
+    try:
+        return feedparser._parse_date(value)
+    except Exception:
+        return None
+
+
+class _ItemBuilder(object):
+    """Builds a feedparser style entry out of the child elements of an RSS `item` or Atom `entry`."""
+
+    def __init__(self, prefixes):
+        self.prefixes = prefixes
+        self.item = feedparser.FeedParserDict(links=[])
+        self.guid_is_link = False
+
+    def field_name(self, tag):
+        uri, local = _split_tag(tag)
+        prefix = KNOWN_NAMESPACES.get(uri, self.prefixes.get(uri, ''))
+        if prefix:
+            return ('%s_%s' % (prefix, local)).lower()
+        return local.lower()
+
+    def add_link(self, rel, href, length=None, type=None):
+        link = feedparser.FeedParserDict(rel=rel, href=href)
+        if length is not None:
+            link['length'] = length
+        if type is not None:
+            link['type'] = type
+        self.item['links'].append(link)
+
+    def add(self, elem):
+        item = self.item
+        name = self.field_name(elem.tag)
+        text = _text(elem)
+        if name == 'link':
+            href = elem.get('href')
+            if href is None:
+                # RSS style link
+                if text:
+                    item.setdefault('link', text)
+                    self.add_link('alternate', text, type='text/html')
+                return
+            rel = elem.get('rel', 'alternate')
+            self.add_link(rel, href, elem.get('length'), elem.get('type'))
+            if rel == 'alternate':
+                item.setdefault('link', href)
+        elif name == 'enclosure':
+            if elem.get('url') is not None:
+                self.add_link('enclosure', elem.get('url'), elem.get('length'), elem.get('type'))
+        elif name in ('guid', 'id'):
+            item['id'] = text
+            # Like feedparser, RSS guids are permalinks unless stated otherwise
+            self.guid_is_link = name == 'guid' and elem.get('isPermaLink', 'true').lower() == 'true'
+        elif name in ('description', 'summary'):
+            item['summary'] = text
+        elif name in ('content_encoded', 'content'):
+            item.setdefault('content', []).append(feedparser.FeedParserDict(value=text))
+        elif name in ('pubdate', 'published', 'dc_date', 'issued'):
+            item['published'] = text
+            item['published_parsed'] = _parse_date(text)
+        elif name in ('updated', 'modified'):
+            item['updated'] = text
+            item['updated_parsed'] = _parse_date(text)
+        elif name in ('author', 'dc_creator'):
+            # Atom authors are a construct with a name child
+            author_name = next((child for child in elem if _split_tag(child.tag)[1] == 'name'), None)
+            item['author'] = _text(author_name) if author_name is not None else text
+        else:
+            item[name] = text
+
+    def finish(self):
+        if self.guid_is_link and self.item.get('id'):
+            self.item.setdefault('link', self.item['id'])
+        return self.item
+
+
+class _ChunkReader(object):
+    """Minimal file-like object reading from an iterable of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            try:
+                self.buffer += next(self.chunks)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def iter_file_chunks(f, chunk_size=64 * 1024):
+    """Yields chunks of bytes from file-like object `f` until it is exhausted."""
+    return iter(lambda: f.read(chunk_size), b'')
+
+
+def iter_feed_items(chunks):
+    """
+    Parses RSS or Atom, yielding feedparser style entries as soon as each one is complete.
+
+    Each finished item is removed from the document tree, so only the item currently being parsed is kept in memory.
+
+    :param chunks: Iterable of byte strings, e.g. `response.iter_content(...)` or :func:`iter_file_chunks`
+    :raises ParseError: If the content is not well formed xml
+    """
+    source = _ChunkReader(chunks)
+    prefixes = {}
+    stack = []
+    builder = None
+    item_depth = None
+    for event, elem in ElementTree.iterparse(source, events=('start-ns', 'start', 'end')):
+        if event == 'start-ns':
+            prefix, uri = elem
+            prefixes.setdefault(uri, prefix)
+        elif event == 'start':
+            if builder is None and _split_tag(elem.tag)[1] in ITEM_TAGS:
+                builder = _ItemBuilder(prefixes)
+                item_depth = len(stack)
+            stack.append(elem)
+        else:
+            stack.pop()
+            if builder is None:
+                continue
+            if len(stack) == item_depth + 1:
+                # A direct child of the item is complete
+                builder.add(elem)
+            elif len(stack) == item_depth:
+                yield builder.finish()
+                builder = None
+                # Drop the finished item from the tree so the document does not grow while parsing
+                if stack:
+                    stack[-1].remove(elem)
+                elem.clear()
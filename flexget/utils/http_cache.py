@@ -0,0 +1,517 @@
+"""
+Private on-disk cache of http responses, used by :class:`flexget.utils.requests.Session`.
+
+Freshness follows RFC 7234: responses are reused while fresh according to their Cache-Control max-age, Expires or a
+heuristic based on Last-Modified, and stale responses with an ETag or Last-Modified validator are revalidated with a
+conditional request. Bodies are stored zlib compressed, the cache directory is kept below a size limit by evicting the
+least recently used responses.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+from future.moves.urllib.parse import urlparse
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from email.utils import parsedate_tz, mktime_tz
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.response import is_fp_closed
+
+log = logging.getLogger('http_cache')
+
+# Status codes which are cacheable by default (RFC 7231 section 6.1)
+CACHEABLE_STATUS = (200, 203, 300, 301, 308, 404, 410)
+# Responses of these methods invalidate the cached response for their url (RFC 7234 section 4.4)
+INVALIDATING_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+# Content types which are cached when the response does not state its size, other bodies of unknown size could be
+# large downloads which should not be read into memory
+TEXT_TYPES = ('text/', 'json', 'xml', 'javascript')
+# Fraction of the time since Last-Modified used as heuristic freshness lifetime, and its upper limit
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX = 24 * 60 * 60
+# Requests carrying credentials get responses meant for that user only, and are never stored or answered from the cache
+CREDENTIAL_HEADERS = ('Authorization', 'Cookie')
+# Stored headers which no longer apply, as bodies are stored decoded
+DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive')
+
+
+def parse_cache_control(value):
+    """
+    :param value: Value of a Cache-Control header, or None
+    :return: Dict mapping lower case directive names to their value, or None if they have no value
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _seconds(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_http_date(value):
+    """:return: Timestamp of an http date header, or None"""
+    parsed = parsedate_tz(value) if value else None
+    return mktime_tz(parsed) if parsed else None
+
+
+def _header_pairs(headers):
+    return [[name, value] for name, value in headers.items() if name.lower() not in DROPPED_HEADERS]
+
+
+class CacheStore(object):
+    """
+    Size bounded directory of compressed response bodies, evicting the least recently used ones first.
+
+    Each item is one file holding a line of json metadata followed by the zlib compressed body. The recency order is
+    kept in memory and persisted through file modification times, which are bumped on every hit.
+    """
+
+    def __init__(self, directory, max_size):
+        """
+        :param directory: Directory to store the responses in, created if it does not exist
+        :param int max_size: Maximum total size of the stored files, in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.size = 0
+        self.evictions = 0
+        self._index = OrderedDict()
+        self._lock = threading.Lock()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._load_index()
+
+    def _load_index(self):
+        items = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp'):
+                # Left over from an interrupted write
+                os.remove(path)
+                continue
+            stat = os.stat(path)
+            items.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(items):
+            self._index[name] = size
+            self.size += size
+        self._evict()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _evict(self):
+        while self.size > self.max_size and self._index:
+            name, size = self._index.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, name):
+        """:return: Tuple of metadata dict and body bytes, or None if `name` is not stored"""
+        with self._lock:
+            if name not in self._index:
+                return None
+            self._index[name] = self._index.pop(name)
+        try:
+            with io.open(self._path(name), 'rb') as f:
+                meta = json.loads(f.readline().decode('utf-8'))
+                body = zlib.decompress(f.read())
+            os.utime(self._path(name), None)
+        except (IOError, OSError, ValueError, zlib.error) as e:
+            log.debug('Dropping unreadable cache item %s: %s', name, e)
+            self.delete(name)
+            return None
+        return meta, body
+
+    def set(self, name, meta, body):
+        data = json.dumps(meta).encode('utf-8') + b'\n' + zlib.compress(body)
+        if len(data) > self.max_size:
+            return
+        temp_path = self._path('%s.%s.tmp' % (name, threading.current_thread().ident))
+        with io.open(temp_path, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            if name in self._index:
+                self.size -= self._index.pop(name)
+                os.remove(self._path(name))
+            os.rename(temp_path, self._path(name))
+            self._index[name] = len(data)
+            self.size += len(data)
+            self._evict()
+
+    def delete(self, name):
+        with self._lock:
+            if name not in self._index:
+                return
+            self.size -= self._index.pop(name)
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            for name in self._index:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+            self._index.clear()
+            self.size = 0
+
+
+def _has_credentials(request):
+    return any(name in request.headers for name in CREDENTIAL_HEADERS)
+
+
+class HTTPCache(object):
+    """
+    Decides which responses can be stored and reused, and keeps hit rate statistics. Responses are keyed on their url,
+    requests with an Authorization or Cookie header are not cached.
+
+    :param directory: Directory to store the responses in
+    :param int max_size: Maximum size of the cache directory, in bytes
+    :param dict domains: Maps domains to a freshness lifetime in seconds, which overrides the one given by responses
+        from that domain (or its subdomains)
+    :param int max_item_size: Responses with a larger body are not stored, defaults to a tenth of `max_size`
+    """
+
+    def __init__(self, directory, max_size=100 * 1024 * 1024, domains=None, max_item_size=None):
+        self.store = CacheStore(directory, max_size)
+        self.domains = domains or {}
+        self.max_item_size = max_item_size or max_size // 10
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url, method='GET'):
+        return hashlib.sha1(('%s %s' % (method.upper(), url)).encode('utf-8')).hexdigest()
+
+    def record(self, counter):
+        """Increments one of the `hits`, `misses`, `revalidated` or `stored` counters."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def domain_ttl(self, url):
+        """:return: Freshness lifetime configured for the domain of `url`, or None"""
+        host = (urlparse(url).hostname or '').lower()
+        for domain, ttl in self.domains.items():
+            domain = domain.lower()
+            if host == domain or host.endswith('.' + domain):
+                return ttl
+        return None
+
+    def freshness_lifetime(self, url, headers):
+        """:return: Seconds a response with `headers` stays fresh after it was received"""
+        ttl = self.domain_ttl(url)
+        if ttl is not None:
+            return ttl
+        cache_control = parse_cache_control(headers.get('cache-control'))
+        if 'max-age' in cache_control:
+            return _seconds(cache_control['max-age']) or 0
+        date = parse_http_date(headers.get('date'))
+        expires = headers.get('expires')
+        if expires is not None:
+            expires = parse_http_date(expires)
+            # Invalid dates (e.g. "0") mean already expired
+            return max(0, expires - (date or time.time())) if expires else 0
+        last_modified = parse_http_date(headers.get('last-modified'))
+        if last_modified and 'no-cache' not in cache_control:
+            return min(HEURISTIC_MAX, max(0, (date or time.time()) - last_modified) * HEURISTIC_FRACTION)
+        return 0
+
+    def _age(self, meta):
+        return (_seconds(meta['age']) or 0) + max(0, time.time() - meta['response_time'])
+
+    def is_fresh(self, meta, request_headers):
+        """True if the stored response described by `meta` can be used for a request with `request_headers`."""
+        request_cc = parse_cache_control(request_headers.get('cache-control'))
+        if 'no-cache' in request_cc or request_headers.get('pragma') == 'no-cache':
+            return False
+        headers = CaseInsensitiveDict(meta['headers'])
+        if 'no-cache' in parse_cache_control(headers.get('cache-control')) and self.domain_ttl(meta['url']) is None:
+            return False
+        lifetime = meta['lifetime']
+        if 'max-age' in request_cc:
+            lifetime = min(lifetime, _seconds(request_cc['max-age']) or 0)
+        return self._age(meta) < lifetime
+
+    def _vary_matches(self, meta, request_headers):
+        return all(request_headers.get(name) == value for name, value in meta['vary'].items())
+
+    def lookup(self, request):
+        """
+        :return: Metadata and body of the stored response matching `request`, or None. Call :meth:`is_fresh` to find
+            out whether it can be used without revalidation.
+        """
+        if request.method != 'GET' or 'no-store' in parse_cache_control(request.headers.get('cache-control')):
+            return None
+        if _has_credentials(request):
+            return None
+        cached = self.store.get(self.key(request.url))
+        if cached and not self._vary_matches(cached[0], request.headers):
+            return None
+        return cached
+
+    def cacheable(self, request, response):
+        if request.method != 'GET' or response.status_code not in CACHEABLE_STATUS:
+            return False
+        if 'no-store' in parse_cache_control(request.headers.get('cache-control')) or _has_credentials(request):
+            return False
+        cache_control = parse_cache_control(response.headers.get('cache-control'))
+        if 'no-store' in cache_control or response.headers.get('vary', '').strip() == '*':
+            return False
+        length = _seconds(response.headers.get('content-length'))
+        if length is None:
+            content_type = response.headers.get('content-type', '').lower()
+            if not any(text_type in content_type for text_type in TEXT_TYPES):
+                return False
+        elif length > self.max_item_size:
+            return False
+        # Without a freshness lifetime or a validator, a stored response could never be used
+        return bool(self.freshness_lifetime(request.url, response.headers) or response.headers.get('etag') or
+                    response.headers.get('last-modified'))
+
+    def save(self, request, response):
+        """
+        Stores `response` if it is cacheable. The body is stored once it has been read to the end by the caller, so
+        streamed responses are still streamed, and responses which are not read completely are not stored.
+        """
+        if not self.cacheable(request, response):
+            return
+        vary = {}
+        for name in response.headers.get('vary', '').split(','):
+            name = name.strip()
+            if name:
+                vary[name] = request.headers.get(name)
+        meta = {
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': _header_pairs(response.headers),
+            'vary': vary,
+            'age': _seconds(response.headers.get('age')) or 0,
+            'response_time': time.time(),
+            'lifetime': self.freshness_lifetime(request.url, response.headers),
+        }
+        encoded = response.headers.get('content-encoding', 'identity').lower() != 'identity'
+
+        def store(body):
+            self.store.set(self.key(request.url), meta, body)
+            self.record('stored')
+
+        response.raw = BodyRecorder(response.raw, self.max_item_size, encoded, store)
+
+    def refresh(self, request, meta, body, not_modified):
+        """Updates a stored response with the headers of a 304 Not Modified revalidation response."""
+        headers = CaseInsensitiveDict(meta['headers'])
+        for name, value in not_modified.headers.items():
+            if name.lower() not in DROPPED_HEADERS:
+                headers[name] = value
+        meta = dict(meta, headers=list(headers.items()), response_time=time.time(),
+                    age=_seconds(not_modified.headers.get('age')) or 0,
+                    lifetime=self.freshness_lifetime(request.url, headers))
+        self.store.set(self.key(request.url), meta, body)
+        return meta
+
+    def invalidate(self, url):
+        self.store.delete(self.key(url))
+
+    def stats(self):
+        """:return: Dict of hit/miss counts and the hit rate, the stored size and the amount of evictions"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'stored': self.stored,
+                'hit_rate': (self.hits / lookups) if lookups else 0.0,
+                'items': len(self.store),
+                'size': self.store.size,
+                'evictions': self.store.evictions,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.revalidated = self.stored = 0
+            self.store.evictions = 0
+
+    def clear(self):
+        self.store.clear()
+
+
+class BodyRecorder(object):
+    """
+    Wraps the raw stream of a response, keeping a copy of the decoded body as it is read. `on_complete` is called with
+    the body once it has been read to the end. Nothing is kept when the body is larger than `max_size`, or when an
+    `encoded` body is read without decoding it.
+    """
+
+    def __init__(self, raw, max_size, encoded, on_complete):
+        self._raw = raw
+        self._max_size = max_size
+        self._encoded = encoded
+        self._on_complete = on_complete
+        self._chunks = []
+        self._size = 0
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def _record(self, data, decode_content):
+        if self._chunks is None:
+            return
+        if decode_content is None:
+            decode_content = getattr(self._raw, 'decode_content', False)
+        self._size += len(data)
+        if (self._encoded and not decode_content) or self._size > self._max_size:
+            self._chunks = None
+            return
+        self._chunks.append(data)
+
+    def _finish(self):
+        fp = getattr(self._raw, '_fp', None)
+        if self._chunks is None or (fp is not None and not is_fp_closed(fp)):
+            return
+        body, self._chunks = b''.join(self._chunks), None
+        self._on_complete(body)
+
+    def read(self, amt=None, decode_content=None, **kwargs):
+        data = self._raw.read(amt, decode_content=decode_content, **kwargs)
+        self._record(data, decode_content)
+        if not data or amt is None:
+            self._finish()
+        return data
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        for data in self._raw.stream(amt, decode_content=decode_content):
+            self._record(data, decode_content)
+            yield data
+        self._finish()
+
+
+def rate_limit(request):
+    """Runs the domain limiters attached to a request by :class:`flexget.utils.requests.Session`, at most once."""
+    limit = getattr(request, 'rate_limit', None)
+    if limit:
+        request.rate_limit = None
+        limit()
+
+
+def build_response(request, meta, body):
+    """Builds a `requests.Response` for `request` from a stored response."""
+    response = Response()
+    response.status_code = meta['status']
+    response.reason = meta['reason']
+    response.headers = CaseInsensitiveDict(meta['headers'])
+    response.headers['Content-Length'] = str(len(body))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.raw = io.BytesIO(body)
+    response._content = body
+    response._content_consumed = True
+    response.url = request.url
+    response.request = request
+    response.from_cache = True
+    return response
+
+
+class CachingAdapter(BaseAdapter):
+    """
+    Transport adapter answering requests from an :class:`HTTPCache` where possible, and passing the others to the
+    wrapped adapter. Responses get a `from_cache` attribute, which is True if no full response was downloaded.
+
+    The domain limiters of a request are only run when it is sent, not when it is answered from the cache. Requests
+    with their own validators (If-None-Match or If-Modified-Since) always go to the server, and get its answer.
+
+    :param cache: The :class:`HTTPCache` to use, None for the `default_cache` at the time of each request
+    """
+
+    def __init__(self, adapter, cache=None):
+        super(CachingAdapter, self).__init__()
+        self.adapter = adapter
+        self._cache = cache
+
+    @property
+    def cache(self):
+        return default_cache if self._cache is None else self._cache
+
+    def _send(self, request, **kwargs):
+        rate_limit(request)
+        response = self.adapter.send(request, **kwargs)
+        response.from_cache = False
+        return response
+
+    def send(self, request, **kwargs):
+        cache = self.cache
+        if not cache:
+            return self._send(request, **kwargs)
+        if request.method in INVALIDATING_METHODS:
+            response = self._send(request, **kwargs)
+            if response.status_code < 400:
+                cache.invalidate(request.url)
+            return response
+
+        conditional = 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+        cached = None if conditional else cache.lookup(request)
+        if cached:
+            meta, body = cached
+            if cache.is_fresh(meta, request.headers):
+                cache.record('hits')
+                log.debug('Using cached response for %s', request.url)
+                return build_response(request, meta, body)
+            headers = CaseInsensitiveDict(meta['headers'])
+            if headers.get('etag'):
+                request.headers['If-None-Match'] = headers['etag']
+            if headers.get('last-modified'):
+                request.headers['If-Modified-Since'] = headers['last-modified']
+
+        response = self._send(request, **kwargs)
+        if cached and response.status_code == 304:
+            cache.record('hits')
+            cache.record('revalidated')
+            response.close()
+            log.debug('Cached response for %s is still valid', request.url)
+            return build_response(request, cache.refresh(request, cached[0], cached[1], response), cached[1])
+        if request.method == 'GET':
+            cache.record('misses')
+        cache.save(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+# The cache configured with the `http_cache` config key, used by sessions which do not specify one
+default_cache = None
+
+
+def set_default_cache(cache):
+    global default_cache
+    default_cache = cache
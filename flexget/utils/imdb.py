@@ -71,6 +71,60 @@ def make_url(imdb_id):
     return u'http://www.imdb.com/title/%s/' % imdb_id
 
 
+# Start of the title page sections ImdbParser reads details from
+SECTION_MARKERS = {
+    'overview': '<div class="title-overview"',
+    'cast': 'id="titleCast"',
+    'storyline': 'id="titleStoryLine"',
+    'details': 'id="titleDetails"',
+}
+DIV_TAG = re.compile(r'<(/?)div\b', re.IGNORECASE)
+PAGE_CHUNK_SIZE = 16 * 1024
+
+
+def _section(html, marker):
+    """:return: (start, end) of the div containing `marker`, end is None when the div is not closed in `html`"""
+    start = html.find(marker)
+    if start < 0:
+        return None, None
+    start = html.rfind('<div', 0, start)
+    depth = 0
+    for tag in DIV_TAG.finditer(html, start):
+        depth += -1 if tag.group(1) else 1
+        if not depth:
+            return start, html.find('>', tag.end()) + 1
+    return start, None
+
+
+def page_sections(html):
+    """
+    Cuts the sections ImdbParser needs out of the html of a title page, so only those need to be parsed.
+
+    :return: Dict mapping the names in :data:`SECTION_MARKERS` to the html of that section, for those found
+    """
+    sections = {}
+    for name, marker in SECTION_MARKERS.items():
+        start, end = _section(html, marker)
+        if start is not None:
+            sections[name] = html[start:end]
+    return sections
+
+
+def get_title_page(url):
+    """:return: Html of the title page at `url`, downloaded only up to the end of the last section parsed"""
+    page = requests.get(url)
+    data = b''
+    try:
+        for chunk in page.iter_content(PAGE_CHUNK_SIZE):
+            data += chunk
+            if _section(data.decode('ascii', 'ignore'), SECTION_MARKERS['details'])[1]:
+                log.trace('Stopped downloading %s after %s bytes', url, len(data))
+                break
+    finally:
+        page.close()
+    return data.decode(page.encoding or 'utf-8', 'replace')
+
+
 class ImdbSearch(object):
     def __init__(self):
         # de-prioritize aka matches a bit
@@ -267,10 +321,23 @@ class ImdbParser(object):
         self.imdb_id = extract_id(imdb_id)
         url = make_url(self.imdb_id)
         self.url = url
-        page = requests.get(url)
-        soup = get_soup(page.text)
+        self.parse_html(get_title_page(url))
+
+    def parse_html(self, html, lean=True):
+        """
+        Reads the details from the html of a title page.
+
+        :param bool lean: Only build soups of the page sections the details are in, instead of the whole page. The
+            whole page is still used when the sections can't be found.
+        """
+        sections = page_sections(html) if lean else {}
+        if 'overview' in sections:
+            soups = dict((name, get_soup(section)) for name, section in sections.items())
+        else:
+            soup = get_soup(html)
+            soups = dict.fromkeys(SECTION_MARKERS, soup)
 
-        title_overview = soup.find('div', attrs={'class': 'title-overview'})
+        title_overview = soups['overview'].find('div', attrs={'class': 'title-overview'})
         if not title_overview:
             raise PluginError('IMDB parser needs updating, imdb format changed. Please report on Github.')
 
@@ -340,7 +407,7 @@ class ImdbParser(object):
             self.writers[writer_id] = writer_name
 
         # Details section
-        title_details = soup.find('div', attrs={'id': 'titleDetails'})
+        title_details = soups.get('details') and soups['details'].find('div', attrs={'id': 'titleDetails'})
         if title_details:
             # get languages
             for link in title_details.find_all('a', href=re.compile('^/search/title\?title_type=feature'
@@ -350,7 +417,7 @@ class ImdbParser(object):
                     self.languages.append(lang.strip())
 
         # Storyline section
-        storyline = soup.find('div', attrs={'id': 'titleStoryLine'})
+        storyline = soups.get('storyline') and soups['storyline'].find('div', attrs={'id': 'titleStoryLine'})
         if storyline:
             plot_elem = storyline.find('p')
             if plot_elem:
@@ -363,7 +430,7 @@ class ImdbParser(object):
             self.genres = [i.text.strip().lower() for i in storyline.select('[itemprop="genre"] > a')]
 
         # Cast section
-        cast = soup.find('div', attrs={'id': 'titleCast'})
+        cast = soups.get('cast') and soups['cast'].find('div', attrs={'id': 'titleCast'})
         if cast:
             for actor in cast.select('[itemprop="actor"] > a'):
                 actor_id = extract_id(actor['href'])
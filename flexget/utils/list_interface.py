@@ -0,0 +1,223 @@
+"""
+Bulk operations on the objects returned by the `get_list` method of list plugins.
+
+Lists are :class:`collections.MutableSet` objects with a `get(entry)` method returning the list item matching an entry.
+A list can speed up operations on many entries at once by implementing any of these methods:
+
+`get_many(entries)`
+    Returns a list with the matching item, or None, for each of `entries`. Entries matching the same list item
+    should get the same result object.
+`add_many(entries)`
+    Adds all `entries` to the list.
+`discard_many(entries)`
+    Removes all `entries` from the list.
+
+Lists without `get_many` can instead name the fields identifying their items in an `index_keys` attribute, an entry
+matching an item when any of these fields has the same (not None) value in both. They are then matched through an
+:class:`EntryIndex` built by going through the list once, instead of calling `get` for each entry.
+
+Lists stored in the database as rows of entries get all three methods from :class:`DBEntrySetMixin`.
+"""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+from operator import itemgetter
+
+from flexget.entry import Entry
+from flexget.manager import Session
+from flexget.utils.tools import chunked
+
+log = logging.getLogger('list_interface')
+
+
+class EntryIndex(object):
+    """
+    Hash index of list items by the values of their identifying fields.
+
+    :param items: The list items
+    :param keys: Names of the identifying fields. A key can also be a tuple of field names, matching when all of
+        these fields are equal.
+    """
+
+    def __init__(self, items, keys):
+        self.keys = keys
+        self._fields = set()
+        for key in keys:
+            self._fields.update(key if isinstance(key, tuple) else [key])
+        self._fields = list(self._fields)
+        self._getters = [(key, itemgetter(*key) if isinstance(key, tuple) else itemgetter(key)) for key in keys]
+        self._index = {}
+        for position, item in enumerate(items):
+            for key, value in self._values(item):
+                self._index.setdefault((key, value), []).append((position, item))
+
+    def _values(self, entry):
+        """:return: (key, value) pairs for all keys which have a value in `entry`"""
+        # Read each field only once, entry lookups are comparatively slow
+        fields = {}
+        for field in self._fields:
+            value = entry.get(field)
+            fields[field] = tuple(value) if isinstance(value, list) else value
+        values = []
+        for key, getter in self._getters:
+            value = getter(fields)
+            if value is None or type(value) is tuple and None in value:
+                continue
+            values.append((key, value))
+        return values
+
+    def find(self, entry, match=None):
+        """
+        :param match: Optional function called with `entry` and an item sharing a key with it, returning whether they
+            really match
+        :return: The first item, in list order, matching `entry` by any of the keys, or None
+        """
+        found = None
+        for key, value in self._values(entry):
+            for position, item in self._index.get((key, value), []):
+                if found is not None and position >= found[0]:
+                    break
+                if match is None or match(entry, item):
+                    found = (position, item)
+                    break
+        return found[1] if found else None
+
+
+def get_many(thelist, entries):
+    """
+    :return: List with the item of `thelist` matching each of `entries`, None for the entries not in the list
+    """
+    entries = list(entries)
+    if not entries:
+        return []
+    if hasattr(thelist, 'get_many'):
+        return thelist.get_many(entries)
+    keys = getattr(thelist, 'index_keys', None)
+    if keys:
+        index = EntryIndex(thelist, keys)
+        return [index.find(entry) for entry in entries]
+    results = []
+    distinct = []
+    for entry in entries:
+        result = thelist.get(entry)
+        if result:
+            # `get` may return a new object for each call, return the same one for equal items
+            same = [found for found in distinct if found == result]
+            if same:
+                result = same[0]
+            else:
+                distinct.append(result)
+        results.append(result)
+    return results
+
+
+def add_many(thelist, entries):
+    """Adds all `entries` to `thelist`."""
+    entries = list(entries)
+    if not entries:
+        return
+    if hasattr(thelist, 'add_many'):
+        thelist.add_many(entries)
+    else:
+        thelist |= entries
+
+
+def discard_many(thelist, entries):
+    """Removes all `entries` from `thelist`."""
+    entries = list(entries)
+    if not entries:
+        return
+    if hasattr(thelist, 'discard_many'):
+        thelist.discard_many(entries)
+    else:
+        thelist -= entries
+
+
+class DBEntrySetMixin(object):
+    """
+    Bulk methods for lists stored in the database as rows with `id`, `title`, `original_url` and `entry` attributes,
+    an entry matching a row with the same title or the same (not empty) original url.
+
+    Classes using it set `db_entry_class` to the model of the rows, and implement `_db_list(session)` returning the
+    list, whose `entries` relationship is a dynamic query of its rows, and `_new_db_entry(entry, db_list)`.
+    """
+
+    db_entry_class = None
+
+    def _new_db_entry(self, entry, db_list):
+        raise NotImplementedError
+
+    def _get_query(self, session):
+        """:return: Query of the rows `get_many` can return"""
+        return self._db_list(session).entries
+
+    def _find_many(self, session, entries, query=None):
+        """
+        Looks up all `entries` with one query per chunk of titles and urls, instead of one query per entry.
+
+        :param query: Query of the rows to look in, all rows of the list by default
+        :return: List with the matching row, or None, for each of `entries`
+        """
+        model = self.db_entry_class
+        if query is None:
+            query = self._db_list(session).entries
+        query = query.order_by(model.id)
+        titles = list(set(entry['title'] for entry in entries))
+        urls = list(set(entry['original_url'] for entry in entries if entry.get('original_url')))
+        by_title = {}
+        by_url = {}
+        for chunk in chunked(titles):
+            for db_entry in query.filter(model.title.in_(chunk)):
+                by_title.setdefault(db_entry.title, db_entry)
+        for chunk in chunked(urls):
+            for db_entry in query.filter(model.original_url.in_(chunk)):
+                by_url.setdefault(db_entry.original_url, db_entry)
+        matches = []
+        for entry in entries:
+            found = [db_entry for db_entry in (by_title.get(entry['title']), by_url.get(entry.get('original_url')))
+                     if db_entry]
+            matches.append(min(found, key=lambda db_entry: db_entry.id) if found else None)
+        return matches
+
+    def get_many(self, entries):
+        with Session() as session:
+            matches = self._find_many(session, entries, self._get_query(session))
+            # Entries matching the same row get the same result
+            results = {}
+            for match in matches:
+                if match and match.id not in results:
+                    results[match.id] = Entry(match.entry)
+            return [results[match.id] if match else None for match in matches]
+
+    def add_many(self, entries):
+        # Make sure lazy lookups are done before opening our session to prevent db locks
+        for entry in entries:
+            entry.values()
+
+        with Session() as session:
+            db_list = self._db_list(session)
+            # Entries added by this call, in case the same entry is given twice
+            added = {}
+            for entry, stored_entry in zip(entries, self._find_many(session, entries)):
+                stored_entry = stored_entry or added.get(entry['title']) or added.get(entry.get('original_url'))
+                if stored_entry:
+                    # Refresh all the fields if we already have this entry
+                    log.debug('refreshing entry %s', entry)
+                    stored_entry.entry = entry
+                    continue
+                log.debug('adding entry %s to list %s', entry, db_list.name)
+                stored_entry = self._new_db_entry(entry, db_list)
+                session.add(stored_entry)
+                added[entry['title']] = stored_entry
+                if entry.get('original_url'):
+                    added[entry['original_url']] = stored_entry
+
+    def discard_many(self, entries):
+        with Session() as session:
+            deleted = set()
+            for db_entry in self._find_many(session, entries):
+                if db_entry and db_entry.id not in deleted:
+                    log.debug('deleting entry %s', db_entry)
+                    session.delete(db_entry)
+                    deleted.add(db_entry.id)
@@ -0,0 +1,189 @@
+"""Helpers for running blocking work (mostly network requests) on a bounded pool of threads."""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import logging
+import queue
+import sys
+import threading
+
+from future.utils import raise_with_traceback
+
+from flexget import logger
+
+log = logging.getLogger('utils.parallel')
+
+
+class KeyedSemaphore(object):
+    """
+    Hands out a separate bounded semaphore for each key, so that concurrency can be limited per key
+    (e.g. per plugin or per host) while a pool works on many keys at once.
+
+    Example::
+
+        limits = KeyedSemaphore(2, {'slow_site': 1})
+        with limits('slow_site'):
+            do_request()
+    """
+
+    def __init__(self, default_limit, limits=None):
+        """
+        :param int default_limit: Amount of concurrent holders allowed for keys not in `limits`
+        :param dict limits: Mapping of key -> amount of concurrent holders allowed for that key
+        """
+        self.default_limit = default_limit
+        self.limits = limits or {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, key):
+        with self._lock:
+            if key not in self._semaphores:
+                self._semaphores[key] = threading.BoundedSemaphore(self.limits.get(key, self.default_limit))
+            return self._semaphores[key]
+
+
+def copy_log_context():
+    """Returns a function which restores the calling thread's logging context (task name, capture stream)."""
+    context = dict(logger.local_context.__dict__)
+
+    def restore():
+        logger.local_context.__dict__.update(context)
+
+    return restore
+
+
+def parallel_map(func, items, workers=1, name='worker'):
+    """
+    Calls `func` once for every item in `items` using up to `workers` threads.
+
+    Results are returned in the same order as `items`, regardless of the order the calls finished in. If any call
+    raised an exception, the first one (in `items` order) is re-raised after all calls have finished.
+    With `workers` of 1, or a single item, everything runs in the calling thread.
+
+    :param func: Callable taking a single item
+    :param items: Iterable of items
+    :param int workers: Maximum amount of threads to use
+    :param str name: Prefix for worker thread names
+    :return: List of results
+    """
+    items = list(items)
+    workers = min(workers, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+
+    results = [None] * len(items)
+    errors = [None] * len(items)
+    jobs = queue.Queue()
+    for job in enumerate(items):
+        jobs.put(job)
+    restore_context = copy_log_context()
+
+    def work():
+        restore_context()
+        while True:
+            try:
+                index, item = jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = func(item)
+            except Exception:
+                errors[index] = sys.exc_info()
+
+    threads = [threading.Thread(target=work, name='%s-%d' % (name, i)) for i in range(workers)]
+    log.trace('Starting %d threads for %d jobs', len(threads), len(items))
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for error in errors:
+        if error:
+            raise_with_traceback(error[1], error[2])
+    return results
+
+
+# Tells a WorkQueue thread to exit
+_STOP = object()
+
+
+class WorkQueue(object):
+    """
+    Pool of threads calling `func` on items while more items are still being added, e.g. downloading files while
+    the directory tree they are in is still being listed.
+
+    With `workers` of 1, each item is handled in the calling thread as soon as it is added.
+
+    Example::
+
+        downloads = WorkQueue(download, workers=4)
+        for path in walk():
+            downloads.put(path)
+        for path, error in downloads.join():
+            log.error('%s failed: %s', path, error)
+    """
+
+    def __init__(self, func, workers=1, name='worker'):
+        self.func = func
+        self.workers = workers
+        self.name = name
+        self.errors = []
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _call(self, item):
+        try:
+            self.func(item)
+        except Exception as e:
+            log.debug('%s failed', item, exc_info=True)
+            with self._lock:
+                self.errors.append((item, e))
+
+    def _work(self, restore_context):
+        restore_context()
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            self._call(item)
+
+    def put(self, item):
+        if self.workers <= 1:
+            self._call(item)
+            return
+        if not self._threads:
+            restore_context = copy_log_context()
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, args=(restore_context,), name='%s-%d' % (self.name, i))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+        self._queue.put(item)
+
+    def join(self):
+        """
+        Waits until all items have been handled.
+
+        :return: List of (item, exception) for the items `func` raised an exception for
+        """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        return self.errors
+
+    def stop(self):
+        """
+        Discards the items not being handled yet and waits for the threads to finish the ones they are handling,
+        e.g. when adding items failed. Does nothing after :meth:`join`.
+        """
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self.join()
@@ -5,15 +5,20 @@ from future.moves.urllib.parse import urlparse
 from future.utils import text_to_native_str
 
 import time
+from functools import partial
 import logging
+import threading
 from datetime import timedelta, datetime
 
 import requests
 # Allow some request objects to be imported from here instead of requests
 import warnings
 from requests import RequestException
+from requests.adapters import HTTPAdapter
 
 from flexget import __version__ as version
+from flexget.event import event
+from flexget.utils import http_cache
 from flexget.utils.tools import parse_timedelta, TimedDict, timedelta_total_seconds
 
 # If we use just 'requests' here, we'll get the logger created by requests, rather than our own
@@ -85,7 +90,8 @@ class TokenBucketLimiter(DomainLimiter):
         self.rate = parse_timedelta(rate)
         self.wait = wait
         # Restore previous state for this domain, or establish new state cache
-        self.state = self.state_cache.setdefault(domain, {'tokens': self.max_tokens, 'last_update': datetime.now()})
+        self.state = self.state_cache.setdefault(domain, {'tokens': self.max_tokens, 'last_update': datetime.now(),
+                                                          'lock': threading.Lock()})
 
     @property
     def tokens(self):
@@ -104,6 +110,12 @@ class TokenBucketLimiter(DomainLimiter):
         self.state['last_update'] = value
 
     def __call__(self):
+        # Requests may be made from several threads at once (e.g. concurrent discover searches), the state for a domain
+        # must only be updated by one of them at a time.
+        with self.state['lock']:
+            self._take_token()
+
+    def _take_token(self):
         if self.tokens < self.max_tokens:
             regen = (timedelta_total_seconds(datetime.now() - self.last_update) /
                      timedelta_total_seconds(self.rate))
@@ -167,23 +179,215 @@ def limit_domains(url, limit_dict):
             break
 
 
+class PoolStats(object):
+    """Per host counts of requests made and connections opened by the shared connection pools."""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, requests=0, connections=0):
+        with self._lock:
+            counts = self._counts.setdefault(host, {'requests': 0, 'connections': 0})
+            counts['requests'] += requests
+            counts['connections'] += connections
+
+    def stats(self):
+        """
+        :return: Dict mapping host to its `requests`, `connections` and `reused` (requests which did not need a new
+            connection) counts.
+        """
+        with self._lock:
+            result = {}
+            for host, counts in self._counts.items():
+                result[host] = dict(counts, reused=max(0, counts['requests'] - counts['connections']))
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+
+
+pool_stats = PoolStats()
+
+
+class _CountingPoolMixin(object):
+    def _new_conn(self):
+        pool_stats.record(self.host, connections=1)
+        return super(_CountingPoolMixin, self)._new_conn()
+
+    def urlopen(self, *args, **kwargs):
+        pool_stats.record(self.host, requests=1)
+        return super(_CountingPoolMixin, self).urlopen(*args, **kwargs)
+
+
+_counting_pool_classes = {}
+
+
+def _counting_pools(pool_classes):
+    """Returns a copy of a urllib3 `pool_classes_by_scheme` mapping with the pool classes made to record stats."""
+    result = {}
+    for scheme, pool_class in pool_classes.items():
+        if issubclass(pool_class, _CountingPoolMixin):
+            result[scheme] = pool_class
+            continue
+        if pool_class not in _counting_pool_classes:
+            _counting_pool_classes[pool_class] = type(str('Counting%s' % pool_class.__name__),
+                                                      (_CountingPoolMixin, pool_class), {})
+        result[scheme] = _counting_pool_classes[pool_class]
+    return result
+
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools record their requests and new connections in `pool_stats`."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(_CountingAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pools(self.poolmanager.pool_classes_by_scheme)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super(_CountingAdapter, self).proxy_manager_for(proxy, **proxy_kwargs)
+        if not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = _counting_pools(manager.pool_classes_by_scheme)
+        return manager
+
+
+class PooledAdapter(_CountingAdapter):
+    """
+    Transport adapter meant to be shared by many sessions (and threads), so keep-alive connections to a host are reused
+    across tasks and plugins. Session state (headers, cookies, auth, domain limiters) stays in each session.
+
+    Https requests with non default TLS settings (`verify` or `cert`) are sent through separate pools, so a connection
+    set up without certificate verification is never reused by a request which asks for it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(PooledAdapter, self).__init__(*args, **kwargs)
+        self._init_args = args
+        self._init_kwargs = kwargs
+        self._isolated = {}
+        self._isolated_lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if request.url.lower().startswith('https') and (verify is not True or cert):
+            tls_key = (verify, cert if not isinstance(cert, list) else tuple(cert))
+            with self._isolated_lock:
+                adapter = self._isolated.get(tls_key)
+                if adapter is None:
+                    adapter = self._isolated[tls_key] = _CountingAdapter(*self._init_args, **self._init_kwargs)
+            return adapter.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        return super(PooledAdapter, self).send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                               proxies=proxies)
+
+    def close(self):
+        super(PooledAdapter, self).close()
+        with self._isolated_lock:
+            for adapter in self._isolated.values():
+                adapter.close()
+            self._isolated.clear()
+
+
+# Amount of hosts to keep connection pools for, and amount of idle connections kept per host
+DEFAULT_POOL_CONNECTIONS = 20
+DEFAULT_POOL_MAXSIZE = 10
+pool_settings = {'pool_connections': DEFAULT_POOL_CONNECTIONS, 'pool_maxsize': DEFAULT_POOL_MAXSIZE}
+_shared_adapters = {}
+_shared_adapters_lock = threading.Lock()
+
+
+def shared_adapter(profile='default', max_retries=1):
+    """
+    Returns the process wide :class:`PooledAdapter` for `profile`.
+
+    Sessions using the same profile (and amount of retries) share their connection pools. Use a separate profile for
+    requests which must not share connections with others.
+    """
+    key = (profile, max_retries)
+    with _shared_adapters_lock:
+        adapter = _shared_adapters.get(key)
+        if adapter is None:
+            adapter = _shared_adapters[key] = PooledAdapter(max_retries=max_retries, **pool_settings)
+        return adapter
+
+
+@event('manager.initialize')
+def reset_pools(manager=None):
+    """Closes all shared connections. Sessions still referencing the shared adapters will open new ones."""
+    with _shared_adapters_lock:
+        for adapter in _shared_adapters.values():
+            adapter.close()
+        _shared_adapters.clear()
+    pool_stats.clear()
+
+
+def configure_pools(pool_connections=None, pool_maxsize=None):
+    """
+    Sets the sizes of the shared connection pools. Existing pools are dropped if the sizes change.
+
+    :param int pool_connections: Amount of hosts to keep connection pools for
+    :param int pool_maxsize: Maximum amount of idle connections kept for each host
+    """
+    new_settings = {'pool_connections': pool_connections or DEFAULT_POOL_CONNECTIONS,
+                    'pool_maxsize': pool_maxsize or DEFAULT_POOL_MAXSIZE}
+    if new_settings != pool_settings:
+        log.debug('Connection pool settings changed to %s', new_settings)
+        pool_settings.update(new_settings)
+        reset_pools()
+
+
 class Session(requests.Session):
     """
     Subclass of requests Session class which defines some of our own defaults, records unresponsive sites,
     and raises errors by default.
 
+    Connections are kept in process wide pools shared by all sessions of the same `pool` profile, so creating a
+    session is cheap and keep-alive connections are reused across sessions. Headers, cookies and domain limiters are
+    still specific to each session.
+
+    GET responses are answered from an on-disk http cache when one is configured, see
+    :mod:`flexget.utils.http_cache`.
     """
 
-    def __init__(self, timeout=30, max_retries=1, *args, **kwargs):
-        """Set some defaults for our session if not explicitly defined."""
+    def __init__(self, timeout=30, max_retries=1, pool='default', cache=None, *args, **kwargs):
+        """
+        Set some defaults for our session if not explicitly defined.
+
+        :param pool: Name of the shared connection pool profile to use, or None for connections private to this session
+        :param cache: :class:`~flexget.utils.http_cache.HTTPCache` to use, None for the one configured with the
+            `http_cache` config key (if any), or False to not cache responses
+        """
         super(Session, self).__init__(*args, **kwargs)
         self.timeout = timeout
         self.stream = True
-        self.adapters['http://'].max_retries = max_retries
+        if pool is None:
+            self.adapters['http://'].max_retries = max_retries
+        else:
+            adapter = shared_adapter(pool, max_retries)
+            self.mount('https://', adapter)
+            self.mount('http://', adapter)
+        self._cache = cache
+        if cache is not False:
+            for prefix, adapter in list(self.adapters.items()):
+                self.mount(prefix, http_cache.CachingAdapter(adapter, cache))
         # Stores min intervals between requests for certain sites
         self.domain_limiters = {}
         self.headers.update({'User-Agent': 'FlexGet/%s (www.flexget.com)' % version})
 
+    @property
+    def cache(self):
+        """The :class:`~flexget.utils.http_cache.HTTPCache` responses are cached in, or None"""
+        if self._cache is None:
+            return http_cache.default_cache
+        return self._cache or None
+
+    def close(self):
+        """Closes the connections private to this session, the shared pools stay open for other sessions."""
+        for adapter in self.adapters.values():
+            if isinstance(adapter, http_cache.CachingAdapter):
+                adapter = adapter.adapter
+            if not isinstance(adapter, PooledAdapter):
+                adapter.close()
+
     def add_cookiejar(self, cookiejar):
         """
         Merges cookies from `cookiejar` into cookiejar for this session.
@@ -212,6 +416,19 @@ class Session(requests.Session):
         """
         self.domain_limiters[limiter.domain] = limiter
 
+    def prepare_request(self, request):
+        prepared = super(Session, self).prepare_request(request)
+        # Domain limiters are run right before sending, so not for responses coming from the http cache. Redirects
+        # are prepared separately, only the first request of a redirect chain is limited.
+        prepared.rate_limit = partial(limit_domains, request.url, self.domain_limiters)
+        return prepared
+
+    def send(self, request, **kwargs):
+        adapter = self.get_adapter(request.url)
+        if not isinstance(adapter, http_cache.CachingAdapter):
+            http_cache.rate_limit(request)
+        return super(Session, self).send(request, **kwargs)
+
     def request(self, method, url, *args, **kwargs):
         """
         Does a request, but raises Timeout immediately if site is known to timeout, and records sites that timeout.
@@ -225,14 +442,12 @@ class Session(requests.Session):
             raise requests.Timeout('Requests to this site (%s) have timed out recently. Waiting before trying again.' %
                                    urlparse(url).hostname)
 
-        # Run domain limiters for this url
-        limit_domains(url, self.domain_limiters)
-
         kwargs.setdefault('timeout', self.timeout)
         raise_status = kwargs.pop('raise_status', True)
 
         # If we do not have an adapter for this url, pass it off to urllib
         if not any(url.startswith(adapter) for adapter in self.adapters):
+            limit_domains(url, self.domain_limiters)
             log.debug('No adaptor, passing off to urllib')
             return _wrap_urlopen(url, timeout=kwargs['timeout'])
 
@@ -8,16 +8,20 @@ import logging
 import os
 import re
 import locale
-from copy import copy
+import sys
+import threading
+from collections import Mapping, OrderedDict
 from datetime import datetime, date, time
 
 import jinja2.filters
 from jinja2 import (Environment, StrictUndefined, ChoiceLoader, FileSystemLoader, PackageLoader, Template,
                     TemplateNotFound, TemplateSyntaxError)
+from jinja2.runtime import missing
+from jinja2.utils import concat
 from dateutil import parser as dateutil_parse
 
 from flexget.event import event
-from flexget.utils.lazy_dict import LazyDict
+from flexget.utils.lazy_dict import LazyDict, LazyLookup
 from flexget.utils.pathscrub import pathscrub
 
 log = logging.getLogger('utils.template')
@@ -129,14 +133,120 @@ def filter_default(value, default_value='', boolean=True):
 filter_d = filter_default
 
 
-# TODO: In Jinja 2.8 we will be able to override the Context class to be used explicitly
+class LayeredContext(Mapping):
+    """
+    Read-only view of several mappings, the first one containing a key wins. Lazy fields are evaluated when accessed.
+
+    Used as template context to avoid copying an entire Entry (and template globals) for every render.
+    """
+
+    def __init__(self, *layers):
+        self.layers = layers
+
+    def __getitem__(self, key):
+        for layer in self.layers:
+            if key in layer:
+                value = layer[key]
+                if isinstance(value, LazyLookup):
+                    return value[key]
+                return value
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return any(key in layer for layer in self.layers)
+
+    def __iter__(self):
+        seen = set()
+        for layer in self.layers:
+            for key in layer:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def __len__(self):
+        return len(set().union(*self.layers))
+
+
 class FlexGetTemplate(Template):
     """Adds lazy lookup support when rendering templates."""
 
     def new_context(self, vars=None, shared=False, locals=None):
-        context = super(FlexGetTemplate, self).new_context(vars, shared, locals)
-        context.parent = LazyDict(context.parent)
-        return context
+        layers = [vars or {}]
+        if not shared:
+            layers.append(self.globals)
+        if locals:
+            layers.insert(0, dict((key, value) for key, value in locals.items() if value is not missing))
+        return self.environment.context_class(self.environment, LayeredContext(*layers), self.name, self.blocks)
+
+    def render(self, *args, **kwargs):
+        # Unlike the default implementation, a LayeredContext is used as is rather than being copied to a dict
+        if len(args) == 1 and not kwargs and isinstance(args[0], LayeredContext):
+            vars = args[0]
+        else:
+            vars = dict(*args, **kwargs)
+        try:
+            return concat(self.root_render_func(self.new_context(vars)))
+        except Exception:
+            exc_info = sys.exc_info()
+        return self.environment.handle_exception(exc_info, True)
+
+
+class CompiledCache(object):
+    """
+    Thread safe, size bounded cache of compiled templates or expressions keyed by their source string.
+
+    The least recently used items are discarded when the cache is full. Hit and miss counts are kept for stats.
+    """
+
+    def __init__(self, compile_func, max_size=1000):
+        self.compile_func = compile_func
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, source):
+        with self._lock:
+            compiled = self._items.pop(source, None)
+            if compiled is not None:
+                self._items[source] = compiled
+                self.hits += 1
+                return compiled
+        # Compile outside of the lock, errors are not cached
+        compiled = self.compile_func(source)
+        with self._lock:
+            self.misses += 1
+            self._items[source] = compiled
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._items), 'max_size': self.max_size, 'hits': self.hits, 'misses': self.misses}
+
+
+# Compiled from the current environment at call time, emptied when a new environment is made
+template_cache = CompiledCache(lambda source: environment.from_string(source))
+expression_cache = CompiledCache(lambda source: environment.compile_expression(source))
+
+
+def cache_stats():
+    """Returns the size and hit/miss counts of the compiled template and expression caches."""
+    return {'templates': template_cache.stats(), 'expressions': expression_cache.stats()}
+
+
+@event('manager.execute.completed')
+def log_cache_stats(manager, options):
+    for name, stats in cache_stats().items():
+        log.debug('Compiled %s cache: %s hits, %s misses, %s/%s cached', name, stats['hits'], stats['misses'],
+                  stats['size'], stats['max_size'])
 
 
 @event('manager.initialize')
@@ -151,6 +261,8 @@ def make_environment(manager):
     for name, filt in list(globals().items()):
         if name.startswith('filter_'):
             environment.filters[name.split('_', 1)[1]] = filt
+    template_cache.clear()
+    expression_cache.clear()
 
 
 def list_templates(extensions=None):
@@ -203,7 +315,7 @@ def render(template, context):
     """
     if isinstance(template, basestring):
         try:
-            template = environment.from_string(template)
+            template = template_cache.get(template)
         except TemplateSyntaxError as e:
             raise RenderError('Error in template syntax: ' + e.message)
     try:
@@ -219,17 +331,16 @@ def render(template, context):
 def render_from_entry(template_string, entry):
     """Renders a Template or template string with an Entry as its context."""
 
-    # Make a copy of the Entry so we can add some more fields
-    variables = copy(entry.store)
-    variables['now'] = datetime.now()
+    # Extra fields are layered on top of the entry rather than copying it
+    variables = {'now': datetime.now()}
     # Add task name to variables, usually it's there because metainfo_task plugin, but not always
     if hasattr(entry, 'task') and entry.task is not None:
-        if 'task' not in variables:
+        if 'task' not in entry.store:
             variables['task'] = entry.task.name
         # Since `task` has different meaning between entry and task scope, the `task_name` field is create to be
         # consistent
         variables['task_name'] = entry.task.name
-    return render(template_string, variables)
+    return render(template_string, LayeredContext(variables, entry.store))
 
 
 def render_from_task(template, task):
@@ -251,7 +362,7 @@ def evaluate_expression(expression, context):
     :param str expression:  A jinja expression to evaluate
     :param context: dictlike, supporting LazyDicts
     """
-    compiled_expr = environment.compile_expression(expression)
+    compiled_expr = expression_cache.get(expression)
     # If we have a LazyDict, grab the underlying store. Our environment supports LazyFields directly
     if isinstance(context, LazyDict):
         context = context.store
@@ -530,17 +530,58 @@ def parse_episode_identifier(ep_id, identify_season=False):
     return (identified_by, entity_type)
 
 
-def group_entries(entries, identifier):
+# Identifier templates which only output one field, e.g. `{{ id }}`, are read from the entries without rendering them
+SINGLE_FIELD_TEMPLATE = re.compile(r'^\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}$')
+
+
+def _hashable(value):
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def group_entries(entries, identifier=None, field=None):
+    """
+    Groups entries in one pass over them.
+
+    :param identifier: Template rendered for each entry, entries are grouped by the lowercased and stripped result.
+        Entries for which it can't be rendered, or renders empty, are left out.
+    :param field: Group by the value of this field instead, as is. Entries without the field, or where it is None,
+        are left out.
+    :return: Dict mapping each identifier or field value to the list of its entries, in their original order
+    """
     from flexget.utils.template import RenderError
 
     grouped_entries = defaultdict(list)
 
+    if field is not None:
+        for entry in entries:
+            value = entry.get(field)
+            if value is not None:
+                grouped_entries[_hashable(value)].append(entry)
+        return grouped_entries
+
+    single_field = SINGLE_FIELD_TEMPLATE.match(identifier)
+    if single_field and single_field.group(1) in ('now', 'task', 'task_name'):
+        # not entry fields
+        single_field = None
+
     # Group by Identifier
     for entry in entries:
-        try:
-            rendered_id = entry.render(identifier)
-        except RenderError:
-            continue
+        if single_field:
+            try:
+                rendered_id = str(entry[single_field.group(1)])
+            except KeyError:
+                continue
+        else:
+            try:
+                rendered_id = entry.render(identifier)
+            except RenderError:
+                continue
         if not rendered_id:
             continue
         grouped_entries[rendered_id.lower().strip()].append(entry)
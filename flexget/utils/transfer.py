@@ -0,0 +1,244 @@
+"""Copying and moving files, letting the kernel copy the data where the platform allows it."""
+from __future__ import unicode_literals, division, absolute_import
+from builtins import *  # noqa pylint: disable=unused-import, redefined-builtin
+
+import errno
+import hashlib
+import io
+import logging
+import os
+import shutil
+import time
+
+log = logging.getLogger('utils.transfer')
+
+# Amount of data copied per call, progress is reported after each
+CHUNK_SIZE = 16 * 1024 * 1024
+VERIFY_METHODS = ['size', 'md5', 'sha1', 'sha256']
+
+# Errors meaning the kernel can't copy between these two files, a plain read/write copy is used instead
+_UNSUPPORTED = set(getattr(errno, name) for name in ['EINVAL', 'ENOSYS', 'ENOTSOCK', 'EXDEV', 'EOPNOTSUPP', 'ENOTSUP']
+                   if hasattr(errno, name))
+
+
+class VerificationError(IOError):
+    """Raised when a copied file does not match its source."""
+
+
+class Transfer(object):
+    """
+    Progress of copying or moving one path (file or directory).
+
+    :param progress: Optional function called with the transfer after every chunk copied
+    """
+
+    def __init__(self, src, dst, progress=None):
+        self.src = src
+        self.dst = dst
+        self.progress = progress
+        self.bytes = 0
+        self.renamed = False
+        self.started = time.time()
+        self.finished = None
+        # For progress functions reporting only every so often
+        self.reported = self.started
+
+    @property
+    def seconds(self):
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def throughput(self):
+        """:return: Bytes per second"""
+        seconds = self.seconds
+        return self.bytes / seconds if seconds else 0
+
+    def add(self, amount):
+        self.bytes += amount
+        if self.progress:
+            self.progress(self)
+
+
+def _kernel_copy(src_f, dst_f, transfer):
+    """
+    Copies between two open files with `copy_file_range` or `sendfile`.
+
+    :return: True if the whole file was copied, False if neither is supported for these files
+    """
+    in_fd, out_fd = src_f.fileno(), dst_f.fileno()
+    for name in ['copy_file_range', 'sendfile']:
+        copy = getattr(os, name, None)
+        if copy is None:
+            continue
+        offset = 0
+        while True:
+            try:
+                if name == 'sendfile':
+                    copied = copy(out_fd, in_fd, offset, CHUNK_SIZE)
+                else:
+                    copied = copy(in_fd, out_fd, CHUNK_SIZE, offset_src=offset, offset_dst=offset)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED or offset:
+                    raise
+                break
+            if not copied:
+                return True
+            offset += copied
+            transfer.add(copied)
+    return False
+
+
+def copy_file(src, dst, transfer=None):
+    """
+    Copies data and metadata (permission bits, access and modification times) of file `src` to `dst`, like
+    :func:`shutil.copy2`.
+
+    :return: Number of bytes copied
+    """
+    transfer = transfer or Transfer(src, dst)
+    with io.open(src, 'rb') as src_f:
+        with io.open(dst, 'wb') as dst_f:
+            if not _kernel_copy(src_f, dst_f, transfer):
+                while True:
+                    chunk = src_f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    dst_f.write(chunk)
+                    transfer.add(len(chunk))
+    shutil.copystat(src, dst)
+    return os.path.getsize(dst)
+
+
+def copy_link(src, dst):
+    """Creates symlink `dst` pointing where symlink `src` does."""
+    os.symlink(os.readlink(src), dst)
+
+
+def copy_tree(src, dst, transfer=None):
+    """
+    Copies directory `src` to `dst`, which must not exist, like :func:`shutil.copytree` with `symlinks=True`:
+    symlinks (to files or directories) in the tree are recreated, not followed.
+    """
+    transfer = transfer or Transfer(src, dst)
+    os.makedirs(dst)
+    for name in os.listdir(src):
+        src_path, dst_path = os.path.join(src, name), os.path.join(dst, name)
+        if os.path.islink(src_path):
+            copy_link(src_path, dst_path)
+        elif os.path.isdir(src_path):
+            copy_tree(src_path, dst_path, transfer)
+        else:
+            copy_file(src_path, dst_path, transfer)
+    shutil.copystat(src, dst)
+
+
+def _file_digest(path, method):
+    digest = hashlib.new(method)
+    with io.open(path, 'rb') as f:
+        while True:
+            chunk = f.read(1024 * 1024)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _files(path):
+    """
+    :return: Sorted relative paths of all files and symlinks under `path`, or [''] when `path` is a file or symlink
+    """
+    if os.path.islink(path) or not os.path.isdir(path):
+        return ['']
+    files = []
+    for dirpath, dirs, names in os.walk(path):
+        # Symlinks to directories are listed in dirs, os.walk doesn't follow them
+        links = [name for name in dirs if os.path.islink(os.path.join(dirpath, name))]
+        files.extend(os.path.relpath(os.path.join(dirpath, name), path) for name in names + links)
+    return sorted(files)
+
+
+def verify(src, dst, method):
+    """
+    Checks that `dst` is a copy of `src`, either by their sizes or by streaming both through a hash.
+
+    :param method: One of :data:`VERIFY_METHODS`
+    :raises VerificationError: If they differ
+    """
+    files = _files(src)
+    if _files(dst) != files:
+        raise VerificationError('`%s` does not contain the same files as `%s`' % (dst, src))
+    for name in files:
+        src_file, dst_file = (os.path.join(src, name), os.path.join(dst, name)) if name else (src, dst)
+        if os.path.islink(src_file):
+            same = os.path.islink(dst_file) and os.readlink(src_file) == os.readlink(dst_file)
+        elif method == 'size':
+            same = os.path.getsize(src_file) == os.path.getsize(dst_file)
+        else:
+            same = _file_digest(src_file, method) == _file_digest(dst_file, method)
+        if not same:
+            raise VerificationError('%s of `%s` does not match `%s`' % (method, dst_file, src_file))
+
+
+def _copy(src, dst, transfer, verify_method):
+    existed = os.path.lexists(dst)
+    try:
+        if os.path.islink(src):
+            copy_link(src, dst)
+        elif os.path.isdir(src):
+            copy_tree(src, dst, transfer)
+        else:
+            copy_file(src, dst, transfer)
+        if verify_method:
+            verify(src, dst, verify_method)
+    except Exception:
+        # Don't leave a partial copy behind, but never remove what was already there
+        if not existed:
+            if os.path.isdir(dst) and not os.path.islink(dst):
+                shutil.rmtree(dst, ignore_errors=True)
+            elif os.path.lexists(dst):
+                os.remove(dst)
+        raise
+
+
+def copy(src, dst, verify_method=None, progress=None):
+    """
+    Copies file or directory `src` to `dst`.
+
+    :param verify_method: One of :data:`VERIFY_METHODS` to check the copy with, or None
+    :param progress: Function called with the :class:`Transfer` after every chunk copied
+    :return: The finished :class:`Transfer`
+    """
+    if os.path.isdir(dst) and not os.path.isdir(src):
+        dst = os.path.join(dst, os.path.basename(src))
+    transfer = Transfer(src, dst, progress)
+    _copy(src, dst, transfer, verify_method)
+    transfer.finished = time.time()
+    return transfer
+
+
+def move(src, dst, verify_method=None, progress=None):
+    """
+    Moves file or directory `src` to `dst`, like :func:`shutil.move`. A rename is tried first, when that is not
+    possible (e.g. `dst` is on another filesystem) the data is copied, optionally verified, and the source removed.
+
+    :param verify_method: One of :data:`VERIFY_METHODS` to check a copy with before removing the source, or None
+    :param progress: Function called with the :class:`Transfer` after every chunk copied
+    :return: The finished :class:`Transfer`
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src.rstrip(os.sep)))
+        if os.path.exists(dst):
+            raise IOError('Destination path `%s` already exists' % dst)
+    transfer = Transfer(src, dst, progress)
+    try:
+        os.rename(src, dst)
+        transfer.renamed = True
+    except OSError:
+        log.debug('cannot rename `%s` to `%s`, copying it', src, dst)
+        _copy(src, dst, transfer, verify_method)
+        if os.path.isdir(src) and not os.path.islink(src):
+            shutil.rmtree(src)
+        else:
+            os.remove(src)
+    transfer.finished = time.time()
+    return transfer